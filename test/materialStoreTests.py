@@ -0,0 +1,153 @@
+"""
+Checks materialStore.BlobStore against a temporary project folder.
+
+Covers ingest, release, garbage collection and the storage report. Runs without any
+host application:
+
+    python test/materialStoreTests.py
+"""
+
+import os
+import sys
+import stat
+import shutil
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import tik_manager.materialStore as materialStore
+
+
+def inTempFolder(test):
+    """Runs the test with a new temporary folder, removed afterwards. The wrapped test takes no
+    arguments so it runs the same from run() and under pytest"""
+    def runTest():
+        root = tempfile.mkdtemp(prefix="materialStoreTests_")
+        try:
+            test(root)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+    runTest.__name__ = test.__name__
+    runTest.__doc__ = test.__doc__
+    return runTest
+
+
+def writeFile(filePath, content):
+    folder = os.path.dirname(filePath)
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    with open(filePath, "wb") as f:
+        f.write(content)
+
+
+def readFile(filePath):
+    with open(filePath, "rb") as f:
+        return f.read()
+
+
+def makeSources(root):
+    sources = os.path.join(root, "sources")
+    writeFile(os.path.join(sources, "a.jpg"), b"a" * 1000)
+    writeFile(os.path.join(sources, "b.jpg"), b"b" * 2000)
+    writeFile(os.path.join(sources, "copyOfA.jpg"), b"a" * 1000)
+    return sources
+
+
+def ingestMaterial(store, sources, materialPath, names):
+    os.makedirs(materialPath)
+    pairs = [(os.path.join(sources, name), os.path.join(materialPath, name)) for name in names]
+    return store.ingest(pairs, materialPath)
+
+
+@inTempFolder
+def testIngest(root):
+    sources = makeSources(root)
+    store = materialStore.BlobStore(os.path.join(root, "store"), root)
+    materialA = os.path.join(root, "materials", "A")
+    result = ingestMaterial(store, sources, materialA, ["a.jpg", "b.jpg", "copyOfA.jpg"])
+    assert not result["failed"], result
+    assert result["files"] == 3, result
+    assert result["bytes"] == 4000, result
+    assert result["storedBytes"] == 3000, result
+    for name in ("a.jpg", "b.jpg", "copyOfA.jpg"):
+        assert readFile(os.path.join(materialA, name)) == readFile(os.path.join(sources, name)), name
+
+    # the same content in another material is not stored again
+    materialB = os.path.join(root, "materials", "B")
+    result = ingestMaterial(store, sources, materialB, ["a.jpg"])
+    assert not result["failed"], result
+    assert result["storedBytes"] == 0, result
+
+    # linked material files cannot be edited in place, the blob would change under the other materials
+    for name in ("a.jpg", "b.jpg", "copyOfA.jpg"):
+        mode = os.stat(os.path.join(materialA, name)).st_mode
+        assert not mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH), name
+
+    report = store.report()
+    assert report["materials"] == 2, report
+    assert report["blobs"] == 2, report
+    assert report["storedBytes"] == 3000, report
+    assert report["referencedBytes"] == 5000, report
+
+
+class LosingCopier(object):
+    """Reports success without storing anything, like a blob collected right after it is stored"""
+    def copyFiles(self, pairs, progress=None):
+        return {"failed": [], "cancelled": False}
+
+
+@inTempFolder
+def testMissingBlob(root):
+    sources = makeSources(root)
+    store = materialStore.BlobStore(os.path.join(root, "store"), root)
+    materialPath = os.path.join(root, "materials", "A")
+    os.makedirs(materialPath)
+    pairs = [(os.path.join(sources, "a.jpg"), os.path.join(materialPath, "a.jpg"))]
+    result = store.ingest(pairs, materialPath, copier=LosingCopier())
+    assert result["failed"] == [(pairs[0][0], "blob missing")], result
+    assert not os.path.exists(pairs[0][1])
+
+
+@inTempFolder
+def testReleaseAndCollect(root):
+    sources = makeSources(root)
+    store = materialStore.BlobStore(os.path.join(root, "store"), root)
+    materialA = os.path.join(root, "materials", "A")
+    materialB = os.path.join(root, "materials", "B")
+    ingestMaterial(store, sources, materialA, ["a.jpg", "b.jpg"])
+    ingestMaterial(store, sources, materialB, ["a.jpg"])
+
+    assert store.release(materialA)
+    assert not store.release(materialA)
+    # freshly stored blobs are in their grace period
+    assert store.collectGarbage() == (0, 0)
+
+    gracePeriod = materialStore.GC_GRACE_PERIOD
+    materialStore.GC_GRACE_PERIOD = -1
+    try:
+        deleted, freed = store.collectGarbage()
+    finally:
+        materialStore.GC_GRACE_PERIOD = gracePeriod
+    # only the blob of b.jpg is unreferenced, the material file still links to it
+    assert deleted == 1, deleted
+    report = store.report()
+    assert report["blobs"] == 1, report
+    assert report["materials"] == 1, report
+    assert readFile(os.path.join(materialB, "a.jpg")) == b"a" * 1000
+
+
+def run():
+    failed = 0
+    for test in (testIngest, testMissingBlob, testReleaseAndCollect):
+        try:
+            test()
+            print("OK     %s" % test.__name__)
+        except AssertionError as e:
+            failed += 1
+            print("FAILED %s %s" % (test.__name__, e))
+    return failed
+
+
+if __name__ == '__main__':
+    sys.exit(1 if run() else 0)
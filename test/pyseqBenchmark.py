@@ -0,0 +1,188 @@
+"""
+Benchmarks pyseq against synthetic render trees.
+
+Generates directory trees of empty frame files with varying frame counts, padding,
+number of sequences, gaps and mixed extensions, then times the listing and formatting
+functions ImageViewer and the preview conversion rely on.
+
+Results are written as json so runs of different commits can be compared:
+
+    python test/pyseqBenchmark.py --output before.json
+    (checkout another commit)
+    python test/pyseqBenchmark.py --output after.json --compare before.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "tik_manager"))
+
+import pyseq
+
+pyseq.log.setLevel(logging.WARNING)
+
+# name: (sequence count, frames per sequence, padding, gap ratio, extensions, sub folders)
+SCENARIOS = {
+    "single_long": (1, 20000, 4, 0.0, [".exr"], 1),
+    "single_long_gaps": (1, 20000, 4, 0.1, [".exr"], 1),
+    "many_short": (2000, 5, 4, 0.0, [".exr"], 1),
+    "mixed_extensions": (50, 200, 4, 0.02, [".exr", ".jpg", ".png", ".tif"], 1),
+    "padding_mix": (100, 100, None, 0.0, [".exr"], 1),
+    "deep_tree": (10, 100, 4, 0.05, [".exr", ".jpg"], 40),
+}
+SMALL_SCENARIOS = {
+    "single_long": (1, 2000, 4, 0.0, [".exr"], 1),
+    "single_long_gaps": (1, 2000, 4, 0.1, [".exr"], 1),
+    "many_short": (200, 5, 4, 0.0, [".exr"], 1),
+    "mixed_extensions": (10, 100, 4, 0.02, [".exr", ".jpg", ".png", ".tif"], 1),
+    "padding_mix": (20, 50, None, 0.0, [".exr"], 1),
+    "deep_tree": (5, 50, 4, 0.05, [".exr", ".jpg"], 10),
+}
+
+
+def buildTree(root, sequenceCount, frameCount, padding, gapRatio, extensions, folderCount, seed=0):
+    """Creates empty frame files and returns the list of created folders"""
+    rng = random.Random(seed)
+    folders = []
+    for f in range(folderCount):
+        # nest every other folder to get some depth
+        parent = folders[f // 2] if f and f % 2 else root
+        folder = os.path.join(parent, "shot_%03d" % f) if folderCount > 1 else root
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        folders.append(folder)
+        for s in range(sequenceCount):
+            pad = padding if padding else rng.choice([1, 3, 4, 6])
+            ext = extensions[s % len(extensions)]
+            head = "render_%04d_beauty." % s
+            for frame in range(1, frameCount + 1):
+                if gapRatio and rng.random() < gapRatio:
+                    continue
+                name = "%s%0*d%s" % (head, pad, frame, ext)
+                open(os.path.join(folder, name), "w").close()
+    return folders
+
+
+def timeit(function, repeat):
+    """Returns timing statistics of the function in seconds"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.time()
+        result = function()
+        timings.append(time.time() - start)
+    timings.sort()
+    return {"min": timings[0],
+            "median": timings[len(timings) // 2],
+            "mean": sum(timings) / len(timings),
+            "repeat": repeat}, result
+
+
+def benchmarkScenario(root, repeat):
+    """Times the pyseq functions against the tree under root"""
+    results = {}
+    fileList = []
+    for folder, dirs, files in os.walk(root):
+        fileList.extend(os.path.join(folder, f) for f in files)
+    topFolder = root if any(os.path.isfile(os.path.join(root, f)) for f in os.listdir(root)) \
+        else os.path.join(root, sorted(os.listdir(root))[0])
+
+    results["get_sequences_dir"], seqs = timeit(lambda: pyseq.get_sequences(topFolder), repeat)
+    results["get_sequences_list"], _ = timeit(lambda: pyseq.get_sequences(list(fileList)), repeat)
+    results["iget_sequences"], _ = timeit(lambda: list(pyseq.iget_sequences(list(fileList))), repeat)
+    results["walk"], _ = timeit(lambda: [x for x in pyseq.walk(root)], repeat)
+    if "threads" in pyseq.walk.__code__.co_varnames:
+        results["walk_threads4"], _ = timeit(lambda: [x for x in pyseq.walk(root, threads=4)], repeat)
+
+    compressed = [s.format("%h%p%t %R") for s in seqs if len(s) > 1]
+    results["format"], _ = timeit(lambda: [s.format("%4l %h%p%t %R") for s in seqs], repeat)
+    results["missing"], _ = timeit(lambda: [s.missing() for s in seqs], repeat)
+    results["uncompress"], _ = timeit(
+        lambda: [pyseq.uncompress(os.path.join(topFolder, c), fmt="%h%p%t %R") for c in compressed], repeat)
+
+    counts = {"files": len(fileList), "sequences": len(seqs)}
+    return results, counts
+
+
+def gitRevision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT).decode().strip()
+    except Exception:
+        return None
+
+
+def compare(current, baselineFile):
+    """Prints median ratios of current results against a previous run"""
+    with open(baselineFile, "r") as f:
+        baseline = json.load(f)
+    print("\nComparison against %s (%s)" % (baselineFile, baseline.get("revision")))
+    print("%-20s %-20s %10s %10s %8s" % ("scenario", "function", "before", "after", "ratio"))
+    for scenario, data in sorted(current["scenarios"].items()):
+        old = baseline["scenarios"].get(scenario)
+        if not old:
+            continue
+        for function, stats in sorted(data["timings"].items()):
+            oldStats = old["timings"].get(function)
+            if not oldStats:
+                continue
+            ratio = stats["median"] / oldStats["median"] if oldStats["median"] else float("inf")
+            print("%-20s %-20s %10.4f %10.4f %8.2f" % (scenario, function, oldStats["median"], stats["median"], ratio))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pyseq benchmarks on synthetic render trees")
+    parser.add_argument("--output", help="json file to write the results to. Printed if omitted")
+    parser.add_argument("--compare", help="json file of a previous run to compare with")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs per measurement")
+    parser.add_argument("--scenario", action="append", help="run only the given scenario(s)")
+    parser.add_argument("--small", action="store_true", help="use smaller trees for a quick run")
+    parser.add_argument("--root", help="folder to build the trees in. A temporary folder is used if omitted")
+    parser.add_argument("--keep", action="store_true", help="do not delete the generated trees")
+    args = parser.parse_args()
+
+    scenarios = SMALL_SCENARIOS if args.small else SCENARIOS
+    names = args.scenario or sorted(scenarios)
+    workDir = args.root or tempfile.mkdtemp(prefix="pyseqBenchmark_")
+
+    report = {"revision": gitRevision(),
+              "pyseq": pyseq.__version__,
+              "python": platform.python_version(),
+              "platform": platform.platform(),
+              "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+              "small": args.small,
+              "scenarios": {}}
+    try:
+        for name in names:
+            root = os.path.join(workDir, name)
+            if not os.path.isdir(root):
+                buildTree(root, *scenarios[name])
+            timings, counts = benchmarkScenario(root, args.repeat)
+            report["scenarios"][name] = {"parameters": list(scenarios[name]), "counts": counts, "timings": timings}
+            sys.stderr.write("%s done\n" % name)
+    finally:
+        if not args.keep and not args.root:
+            shutil.rmtree(workDir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
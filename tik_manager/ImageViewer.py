@@ -148,9 +148,14 @@ import iconsSource as icons
 import pyseq as seq
 
 import datetime
-from shutil import copyfile
+import time
+import threading
 # from tik_manager.SmRoot import RootManager
 from SmRoot import RootManager
+# import tik_manager.sequenceTransfer as sequenceTransfer
+import sequenceTransfer
+# import tik_manager.frameCheck as frameCheck
+import frameCheck
 
 
 import logging
@@ -165,6 +170,15 @@ __maintainer__ = "Arda Kutlu"
 __email__ = "ardakutlu@gmail.com"
 __status__ = "Development"
 
+logging.basicConfig()
+logger = logging.getLogger('ImageViewer')
+logger.setLevel(logging.WARNING)
+
+try:
+    import queue
+except ImportError:  # python 2.7 compatibility
+    import Queue as queue
+
 
 def getMainWindow():
     """This function should be overriden"""
@@ -300,12 +314,22 @@ class MainUI(QtWidgets.QMainWindow):
 
         self.recursiveInitial = recursive
 
-        self._generator = None
+        self._listingWorker = None
         self._timerId = None
 
+        # revisited folders are not listed again unless they are modified
+        try:
+            self._sequenceCache = seq.SequenceCache.default()
+        except Exception as e:
+            logger.warning("Sequence cache is disabled\n%s" % e)
+            self._sequenceCache = None
+
         # self.sequenceData = []
         self.sequenceData = {}
 
+        # keeps the reports of the checked sequences until they are modified
+        self.frameChecker = frameCheck.FrameChecker()
+
         self.extensionDictionary = {"jpg": ["*.jpg", "*.jpeg"],
                                     "png": ["*.png"],
                                     "exr": ["*.exr"],
@@ -507,14 +531,20 @@ class MainUI(QtWidgets.QMainWindow):
 
         # Splitter Right Side:
 
-        self.sequences_treeWidget = QtWidgets.QTreeWidget(self.centralwidget)
-        self.sequences_treeWidget.setToolTip((""))
-        self.sequences_treeWidget.setStatusTip((""))
-        self.sequences_treeWidget.setSortingEnabled(True)
-        header = QtWidgets.QTreeWidgetItem(["Name", "Date"])
-        self.sequences_treeWidget.setColumnWidth(0, 250)
-        self.sequences_treeWidget.setHeaderItem(header)
-        self.sequences_treeWidget.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.sequences_model = QtGui.QStandardItemModel(0, 2, self.centralwidget)
+        self.sequences_model.setHorizontalHeaderLabels(["Name", "Date"])
+
+        self.sequences_treeView = QtWidgets.QTreeView(self.centralwidget)
+        self.sequences_treeView.setToolTip((""))
+        self.sequences_treeView.setStatusTip((""))
+        self.sequences_treeView.setModel(self.sequences_model)
+        self.sequences_treeView.setRootIsDecorated(False)
+        self.sequences_treeView.setUniformRowHeights(True)
+        self.sequences_treeView.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.sequences_treeView.setSortingEnabled(True)
+        self.sequences_treeView.sortByColumn(1, QtCore.Qt.AscendingOrder)  # 1 is Date Column
+        self.sequences_treeView.setColumnWidth(0, 250)
+        self.sequences_treeView.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
 
         # self.sequences_listWidget = QtWidgets.QListWidget(self.centralwidget)
         # self.sequences_listWidget.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
@@ -525,7 +555,7 @@ class MainUI(QtWidgets.QMainWindow):
         self.nameFilterApply_pushButton = QtWidgets.QPushButton(self.centralwidget, text="Apply")
 
         self.right_layout = QtWidgets.QVBoxLayout()
-        self.right_layout.addWidget(self.sequences_treeWidget)
+        self.right_layout.addWidget(self.sequences_treeView)
 
         nameFilter_layout = QtWidgets.QHBoxLayout()
         nameFilter_layout.addWidget(self.nameFilter_label)
@@ -557,7 +587,7 @@ class MainUI(QtWidgets.QMainWindow):
         selectionModel = self.directories_treeView.selectionModel()
         selectionModel.selectionChanged.connect(self.populate)
         self.recursive_checkBox.toggled.connect(self.populate)
-        self.sequences_treeWidget.doubleClicked.connect(self.onRunItem)
+        self.sequences_treeView.doubleClicked.connect(self.onRunItem)
         self.browseRaid_pushButton.clicked.connect(self.onBrowseRaid)
 
         self.rootFolder_lineEdit.editingFinished.connect(self.onEditRoot)
@@ -570,18 +600,23 @@ class MainUI(QtWidgets.QMainWindow):
         # SEQUENCE RC
         # -----------
 
-        self.sequences_treeWidget.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
-        self.sequences_treeWidget.customContextMenuRequested.connect(self.onContextMenu_images)
+        self.sequences_treeView.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        self.sequences_treeView.customContextMenuRequested.connect(self.onContextMenu_images)
         self.popMenu = QtWidgets.QMenu()
 
         rcAction_0 = QtWidgets.QAction('Show in Explorer', self)
         rcAction_1 = QtWidgets.QAction('Transfer Files to Raid', self)
+        rcAction_5 = QtWidgets.QAction('Transfer and Verify Files to Raid', self)
         rcAction_4 = QtWidgets.QAction('Import Sequences', self)
+        rcAction_7 = QtWidgets.QAction('Check Frame Integrity', self)
         if BoilerDict["Environment"] == "Standalone":
             rcAction_4.setDisabled(True)
         self.popMenu.addAction(rcAction_0)
         self.popMenu.addAction(rcAction_1)
+        self.popMenu.addAction(rcAction_5)
         self.popMenu.addAction(rcAction_4)
+        self.popMenu.addSeparator()
+        self.popMenu.addAction(rcAction_7)
 
         # ROOT and RAID Folder RC
         # -----------------------
@@ -593,13 +628,18 @@ class MainUI(QtWidgets.QMainWindow):
 
         rcAction_2 = QtWidgets.QAction('Show Root Folder in Explorer', self)
         rcAction_3 = QtWidgets.QAction('Show Transfer Folder in Explorer', self)
+        rcAction_6 = QtWidgets.QAction('Verify Transfer from Manifest', self)
         self.popMenuLabels.addAction(rcAction_2)
         self.popMenuLabels.addAction(rcAction_3)
+        self.popMenuLabels.addAction(rcAction_6)
 
         ## SIGNAL CONNECTIONS
         rcAction_0.triggered.connect(self.onShowInExplorer)
         rcAction_1.triggered.connect(self.onTransferFiles)
+        rcAction_5.triggered.connect(lambda: self.onTransferFiles(verify=True))
+        rcAction_6.triggered.connect(self.onVerifyManifest)
         rcAction_4.triggered.connect(self.onImportSequence)
+        rcAction_7.triggered.connect(self.onCheckFrames)
 
 
         # rcAction_2.triggered.connect(lambda: self.onShowInExplorer(path=unicode(self.rootFolder_lineEdit.text())))
@@ -652,7 +692,8 @@ class MainUI(QtWidgets.QMainWindow):
         self.model.setRootPath(dir)
         self.directories_treeView.setRootIndex(self.model.index(dir))
         self.rootFolder_lineEdit.setText(os.path.normpath(dir))
-        self.sequences_treeWidget.clear()
+        self.stop()
+        self.sequences_model.removeRows(0, self.sequences_model.rowCount())
 
     def getRaidPath(self):
         """
@@ -689,8 +730,8 @@ class MainUI(QtWidgets.QMainWindow):
     def onContextMenu_images(self, point):
         """Method to pop the menu at the position of the mouse cursor"""
         # print se
-        if not self.sequences_treeWidget.currentIndex().row() is -1:
-            self.popMenu.exec_(self.sequences_treeWidget.mapToGlobal(point))
+        if not self.sequences_treeView.currentIndex().row() == -1:
+            self.popMenu.exec_(self.sequences_treeView.mapToGlobal(point))
 
     def onContextMenu_labels(self, point):
         """Method to pop the menu at the position of the mouse cursor"""
@@ -739,14 +780,14 @@ class MainUI(QtWidgets.QMainWindow):
             self.transferTo.setEnabled(True)
             return
 
-    def onTransferFiles(self):
+    def onTransferFiles(self, verify=False):
         """Transfer sequences to the remote location"""
         if self.tLocation == "N/A":
             self.infoPop(textTitle="Cannot Continue", textHeader="Remote Location is not defined")
             # raise Exception([341], "Raid Location not defined")
             return
 
-        selectedItemNames = [x.text(0) for x in self.sequences_treeWidget.selectedItems()]
+        selectedItemNames = self.getSelectedSequenceNames()
         if len(selectedItemNames) == 0:
             self.infoPop(textTitle="Cannot Continue", textHeader="No sequence selected")
             # raise Exception([101], "No sequence selected")
@@ -756,11 +797,23 @@ class MainUI(QtWidgets.QMainWindow):
         self.imageViewer._folderCheck(logPath)
 
         seqCopy = SeqCopyProgress()
-        seqCopy.copysequence(self.sequenceData, selectedItemNames, self.tLocation, logPath, self.rootPath)
+        seqCopy.copysequence(self.sequenceData, selectedItemNames, self.tLocation, logPath, self.rootPath,
+                             verify=verify is True)
+
+    def onVerifyManifest(self):
+        """Re-verifies the frames of an earlier transfer using its manifest file"""
+        logPath = os.path.join(self.databaseDir, "transferLogs")
+        result = QtWidgets.QFileDialog.getOpenFileName(self, "Select Transfer Manifest", logPath,
+                                                       "Transfer Manifest (*_manifest.json)")
+        manifestFile = result[0] if isinstance(result, tuple) else result
+        if not manifestFile:
+            return
+        seqCopy = SeqCopyProgress()
+        seqCopy.verifyManifest(str(manifestFile))
 
     def onImportSequence(self):
         """Executes the import sequence command"""
-        selectedItemNames = [x.text(0) for x in self.sequences_treeWidget.selectedItems()]
+        selectedItemNames = self.getSelectedSequenceNames()
         # importSequence(selectedItemNames)
 
         for itemName in selectedItemNames:
@@ -768,6 +821,75 @@ class MainUI(QtWidgets.QMainWindow):
             self.imageViewer._importSequence(seq)
 
 
+    def onCheckFrames(self):
+        """Scans the selected sequences for missing, empty, outlier sized and corrupted frames"""
+        selectedItemNames = self.getSelectedSequenceNames()
+        if len(selectedItemNames) == 0:
+            self.infoPop(textTitle="Cannot Continue", textHeader="No sequence selected")
+            return
+        sequences = [self.sequenceData[str(itemName)] for itemName in selectedItemNames]
+
+        progressDialog = QtWidgets.QProgressDialog("Checking frames...", "Cancel", 0, 100, self)
+        progressDialog.setWindowTitle("Frame Integrity")
+        progressDialog.setWindowModality(QtCore.Qt.WindowModal)
+        progressDialog.setMinimumDuration(500)
+        cancelEvent = threading.Event()
+        state = {"percent": 0}
+
+        def updateProgress(done, total):
+            state["percent"] = int(100 * done / total)
+
+        def run():
+            try:
+                state["reports"] = self.frameChecker.checkSequences(sequences, progress=updateProgress,
+                                                                    cancelEvent=cancelEvent)
+            except Exception as e:
+                logger.error("Frame check failed\n%s" % e)
+
+        # headers are read by the checker threads, the window only waits for them
+        worker = threading.Thread(target=run)
+        worker.start()
+        while worker.is_alive():
+            QtWidgets.QApplication.processEvents()
+            progressDialog.setValue(state["percent"])
+            if progressDialog.wasCanceled():
+                cancelEvent.set()
+            worker.join(0.05)
+        progressDialog.close()
+
+        if cancelEvent.is_set() or "reports" not in state:
+            return
+        self.showFrameReports(state["reports"])
+
+    def showFrameReports(self, reports):
+        """Lists the frame check results of the sequences"""
+        self.frameReport_dialog = QtWidgets.QDialog(parent=self)
+        self.frameReport_dialog.setWindowTitle("Frame Integrity")
+        self.frameReport_dialog.resize(700, 400)
+        layout = QtWidgets.QVBoxLayout(self.frameReport_dialog)
+
+        failedCount = len([x for x in reports if not x["ok"]])
+        info_label = QtWidgets.QLabel("%s of %s sequence(s) have problems" % (failedCount, len(reports)))
+        layout.addWidget(info_label)
+
+        report_treeWidget = QtWidgets.QTreeWidget()
+        report_treeWidget.setHeaderLabels(["Sequence", "Result"])
+        report_treeWidget.setColumnWidth(0, 350)
+        layout.addWidget(report_treeWidget)
+        for report in reports:
+            lines = frameCheck.formatReport(report)
+            result = "OK" if report["ok"] else "%s problem(s)" % len(lines)
+            sequenceItem = QtWidgets.QTreeWidgetItem(report_treeWidget, [report["sequence"], result])
+            sequenceItem.setToolTip(0, report["path"])
+            for line in lines:
+                QtWidgets.QTreeWidgetItem(sequenceItem, ["", line])
+            sequenceItem.setExpanded(not report["ok"])
+
+        ok_pushButton = QtWidgets.QPushButton("OK")
+        ok_pushButton.clicked.connect(self.frameReport_dialog.close)
+        layout.addWidget(ok_pushButton)
+        self.frameReport_dialog.show()
+
     def onShowInExplorer(self, path=None):
         """Open the folder of sequence in explorer"""
         if path:
@@ -775,7 +897,7 @@ class MainUI(QtWidgets.QMainWindow):
             os.startfile(path)
             return
 
-        selectedItemNames = [x.text(0) for x in self.sequences_treeWidget.selectedItems()]
+        selectedItemNames = self.getSelectedSequenceNames()
         if len(selectedItemNames) == 0:
             raise Exception([101], "No sequence selected")
             return
@@ -788,13 +910,13 @@ class MainUI(QtWidgets.QMainWindow):
     def populate(self):
         """Search for sequences"""
 
-        self.sequences_treeWidget.clear()  # fresh page
+        self.stop()  # Stop any existing listing
+        self.sequences_model.removeRows(0, self.sequences_model.rowCount())  # fresh page
         # self.sequenceData = []  # clear the custom list
         self.sequenceData = {}  # clear the custom dictionary
 
         # if no filter extension selected, stop iterating through folders
         if not self.filterList:
-            self.stop()
             return
 
         index = self.directories_treeView.currentIndex()
@@ -824,44 +946,35 @@ class MainUI(QtWidgets.QMainWindow):
             rec = 1
 
         # convert filterList to tuple
-        filter = (f for f in self.filterList)
+        filter = tuple(self.filterList)
         # create a generator
         # genList = seq.walk(pathList[0], level=rec, includes=filter)
-        genList = [seq.walk(path, level=rec, includes=filter) for path in pathList]
-
-        self.stop()  # Stop any existing Timer
-        self._generator = self.listingLoop(genList)  # start the loop
-        self._timerId = self.startTimer(0)  # idle timer
-
-
-    def listingLoop(self, genList):
-        """Add found sequences to the List widget"""
-        for gen in genList:
-            for x in gen:
-                for i in x[2]:
-                    QtWidgets.QApplication.processEvents(QtCore.QEventLoop.ExcludeUserInputEvents)
-                    # filtertest
-                    filterWord = str(self.nameFilter_lineEdit.text())
-                    if filterWord != "" and filterWord.lower() not in i.lower():
-                        continue
-
-                    itemName = i.format('%h%t %R')
-                    self.sequenceData[itemName] = i
-                    # self.sequenceData.append(i)
-                    # self.sequences_listWidget.addItem(i.format('%h%t %R'))
-                    firstImagePath = os.path.join(os.path.normpath(i.dirname), i.name)
-                    timestamp = os.path.getmtime(firstImagePath)
-                    timestampFormatted = datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
-                    item = QtWidgets.QTreeWidgetItem(self.sequences_treeWidget, [itemName, str(timestampFormatted)])
-                    self.sequences_treeWidget.sortItems(1, QtCore.Qt.AscendingOrder)  # 1 is Date Column, 0 is Ascending order
-
-                    yield
+        # sub folders are listed concurrently, pays off on network shares
+        genList = [seq.walk(path, level=rec, includes=filter, threads=4, cache=self._sequenceCache) for path in pathList]
+
+        # folders are walked in a background thread, found sequences are collected by the timer in batches
+        self._listingWorker = SequenceListingWorker(genList, filterWord=str(self.nameFilter_lineEdit.text()))
+        self._listingWorker.start()
+        self._timerId = self.startTimer(100)
+
+    def insertBatch(self, batch):
+        """Adds found sequences to the sequence list and sorts the list once for the whole batch"""
+        for itemName, timestampFormatted, sequence in batch:
+            self.sequenceData[itemName] = sequence
+            self.sequences_model.appendRow([QtGui.QStandardItem(itemName), QtGui.QStandardItem(timestampFormatted)])
+        header = self.sequences_treeView.header()
+        self.sequences_model.sort(header.sortIndicatorSection(), header.sortIndicatorOrder())
+
+    def getSelectedSequenceNames(self):
+        """Returns the names of the selected sequences"""
+        return [self.sequences_model.data(x) for x in self.sequences_treeView.selectionModel().selectedRows(0)]
 
     def onRunItem(self):
         """Execute the sequence"""
-        itemName = str(self.sequences_treeWidget.currentItem().text(0))
+        index = self.sequences_treeView.currentIndex()
+        itemName = str(self.sequences_model.data(index.sibling(index.row(), 0)))
         seq = self.sequenceData[itemName]
-        # row = self.sequences_treeWidget.currentRow()
+        # row = self.sequences_treeView.currentRow()
         # item = self.sequenceData[row]
         firstImagePath = os.path.join(os.path.normpath(seq.dirname), seq.name)
         self.imageViewer.executeFile(firstImagePath)
@@ -871,18 +984,26 @@ class MainUI(QtWidgets.QMainWindow):
         """Stops the search progress for sequences"""
         if self._timerId is not None:
             self.killTimer(self._timerId)
-        self._generator = None
+        if self._listingWorker is not None:
+            # the worker exits at the next sequence, whatever it finds until then is discarded
+            self._listingWorker.stop()
+        self._listingWorker = None
         self._timerId = None
 
     def timerEvent(self, event):
-        # This is called every time the GUI is idle.
-        if self._generator is None:
+        # Collects the batches sent by the listing worker since the last tick.
+        if self._listingWorker is None:
             return
-        try:
-            next(self._generator)  # Run the next iteration
-        except StopIteration:
+        batch, finished = self._listingWorker.collect()
+        if batch:
+            self.insertBatch(batch)
+        if finished:
             self.stop()  # Iteration has finshed, kill the timer
 
+    def closeEvent(self, event):
+        self.stop()
+        super(MainUI, self).closeEvent(event)
+
     # def _loadJson(self, file):
     #     """Loads the given json file"""
     #     if os.path.isfile(file):
@@ -978,10 +1099,81 @@ class DeselectableTreeView(QtWidgets.QTreeView):
         QtWidgets.QTreeView.mousePressEvent(self, event)
 
 
+class SequenceListingWorker(threading.Thread):
+    """Walks the folders in a background thread and queues the found sequences in batches"""
+    def __init__(self, genList, filterWord="", batchSize=500, batchInterval=0.2):
+        """
+        :param genList: (List) pyseq.walk generators
+        :param filterWord: (String) Only the sequences containing this word are listed. Case insensitive
+        :param batchSize: (Integer) Maximum number of sequences in a batch
+        :param batchInterval: (Float) Seconds to wait before sending a batch which is not full yet
+        """
+        super(SequenceListingWorker, self).__init__()
+        self.daemon = True
+        self.genList = genList
+        self.filterWord = filterWord.lower()
+        self.batchSize = batchSize
+        self.batchInterval = batchInterval
+        self._queue = queue.Queue()
+        self._stopEvent = threading.Event()
+        self._finished = False
+
+    def stop(self):
+        self._stopEvent.set()
+
+    def run(self):
+        batch = []
+        lastSent = time.time()
+        try:
+            for gen in self.genList:
+                for x in gen:
+                    for i in x[2]:
+                        if self._stopEvent.is_set():
+                            return
+                        if self.filterWord and self.filterWord not in i.lower():
+                            continue
+                        itemName = i.format('%h%t %R')
+                        # latest modification of the sequence, known by the walk (or the cache)
+                        timestampFormatted = datetime.datetime.fromtimestamp(i.mtime).strftime("%Y-%m-%d %H:%M:%S")
+                        batch.append((itemName, timestampFormatted, i))
+                        if len(batch) >= self.batchSize or time.time() - lastSent >= self.batchInterval:
+                            self._queue.put(batch)
+                            batch = []
+                            lastSent = time.time()
+        except Exception as e:
+            logger.error("Listing sequences failed\n%s" % e)
+        finally:
+            if batch and not self._stopEvent.is_set():
+                self._queue.put(batch)
+            self._queue.put(None)
+
+    def collect(self):
+        """
+        Returns everything queued since the last call. Called from the GUI thread
+        :return: (Tuple) (list of (itemName, formatted date, sequence), finished)
+        """
+        batch = []
+        while not self._finished:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._finished = True
+            else:
+                batch.extend(item)
+        return batch, self._finished
+
+
 class SeqCopyProgress(QtWidgets.QWidget, RootManager):
     """Custom Widget for visualizing progress of file transfer"""
+    # PyInstaller and Standalone version compatibility
+    if FORCE_QT5:
+        progressChanged = QtCore.pyqtSignal(object, object)
+    else:
+        progressChanged = QtCore.Signal(object, object)
 
-    def __init__(self, src=None, dest=None):
+    def __init__(self, src=None, dest=None, workers=4):
         super(SeqCopyProgress, self).__init__()
         self.logger = None
         self.src = src
@@ -990,6 +1182,10 @@ class SeqCopyProgress(QtWidgets.QWidget, RootManager):
         self.terminated = False
         self.cancelAll = False
         self.errorFlag = False
+        self.copier = sequenceTransfer.SequenceCopier(workers=workers)
+        self._overallDone = 0
+        self._overallTotal = 0
+        self.progressChanged.connect(self.onProgress)
         # self.copyfileobj(src=self.src, dst=self.dest)
         self.currentPlatform = self.getPlatform()
 
@@ -1089,31 +1285,148 @@ class SeqCopyProgress(QtWidgets.QWidget, RootManager):
         except AttributeError:
             pass
 
-    def copyfileobj(self, src, dst):
+    def onProgress(self, done, total):
+        """Updates the progress bars with the bytes copied from the current sequence"""
+        self.pb.setValue(int(100 * done / total) if total else 100)
+        if self._overallTotal:
+            self.pbOverall.setValue(int(100 * (self._overallDone + done) / self._overallTotal))
+
+    def logFileResult(self, src, dst, status):
+        """Called from the copy workers for every frame"""
+        if status == "copied":
+            self.safeLog("Success - {0}".format(dst))
+        elif status == "skipped":
+            self.safeLog("Skipped - already up to date - {0}".format(dst))
+        elif status != "cancelled":
+            self.safeLog("FAILED - {0} - {1}".format(status, src))
+
+    def _waitFor(self, function, cancel):
+        """Runs the function in a thread and keeps the window responsive until it returns"""
+        worker = threading.Thread(target=function)
+        worker.start()
+        while worker.is_alive():
+            QtWidgets.QApplication.processEvents()
+            if self.terminated or self.cancelAll:
+                cancel()
+            worker.join(0.05)
+        QtWidgets.QApplication.processEvents()
+
+    def copyfileobj(self, src, dst, journal=None):
 
         self.pb.setValue(0)
         self.terminated = False  # reset the termination status
-        totalCount = len(src)
-        current = 0
+        pairs = [(i, os.path.join(dst, os.path.basename(i))) for i in src]
+        result = {}
 
-        for i in src:
-            targetPath = os.path.join(dst, os.path.basename(i))
+        def run():
             try:
-                copyfile(i, targetPath)
-            except:
-                self.errorFlag = True
-                self.safeLog("FAILED - unknown error")
-            percent = (100 * current) / totalCount
-            self.pb.setValue(percent)
-            current += 1
-            QtWidgets.QApplication.processEvents()
-            self.safeLog("Success - {0}".format(targetPath))
-            if self.terminated or self.cancelAll:
-                self.errorFlag = True
-                self.safeLog("FAILED - skipped by user")
-                break
+                result.update(self.copier.copyFiles(pairs, journal=journal,
+                                                    progress=self.progressChanged.emit,
+                                                    fileDone=self.logFileResult))
+            except Exception as e:
+                self.safeLog("FAILED - {0}".format(e))
+
+        # frames are copied by the worker pool, the window only waits for them
+        self._waitFor(run, self.copier.cancel)
+
+        if not result or result["failed"]:
+            self.errorFlag = True
+        if result.get("cancelled"):
+            self.errorFlag = True
+            self.safeLog("FAILED - skipped by user")
+        return result
+
+    def _logProblems(self, problems):
+        for dst, problem in problems:
+            self.safeLog("CORRUPTED - {0} - {1}".format(problem, dst))
+        if problems:
+            self.errorFlag = True
+            self.safeLog("{0} frame(s) failed the verification".format(len(problems)))
+
+    def verifyTransfer(self, pairs, manifestFile):
+        """Compares the checksums of source and destination frames and writes the manifest"""
+        self.setWindowTitle('Verifying')
+        self.pb.setValue(0)
+        self._overallTotal = 0
+        self.terminated = False
+        self.safeLog("---------------------------------------------\n"
+                     "Verifying {0} frames\n"
+                     "---------------------------------------------".format(len(pairs)))
+        cancelEvent = threading.Event()
+        result = {}
 
-    def copysequence(self, sequenceData, selectionList, destination, logPath, root):
+        def run():
+            try:
+                result["manifest"], result["problems"] = sequenceTransfer.buildManifest(
+                    pairs, progress=self.progressChanged.emit, cancelEvent=cancelEvent)
+            except Exception as e:
+                self.safeLog("FAILED - verification - {0}".format(e))
+
+        self._waitFor(run, cancelEvent.set)
+        if "manifest" not in result:
+            self.errorFlag = True
+            return
+        if cancelEvent.is_set():
+            # a partial manifest would later verify only the frames hashed so far
+            self.errorFlag = True
+            self.safeLog("FAILED - verification canceled by user, manifest is not saved")
+        else:
+            sequenceTransfer.writeManifest(result["manifest"], manifestFile)
+            self.safeLog("Manifest saved to {0}".format(manifestFile))
+        self._logProblems(result["problems"])
+        # bad copies are removed, otherwise resuming the transfer skips the ones with matching sizes
+        for dst, problem in result["problems"]:
+            if problem != "missing" and os.path.isfile(dst):
+                try:
+                    os.remove(dst)
+                except OSError:
+                    pass
+
+    def verifyManifest(self, manifestFile):
+        """
+        Verifies the destination frames of an earlier transfer against its manifest
+        :param manifestFile: (String) Absolute path of the manifest file written next to the transfer log
+        :return: None
+        """
+        now = datetime.datetime.now()
+        logFile = "{0}_verify_{1}.txt".format(os.path.splitext(manifestFile)[0], now.strftime("%Y.%m.%d.%H.%M"))
+        self.logger = self.setupLogger(logFile)
+        self.setWindowTitle('Verifying')
+        self._overallTotal = 0
+        cancelEvent = threading.Event()
+        result = {}
+
+        def run():
+            try:
+                result["problems"] = sequenceTransfer.verifyManifest(
+                    manifestFile, progress=self.progressChanged.emit, cancelEvent=cancelEvent)
+            except Exception as e:
+                self.safeLog("FAILED - verification - {0}".format(e))
+
+        self._waitFor(run, cancelEvent.set)
+        self._logProblems(result.get("problems", []))
+        self.deleteLogger(self.logger)
+
+        self.close()
+        destPath = os.path.dirname(manifestFile)
+        if cancelEvent.is_set():
+            self.results_ui("Canceled by user", success=False, logPath=logFile, destPath=destPath)
+        elif self.errorFlag or "problems" not in result:
+            self.results_ui("Check log file for errors", success=False, logPath=logFile, destPath=destPath)
+        else:
+            self.results_ui("All frames are intact", success=True, logPath=logFile, destPath=destPath)
+
+    @staticmethod
+    def _sequenceSize(sequence):
+        size = 0
+        for i in sequence:
+            try:
+                size += i.size
+            except OSError:
+                pass
+        return size
+
+    def copysequence(self, sequenceData, selectionList, destination, logPath, root, verify=False):
         """
         Copies the sequences to the destination
         :param sequenceData: (Dictionary) Dictionary of sequences - Usually all found sequences
@@ -1122,15 +1435,32 @@ class SeqCopyProgress(QtWidgets.QWidget, RootManager):
         :param logPath: (String) Absolute folder Path for log file
         :param root: (String) Root path of the images. Difference between sequence file folder
                         and root path will be used as the folder structure at remote location
+        :param verify: (Boolean) If True, copied frames are compared with checksums and
+                        a manifest is saved next to the log file
         :return:
         """
         now = datetime.datetime.now()
         logName = "fileTransferLog_{0}.txt".format(now.strftime("%Y.%m.%d.%H.%M"))
         logFile = os.path.join(logPath, logName)
         self.logger = self.setupLogger(logFile)
-        totalCount = len(selectionList)
-        current = 0
-        for sel in selectionList:
+
+        # the same selection sent to the same destination again resumes into the same target folders
+        firstFrames = [sequenceData[str(sel)][0].path for sel in selectionList]
+        journal = sequenceTransfer.TransferJournal.forTransfer(logPath, destination, firstFrames)
+        if journal.isResumed:
+            self.safeLog("Resuming the interrupted transfer, finished frames will be skipped")
+        targets = {}
+        for firstFrame in firstFrames:
+            subPath = os.path.split(os.path.relpath(firstFrame, root))[0]  ## get the relative path
+            currentDate = now.strftime("%y%m%d")
+            targets[firstFrame] = journal.targets.get(firstFrame) or os.path.join(destination, currentDate, subPath)
+        journal.setTargets(targets)
+
+        sizes = [self._sequenceSize(sequenceData[str(sel)]) for sel in selectionList]
+        self._overallDone = 0
+        self._overallTotal = sum(sizes)
+        transferredPairs = []
+        for sel, firstFrame, size in zip(selectionList, firstFrames, sizes):
             if self.cancelAll:
                 self.safeLog("ALL CANCELED")
                 break
@@ -1139,16 +1469,23 @@ class SeqCopyProgress(QtWidgets.QWidget, RootManager):
                 "Copy Progress - {0}\n"
                 "---------------------------------------------".format(
                     sequenceData[str(sel)]))
-            percent = (100 * current) / totalCount
-            self.pbOverall.setValue(percent)
-            current += 1
             tFilesList = [i.path for i in sequenceData[str(sel)]]
-            subPath = os.path.split(os.path.relpath(tFilesList[0], root))[0]  ## get the relative path
-            currentDate = now.strftime("%y%m%d")
-            targetPath = os.path.join(destination, currentDate, subPath)
+            targetPath = targets[firstFrame]
             if not os.path.isdir(os.path.normpath(targetPath)):
                 os.makedirs(os.path.normpath(targetPath))
-            self.copyfileobj(src=tFilesList, dst=targetPath)
+            result = self.copyfileobj(src=tFilesList, dst=targetPath, journal=journal)
+            self._overallDone += size
+            if result and not result["cancelled"]:
+                transferredPairs += [(i, os.path.join(targetPath, os.path.basename(i))) for i in tFilesList]
+
+        if verify and transferredPairs and not self.cancelAll:
+            self.verifyTransfer(transferredPairs, sequenceTransfer.manifestPath(logFile))
+
+        if self.errorFlag or self.cancelAll:
+            journal.close()
+            self.safeLog("Transfer the same sequences to the same location again to resume")
+        else:
+            journal.remove()
 
         self.deleteLogger(self.logger)
 
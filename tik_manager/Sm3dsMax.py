@@ -214,7 +214,9 @@ class MaxManager(RootManager, MaxCoreFunctions):
              }
         ]
         jsonInfo["SubProject"] = self._subProjectsList[subProjectIndex]
+        self._storeChecksums(jsonInfo, len(jsonInfo["Versions"]), updateReference=makeReference)
         self._dumpJson(jsonInfo, jsonFile)
+        self._updateSceneIndex(jsonFile, jsonInfo)
         # return jsonInfo
         self.progressLogger("save", sceneFile)
         return [0, ""]
@@ -310,7 +312,9 @@ class MaxManager(RootManager, MaxCoreFunctions):
                 shutil.copyfile(sceneFile, referenceFile)
                 jsonInfo["ReferenceFile"] = relReferenceFile
                 jsonInfo["ReferencedVersion"] = currentVersion
+            self._storeChecksums(jsonInfo, len(jsonInfo["Versions"]), updateReference=makeReference)
             self._dumpJson(jsonInfo, jsonFile)
+            self._updateSceneIndex(jsonFile, jsonInfo)
         else:
             msg = "This is not a base scene (Json file cannot be found)"
             logger.warning(msg)
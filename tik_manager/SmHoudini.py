@@ -225,7 +225,9 @@ class HoudiniManager(RootManager, HoudiniCoreFunctions):
              }
         ]
         jsonInfo["SubProject"] = self._subProjectsList[subProjectIndex]
+        self._storeChecksums(jsonInfo, len(jsonInfo["Versions"]), updateReference=makeReference)
         self._dumpJson(jsonInfo, jsonFile)
+        self._updateSceneIndex(jsonFile, jsonInfo)
         # return jsonInfo
         self.progressLogger("save", absSceneFile)
         return [0, ""]
@@ -333,7 +335,9 @@ class HoudiniManager(RootManager, HoudiniCoreFunctions):
                 shutil.copyfile(absSceneFile, referenceFile)
                 jsonInfo["ReferenceFile"] = relReferenceFile
                 jsonInfo["ReferencedVersion"] = currentVersion
+            self._storeChecksums(jsonInfo, len(jsonInfo["Versions"]), updateReference=makeReference)
             self._dumpJson(jsonInfo, jsonFile)
+            self._updateSceneIndex(jsonFile, jsonInfo)
         else:
             msg = "This is not a base scene (Json file cannot be found)"
             return -1, msg
@@ -226,7 +226,9 @@ class MayaManager(RootManager, MayaCoreFunctions):
         ]
 
         jsonInfo["SubProject"] = self._subProjectsList[subProjectIndex]
+        self._storeChecksums(jsonInfo, len(jsonInfo["Versions"]), updateReference=makeReference)
         self._dumpJson(jsonInfo, jsonFile)
+        self._updateSceneIndex(jsonFile, jsonInfo)
         self.progressLogger("save", sceneFile)
         return [0, ""]
 
@@ -349,7 +351,9 @@ class MayaManager(RootManager, MayaCoreFunctions):
             shutil.copyfile(sceneFile, referenceFile)
             jsonInfo["ReferenceFile"] = relReferenceFile
             jsonInfo["ReferencedVersion"] = currentVersion
+        self._storeChecksums(jsonInfo, len(jsonInfo["Versions"]), updateReference=makeReference)
         self._dumpJson(jsonInfo, jsonFile)
+        self._updateSceneIndex(jsonFile, jsonInfo)
         self.progressLogger("save", sceneFile)
         return jsonInfo
 
@@ -1270,6 +1274,7 @@ class MainUI(baseUI):
     def closeEvent(self, event):
         if self.isCallback:
             self.manager._killCallbacks(self.callbackIDList)
+        super(MainUI, self).closeEvent(event)
 
     def extraMenus(self):
         imanager = QtWidgets.QAction("&Image Manager", self)
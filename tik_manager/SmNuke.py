@@ -194,7 +194,9 @@ class NukeManager(RootManager, NukeCoreFunctions):
         ]
 
         jsonInfo["SubProject"] = self._subProjectsList[subProjectIndex]
+        self._storeChecksums(jsonInfo, len(jsonInfo["Versions"]), updateReference=makeReference)
         self._dumpJson(jsonInfo, jsonFile)
+        self._updateSceneIndex(jsonFile, jsonInfo)
         self.progressLogger("save", sceneFile)
         return [0, ""]
 
@@ -296,7 +298,9 @@ class NukeManager(RootManager, NukeCoreFunctions):
                 shutil.copyfile(sceneFile, referenceFile)
                 jsonInfo["ReferenceFile"] = relReferenceFile
                 jsonInfo["ReferencedVersion"] = currentVersion
+            self._storeChecksums(jsonInfo, len(jsonInfo["Versions"]), updateReference=makeReference)
             self._dumpJson(jsonInfo, jsonFile)
+            self._updateSceneIndex(jsonFile, jsonInfo)
         else:
             msg = "This is not a base scene (Json file cannot be found)"
             self._exception(360, msg)
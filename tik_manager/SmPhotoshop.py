@@ -255,7 +255,9 @@ class PsManager(RootManager, PsCoreFunctions):
         ]
 
         jsonInfo["SubProject"] = self._subProjectsList[subProjectIndex]
+        self._storeChecksums(jsonInfo, len(jsonInfo["Versions"]), updateReference=False)
         self._dumpJson(jsonInfo, jsonFile)
+        self._updateSceneIndex(jsonFile, jsonInfo)
         self.progressLogger("save", sceneFile)
         return [0, ""]
 
@@ -353,7 +355,9 @@ class PsManager(RootManager, PsCoreFunctions):
                  }
                 )
 
+            self._storeChecksums(jsonInfo, len(jsonInfo["Versions"]), updateReference=False)
             self._dumpJson(jsonInfo, jsonFile)
+            self._updateSceneIndex(jsonFile, jsonInfo)
         else:
             msg = "This is not a base scene (Json file cannot be found)"
             self._exception(360, msg)
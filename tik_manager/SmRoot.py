@@ -41,10 +41,19 @@ import hashlib
 import shutil
 from glob import glob
 import json
-import filecmp
 import re
 # import ctypes
 import socket
+import threading
+import time
+import atexit
+import weakref
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+try:
+    import queue
+except ImportError:
+    import Queue as queue ## python 2.7 compatibility
 
 # import urllib
 try:
@@ -57,6 +66,8 @@ import pyseq
 import _version
 # import tik_manager.compatibility as compat
 import compatibility as compat
+import sceneIndex
+import projectReport
 
 __author__ = "Arda Kutlu"
 __copyright__ = "Copyright 2018, Tik Manager Root Functions"
@@ -71,11 +82,320 @@ logger = logging.getLogger('smRoot')
 logger.setLevel(logging.WARNING)
 
 
+class JsonCache(object):
+    """
+    Process-wide read cache for the json database files.
+    Entries are validated against the size and modification time of the file on every
+    read, so the file content is only transferred when it is changed on the disk.
+    The raw text is cached (not the parsed object) since callers are free to mutate
+    what they get from _loadJson.
+    """
+    def __init__(self, maxEntries=512, maxBytes=32*1024*1024):
+        self.maxEntries = maxEntries
+        self.maxBytes = maxBytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict() # path: (signature, text)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def signature(path):
+        """Returns the (size, mtime) pair of the file"""
+        return JsonCache.statSignature(os.stat(path))
+
+    @staticmethod
+    def statSignature(st):
+        """Returns the (size, mtime) pair of the os.stat result"""
+        return (st.st_size, getattr(st, "st_mtime_ns", st.st_mtime))
+
+    def get(self, path):
+        """Returns the cached text of the file or None if it is not cached or outdated"""
+        try:
+            signature = self.signature(path)
+        except OSError:
+            self.invalidate(path)
+            return None
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == signature:
+                # move to the end to mark as recently used
+                del self._entries[path]
+                self._entries[path] = entry
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        return None
+
+    def store(self, path, text, signature):
+        """
+        Caches the text of the file
+        :param signature: (Tuple) Signature of the file the text is read from or written to. Must be taken
+        from the open file, a later stat may already see the file of another client
+        """
+        size = len(text)
+        if size > self.maxBytes:
+            self.invalidate(path)
+            return
+        with self._lock:
+            self._discard(path)
+            self._entries[path] = (signature, text)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.maxEntries or self._bytes > self.maxBytes):
+                oldPath, oldEntry = self._entries.popitem(last=False)
+                self._bytes -= len(oldEntry[1])
+
+    def invalidate(self, path):
+        with self._lock:
+            self._discard(path)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _discard(self, path):
+        entry = self._entries.pop(path, None)
+        if entry:
+            self._bytes -= len(entry[1])
+
+    def stats(self):
+        """Returns hit/miss counters and the memory usage of the cache"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits,
+                    "misses": self.misses,
+                    "hitRatio": float(self.hits) / total if total else 0.0,
+                    "entries": len(self._entries),
+                    "bytes": self._bytes}
+
+jsonCache = JsonCache()
+
+
+class JsonWriteStats(object):
+    """Counts the bytes and the time spent for database writes"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.writes = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.lastBytes = 0
+        self.lastSeconds = 0.0
+
+    def add(self, byteCount, seconds):
+        with self._lock:
+            self.writes += 1
+            self.bytes += byteCount
+            self.seconds += seconds
+            self.lastBytes = byteCount
+            self.lastSeconds = seconds
+
+    def stats(self):
+        with self._lock:
+            return {"writes": self.writes,
+                    "bytes": self.bytes,
+                    "seconds": self.seconds,
+                    "averageBytes": self.bytes // self.writes if self.writes else 0,
+                    "averageSeconds": self.seconds / self.writes if self.writes else 0.0,
+                    "lastBytes": self.lastBytes,
+                    "lastSeconds": self.lastSeconds}
+
+jsonWriteStats = JsonWriteStats()
+
+
+_deferredWriters = weakref.WeakSet()
+
+
+@atexit.register
+def _flushDeferredWriters():
+    for writer in list(_deferredWriters):
+        writer.flush()
+
+
+class DeferredWriter(object):
+    """
+    Coalesces bursts of writes to the same file.
+    Only the latest data is kept in memory and written once no new data arrives for 'delay' seconds.
+    Pending data is also written on flush() and at interpreter exit.
+    """
+    def __init__(self, writeFunction, delay=1.0):
+        self.writeFunction = writeFunction
+        self.delay = delay
+        self._pending = None
+        self._timer = None
+        self._lock = threading.Lock()
+        _deferredWriters.add(self)
+
+    def schedule(self, data):
+        """Replaces the pending data and restarts the quiet period"""
+        with self._lock:
+            self._pending = data
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Writes the pending data immediately (if any)"""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            data, self._pending = self._pending, None
+            if data is not None:
+                self.writeFunction(data)
+
+    def isPending(self):
+        return self._pending is not None
+
+
+_logSinks = weakref.WeakSet()
+
+
+@atexit.register
+def _drainLogSinks():
+    for sink in list(_logSinks):
+        sink.flush(close=True, timeout=5)
+
+
+class LogSink(object):
+    """
+    Appends log lines from a background thread.
+    Lines queued in a burst are written in a single open/write per file. Each channel keeps its
+    file open until the path of the channel changes (eg. a new day for the daily progress logs)
+    or the queue stays idle for 'idleTimeout' seconds. Queued lines are also written on
+    flush() and at interpreter exit.
+    """
+    def __init__(self, idleTimeout=5.0):
+        self.idleTimeout = idleTimeout
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._handles = {}
+        _logSinks.add(self)
+
+    def write(self, channel, filePath, text):
+        """
+        Queues the text to be appended to the file as a new line
+        :param channel: (String) Name of the log stream. Files of a channel are rolled over when the path changes
+        :param filePath: (String) Absolute path of the log file
+        :param text: (String) Line to append
+        :return: None
+        """
+        self._queue.put((channel, filePath, text))
+        self._ensureWorker()
+
+    def flush(self, close=False, timeout=None):
+        """Blocks until all queued lines are written. Closes the open log files if close is True"""
+        with self._lock:
+            if self._thread is None and self._queue.empty():
+                return
+        event = threading.Event()
+        self._queue.put((None, event, close))
+        self._ensureWorker()
+        event.wait(timeout)
+
+    def _ensureWorker(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="LogSink")
+                self._thread.daemon = True
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.idleTimeout)]
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._closeHandles()
+                        self._thread = None
+                        return
+                continue
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._writeBatch(batch)
+
+    def _writeBatch(self, batch):
+        touched = set()
+        for channel, target, text in batch:
+            if channel is None:
+                # flush request. target is the event to release, text is the close flag
+                self._flushHandles(touched)
+                touched = set()
+                if text:
+                    self._closeHandles()
+                target.set()
+                continue
+            try:
+                handle = self._getHandle(channel, target)
+                handle.write("%s\n" % text)
+                touched.add(channel)
+            except (IOError, OSError) as e:
+                logger.warning("Cannot write log file %s\n%s" % (target, e))
+        self._flushHandles(touched)
+
+    def _getHandle(self, channel, filePath):
+        path, handle = self._handles.get(channel, (None, None))
+        if path == filePath:
+            return handle
+        if handle:
+            handle.close()
+        folder = os.path.dirname(filePath)
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        handle = open(filePath, "a")
+        self._handles[channel] = (filePath, handle)
+        return handle
+
+    def _flushHandles(self, channels):
+        for channel in channels:
+            path, handle = self._handles[channel]
+            try:
+                handle.flush()
+            except (IOError, OSError) as e:
+                logger.warning("Cannot write log file %s\n%s" % (path, e))
+
+    def _closeHandles(self):
+        for path, handle in self._handles.values():
+            try:
+                handle.close()
+            except (IOError, OSError):
+                pass
+        self._handles = {}
+
+
+def _replaceFile(source, destination):
+    """Renames source over destination. Atomic on python 3 and on posix systems"""
+    try:
+        os.replace(source, destination)
+    except AttributeError: # python 2.7 compatibility
+        if platform.system() == "Windows" and os.path.exists(destination):
+            # windows cannot rename over an existing file on python 2
+            os.remove(destination)
+        os.rename(source, destination)
+
+
 class RootManager(object):
     """Base of all Scene Manager Command Classes"""
     def __init__(self):
         self.currentPlatform = self.getPlatform()
         self._pathsDict={}
+        self._sceneIndex = None
+        self._compactJson = False
+        self._prefsWriter = DeferredWriter(self._writeUserPrefs, delay=1.0)
+        self._logSink = LogSink()
+        self._hostName = socket.gethostname()
+        self._transferCache = {}
+        self._baseScenesFolder = None
         self.fpsList=["2", "3", "4", "5", "6", "8", "10", "12", "15", "16", "20",
                       "23.976", "24", "25", "29.97", "30", "40", "47.952", "48",
                       "50", "59.94", "60", "75", "80", "100", "120", "125", "150",
@@ -266,6 +586,8 @@ class RootManager(object):
         """Initializes all databases"""
         logger.debug("Func: init_database")
 
+        # make sure the cursor positions of the previous session are on the disk before reloading
+        self.flushUserPrefs()
         self._folderCheck(self._pathsDict["masterDir"])
         self._folderCheck(self._pathsDict["databaseDir"])
         self._folderCheck(self._pathsDict["scenesDir"])
@@ -281,6 +603,11 @@ class RootManager(object):
         self._usersDict = self.loadUsers()
         self._currentsDict = self.loadUserPrefs()
         self._subProjectsList = self.loadSubprojects()
+        self._compactJson = self._userSettings.get("compactDatabase", False)
+        if self._sceneIndex:
+            # project is changed, release the index database of the previous one
+            self._sceneIndex.close()
+        self._sceneIndex = self.initSceneIndex()
 
         # unsaved DB
         self._baseScenesInCategory = []
@@ -299,12 +626,60 @@ class RootManager(object):
         self.scanBaseScenes()
 
 
+    def initSceneIndex(self):
+        """Opens the per project scene index database if it is enabled in user settings"""
+        logger.debug("Func: initSceneIndex")
+        if not self._userSettings.get("useSceneIndex"):
+            return None
+        if not sceneIndex.isAvailable():
+            logger.warning("sqlite3 is not available. Scene Index disabled")
+            return None
+        try:
+            return sceneIndex.SceneIndex(self._pathsDict["masterDir"])
+        except Exception as e:
+            logger.warning("Cannot open Scene Index database. Falling back to file scans\n%s" % e)
+            return None
+
+    def rebuildSceneIndex(self):
+        """Re-creates the scene index of current software from the base scene database files"""
+        logger.debug("Func: rebuildSceneIndex")
+        if not self._sceneIndex:
+            msg = "Scene Index is not enabled"
+            self._exception(360, msg)
+            return
+        return self._sceneIndex.rebuild(self._pathsDict["databaseDir"])
+
+    def _updateSceneIndex(self, jsonFile, jsonInfo=None):
+        """Mirrors the changes on the base scene database file to the scene index (if enabled)"""
+        if not self._sceneIndex:
+            return
+        self._sceneIndex.updateScene(jsonFile, sceneInfo=jsonInfo)
+
+    def _removeFromSceneIndex(self, jsonFile):
+        """Removes the base scene database file from the scene index (if enabled)"""
+        if not self._sceneIndex:
+            return
+        self._sceneIndex.removeScene(jsonFile)
+
     def _setCurrents(self, att, newdata):
-        """Sets the database stored cursor positions and saves them to the database file"""
+        """Sets the database stored cursor positions and schedules them to be saved to the database file"""
         logger.debug("Func: _setCurrents")
 
         self._currentsDict[att] = newdata
-        self.saveUserPrefs(self._currentsDict)
+        # clicking through tabs and sub-projects produces a burst of changes. Write only the last state
+        self._prefsWriter.schedule((self._pathsDict["currentsFile"], dict(self._currentsDict)))
+
+    def flushUserPrefs(self):
+        """Writes the pending cursor positions to the database file immediately"""
+        self._prefsWriter.flush()
+
+    def _writeUserPrefs(self, pending):
+        """Writes the (currentsFile, data) pair scheduled by _setCurrents"""
+        currentsFile, settingsData = pending
+        try:
+            self._dumpJson(settingsData, currentsFile)
+        except Exception as e:
+            logger.error("Cannot save current settings\n%s" % e)
 
     @property
     def projectDir(self):
@@ -605,6 +980,10 @@ class RootManager(object):
     def getExtraColumns(self):
         return self._userSettings["extraColumns"]
 
+    def getLiveUpdates(self):
+        """Returns True if the base scene list should follow the database changes"""
+        return self._userSettings.get("liveUpdates", True)
+
     def getMasterDir(self):
         return self._pathsDict["masterDir"]
 
@@ -698,6 +1077,94 @@ class RootManager(object):
         self.scanBaseScenes()
         return self._baseScenesInCategory
 
+    def getBaseScenesSummary(self, deepCheck=False, threads=8):
+        """
+        Collects all the data needed to list the base scenes under the category at cursor position
+        in a single pass. Database files are read concurrently.
+        :param deepCheck: (Bool) passed to the reference check. See checkReference
+        :param threads: (Integer) Maximum number of concurrent reads
+        :return: (List) of dictionaries with keys:
+            name, jsonFile, mtime, referenceStatus, referencedVersion, creator, versionCount
+        """
+        logger.debug("Func: getBaseScenesSummary")
+        baseScenes = self.scanBaseScenes()
+        if self._sceneIndex and not deepCheck:
+            # everything but the deep check is answered by the index, no json file is read
+            return [self._summaryFromIndex(row) for row in self._sceneIndex.getScenes(self._baseScenesFolder)]
+
+        refreshed = []
+
+        def collect(item):
+            return self.getBaseSceneSummary(item[1], deepCheck=deepCheck, refreshed=refreshed)
+
+        items = list(baseScenes.items())
+        if len(items) < 2 or threads < 2:
+            summaryList = [collect(item) for item in items]
+        else:
+            pool = ThreadPool(min(threads, len(items)))
+            try:
+                summaryList = pool.map(collect, items)
+            finally:
+                pool.close()
+                pool.join()
+        # checksums hashed by the deep check are saved, the next check does not hash them again
+        for jsonFile, updates in refreshed:
+            self._saveChecksums(jsonFile, updates)
+        return summaryList
+
+    def _summaryFromIndex(self, row):
+        """Converts a scene index row to the summary dictionary. See getBaseScenesSummary"""
+        referenceFile = row["referenceFile"]
+        if not referenceFile:
+            referenceStatus = 0
+        elif os.path.isfile(os.path.join(self.projectDir, referenceFile.replace("\\", "/"))):
+            referenceStatus = 1
+        else:
+            referenceStatus = -1
+        return {"name": self.niceName(row["jsonFile"]),
+                "jsonFile": row["jsonFile"],
+                "mtime": row["mtime"],
+                "referenceStatus": referenceStatus,
+                "referencedVersion": row["referencedVersion"],
+                "creator": row["creator"] or "",
+                "versionCount": row["versionCount"] or 0}
+
+    def getBaseSceneSummary(self, jsonFile, deepCheck=False, refreshed=None):
+        """
+        Returns the listing data of a single base scene. Safe to call from worker threads
+        :param jsonFile: (String) Absolute path of the base scene database file
+        :param deepCheck: (Bool) passed to the reference check. See checkReference
+        :param refreshed: (List) Appended with (jsonFile, checksum updates) if the deep check refreshed the
+        stored checksums. Saving them is left to the caller, see _saveChecksums
+        :return: (Dictionary) See getBaseScenesSummary
+        """
+        summary = {"name": self.niceName(jsonFile),
+                   "jsonFile": jsonFile,
+                   "mtime": None,
+                   "referenceStatus": -2,
+                   "referencedVersion": None,
+                   "creator": "",
+                   "versionCount": 0}
+        try:
+            summary["mtime"] = os.path.getmtime(jsonFile)
+            # _loadJson may pop dialogs on errors, not allowed outside of the main thread
+            sceneInfo = self._readJsonFile(jsonFile)
+        except (IOError, OSError, ValueError):
+            # corrupted or deleted in the meantime
+            return summary
+        updates = []
+        summary["referenceStatus"] = self._checkReferenceInfo(sceneInfo, deepCheck=deepCheck, refreshed=updates)
+        if updates and refreshed is not None:
+            refreshed.append((jsonFile, updates))
+        summary["referencedVersion"] = sceneInfo.get("ReferencedVersion")
+        summary["creator"] = sceneInfo.get("Creator", "")
+        summary["versionCount"] = len(sceneInfo.get("Versions", []))
+        return summary
+
+    def getBaseScenesFolder(self):
+        """Returns the database folder of the category (and sub-project) listed by the last scanBaseScenes"""
+        return self._baseScenesFolder
+
     def getVersions(self):
         """Returns Versions List of base scene at cursor position"""
         logger.debug("Func: getVersions")
@@ -1002,6 +1469,7 @@ class RootManager(object):
     def scanBaseScenes(self, categoryAs=None, subProjectAs=None, databaseDirAs=None):
         """Returns the basescene database files in current category"""
         logger.debug("Func: scanBaseScenes")
+        isCurrent = not (categoryAs or subProjectAs or databaseDirAs)
         if not databaseDirAs:
             databaseDirAs = self._pathsDict["databaseDir"]
 
@@ -1039,7 +1507,12 @@ class RootManager(object):
         else:
             searchDir = categoryDBpath
 
-        self._baseScenesInCategory = {self.niceName(file):file for file in glob(os.path.join(searchDir, '*.json'))}
+        if isCurrent:
+            self._baseScenesFolder = searchDir
+        if self._sceneIndex:
+            self._baseScenesInCategory = self._sceneIndex.listFolder(searchDir)
+        else:
+            self._baseScenesInCategory = {self.niceName(file):file for file in glob(os.path.join(searchDir, '*.json'))}
         return self._baseScenesInCategory # dictionary of json files
 
     def exportTransfers(self, name, isSelection=True, isObj=True, isAlembic=True, isFbx=True, isVrayProxy=False, isRedShiftProxy=False, timeRange=[1, 10]):
@@ -1160,35 +1633,80 @@ class RootManager(object):
             self._info("Format is not supported")
 
     def scanTransfers(self):
+        """
+        Collects the exported files under the _TRANSFER folder of the project.
+        The result is re-used as long as none of the transfer folders are modified
+        :return: (Dictionary) {"obj": {niceName: path}, "fbx": {..}, "abc": {..}, "vrmesh": {..}, "rs": {..},
+                               "fileInfo": {path: {"size": bytes, "mtime": seconds}}}
+        """
+        transferDir = self._pathsDict["transferDir"]
+        cached = self._transferCache.get(transferDir)
+        if cached and self._isSnapshotValid(cached["folders"]):
+            return cached["result"]
 
         transferDict = {"obj":{},
                         "fbx":{},
                         "abc":{},
                         "vrmesh":{},
-                        "rs":{}}
-
-        objPath = os.path.join(self._pathsDict["transferDir"], "OBJ")
-        if os.path.exists(objPath):
-            # first collect all the obj files
-            transferDict["obj"] = {self.niceName(y):y for x in os.walk(objPath) for y in glob(os.path.join(x[0], '*.obj'))}
-
-        abcPath = os.path.join(self._pathsDict["transferDir"], "ALEMBIC")
-        if os.path.exists(abcPath):
-            transferDict["abc"] = {self.niceName(y):y for x in os.walk(abcPath) for y in glob(os.path.join(x[0], '*.abc'))}
-        #
-        fbxPath = os.path.join(self._pathsDict["transferDir"], "FBX")
-        if os.path.exists(fbxPath):
-            transferDict["fbx"] = {self.niceName(y):y for x in os.walk(fbxPath) for y in glob(os.path.join(x[0], '*.fbx'))}
-
-        vrayProxyPath = os.path.join(self._pathsDict["transferDir"], "vrayProxy")
-        if os.path.exists(fbxPath):
-            transferDict["vrmesh"] = {self.niceName(y):y for x in os.walk(vrayProxyPath) for y in glob(os.path.join(x[0], '*.vrmesh'))}
+                        "rs":{},
+                        "fileInfo":{}}
+        # folder under _TRANSFER: (key of the transferDict, extension)
+        transferFolders = {"OBJ": ("obj", ".obj"),
+                           "ALEMBIC": ("abc", ".abc"),
+                           "FBX": ("fbx", ".fbx"),
+                           "vrayProxy": ("vrmesh", ".vrmesh"),
+                           "rsProxy": ("rs", ".rs")}
+
+        folderMtimes = {}
+        try:
+            folderMtimes[transferDir] = os.stat(transferDir).st_mtime
+        except OSError:
+            return transferDict
+
+        # single pass. Directories are pushed to the stack together with the format they belong to
+        stack = [(os.path.join(transferDir, folder), key, ext) for folder, (key, ext) in transferFolders.items()]
+        while stack:
+            folder, key, ext = stack.pop()
+            try:
+                folderMtimes[folder] = os.stat(folder).st_mtime
+                entries = self._scanDirectory(folder)
+            except OSError:
+                continue
+            for name, path, isDir, stat in entries:
+                if isDir:
+                    stack.append((path, key, ext))
+                elif os.path.splitext(name)[1].lower() == ext:
+                    transferDict[key][self.niceName(path)] = path
+                    transferDict["fileInfo"][path] = {"size": stat.st_size, "mtime": stat.st_mtime}
+
+        self._transferCache[transferDir] = {"folders": folderMtimes, "result": transferDict}
+        return transferDict
 
-        rsProxyPath = os.path.join(self._pathsDict["transferDir"], "rsProxy")
-        if os.path.exists(fbxPath):
-            transferDict["rs"] = {self.niceName(y):y for x in os.walk(rsProxyPath) for y in glob(os.path.join(x[0], '*.rs'))}
+    def _scanDirectory(self, folder):
+        """Returns (name, path, isDirectory, stat) for each entry of the folder. Files are stat'ed, folders are not"""
+        try:
+            scandir = os.scandir
+        except AttributeError: # python 2.7 compatibility
+            entries = []
+            for name in os.listdir(folder):
+                path = os.path.join(folder, name)
+                if os.path.isdir(path):
+                    entries.append((name, path, True, None))
+                else:
+                    entries.append((name, path, False, os.stat(path)))
+            return entries
+        return [(entry.name, entry.path, entry.is_dir(), None if entry.is_dir() else entry.stat()) for entry in scandir(folder)]
 
-        return transferDict
+    def _isSnapshotValid(self, folderMtimes):
+        """Checks whether none of the folders are modified (or removed) since the snapshot is taken"""
+        for folder, mtime in folderMtimes.items():
+            try:
+                if os.stat(folder).st_mtime != mtime:
+                    return False
+            except OSError:
+                # folder is removed after the snapshot
+                return False
+        return True
 
     def getProjectReport(self):
         projectDir = self.getProjectDir()
@@ -1199,52 +1717,22 @@ class RootManager(object):
             self._exception(360, "Project Folder does not have Tik Manager Database")
             return
 
-        def uniqueList(seq, idfun=None):
-            # order preserving
-            if idfun is None:
-                def idfun(x): return x
-            seen = {}
-            result = []
-            for item in seq:
-                marker = idfun(item)
-                # in old Python versions:
-                # if seen.has_key(marker)
-                # but in new ones:
-                if marker in seen: continue
-                seen[marker] = 1
-                result.append(item)
-            return result
-
-        def getdbfiles(folder):
-            if os.path.isdir(folder):
-                swCategories = os.listdir(folder)
-                for category in swCategories:
-                    # get all json files in it recursively
-                    for root, dirs, files in os.walk(os.path.join(folder, category)):
-                        for file in files:
-                            if file.endswith(".json"):
-                                yield (os.path.join(root, file))
+        # make sure the queued progress logs of this session are included
+        self.flushLogs()
+        # only the database files and logs changed since the last report are processed
+        reportCache = projectReport.ProjectReportCache(databaseDir,
+                                                      readJson=self._readJsonFile,
+                                                      writeJson=lambda data, filePath: self._dumpJson(data, filePath, compact=True))
+        softwareData, workstationData = reportCache.collect()
+        uniqueList = projectReport.uniqueList
 
         def getSoftwareReports():
             softwareReport = "-----------------\nSoftware Reports:\n-----------------\n"
-            softwareDBList = ["mayaDB", "maxDB", "houdiniDB", "nukeDB", "photoshopDB"]
-            allUsers = []
-            for dbName in softwareDBList:
-                # get all base scenes in database folder
-                dbFiles = getdbfiles(os.path.join(databaseDir, dbName))
-
-                # get users in the base scene database files
-                users = []
-                workstations = []
-                categories = []
-                for file in dbFiles:
-                    dbData = self._loadJson(file)
-                    users += [v["User"] for v in dbData["Versions"]]
-                    workstations += [v["Workstation"] for v in dbData["Versions"]]
-                    categories.append(dbData["Category"])
-
-                if categories != []:
-                    softwareReport = """
+            for dbName in projectReport.SOFTWARE_DB_LIST:
+                data = softwareData.get(dbName)
+                if not data or not data["categories"]:
+                    continue
+                softwareReport = """
 {0}
 {1}
 {2}
@@ -1253,59 +1741,33 @@ Used Workstations: {4}
 Used Categories: {5}""".format(softwareReport,
                                dbName.replace("DB", "").capitalize(),
                                "-" * len(dbName.replace("DB", "")),
-                               ", ".join(uniqueList(users)),
-                               ", ".join(uniqueList(workstations)),
-                               ", ".join(uniqueList(categories)),
+                               ", ".join(data["users"]),
+                               ", ".join(data["workstations"]),
+                               ", ".join(data["categories"]),
                                )
 
-                return softwareReport
+            return softwareReport
 
         def getWorkstationReports():
-            # find the workstation log paths
-            logFolder = os.path.join(self._pathsDict["masterDir"], "progressLogs")
             workstationReport = "--------------------\nWorkstation Reports:\n--------------------\n"
-            if not os.path.isdir(logFolder):
+            if not workstationData:
                 return "%sNo Report for Workstations" %workstationReport
-            # get all folders in here and add them to the workstations list
-            folderContent = os.listdir(logFolder)
-            workstationList = [x for x in folderContent if os.path.isdir(os.path.join(logFolder, x))]
-            # go through each workstation folder
             grandTotalDays = 0
             grandTotalHours = 0
             grandDaysList = []
-            for ws in workstationList:
-                # get total log files and put the number to workingDays variable
-                wsFolder = os.path.join(logFolder, ws)
-                logFiles = [logFile for logFile in os.listdir(wsFolder) if os.path.splitext(logFile)[1] == ".log"]
-                totalWorkDays = len(logFiles)
-                totalWorkHours = 0
-                firstDay = datetime.datetime.strptime(logFiles[0].replace(".log", ""), "%y%m%d").strftime("%d.%b.%Y")
-                lastDay = datetime.datetime.strptime(logFiles[-1].replace(".log", ""), "%y%m%d").strftime("%d.%b.%Y")
-                grandDaysList.append(int(logFiles[0].replace(".log", "")))
-                grandDaysList.append(int(logFiles[-1].replace(".log", "")))
-                wsUsers=[]
-                # for each log file:
-                # get first and last line
-
-                for file in logFiles:
-                    absFilePath = os.path.join(wsFolder, file)
-                    f = open(absFilePath, "r")
-                    if f.mode == "r":
-                        fileContent = f.readlines()
-                    else:
-                        return "Cannot Read Log File %s" %absFilePath
-                    f.close()
-
-                    firstLineInfo = fileContent[0].split("***")
-                    lastLineInfo = fileContent[-1].split("***")
-                    totalWorkHours += (float(lastLineInfo[3]) - float(firstLineInfo[3])) / 60
-                    wsUsers += [x.split("***")[1] for x in fileContent]
+            for ws in sorted(workstationData.keys()):
+                days = workstationData[ws]
+                totalWorkDays = len(days)
+                totalWorkHours = sum([(day["last"] - day["first"]) / 60 for day in days])
+                firstDay = datetime.datetime.strptime(days[0]["day"], "%y%m%d").strftime("%d.%b.%Y")
+                lastDay = datetime.datetime.strptime(days[-1]["day"], "%y%m%d").strftime("%d.%b.%Y")
+                grandDaysList.append(days[0]["day"])
+                grandDaysList.append(days[-1]["day"])
+                wsUsers = uniqueList([user for day in days for user in day["users"]])
 
                 grandTotalDays += totalWorkDays
                 grandTotalHours += totalWorkHours
 
-                grandFirstDay = datetime.datetime.strptime(str(min(grandDaysList)), "%y%m%d").strftime("%d.%b.%Y")
-                grandLastDay = datetime.datetime.strptime(str(max(grandDaysList)), "%y%m%d").strftime("%d.%b.%Y")
                 workstationReport = """
 {0}
 {1}:
@@ -1314,8 +1776,10 @@ Total Work Days: {3} ({4} - {5})
 Estimated Total Hours of work*: {6}
 User(s): {7}
 
-""".format(workstationReport, ws, "-" * len(str(ws)), totalWorkDays, firstDay, lastDay, '%.1f'%(totalWorkHours), ", ".join(uniqueList(wsUsers)))
+""".format(workstationReport, ws, "-" * len(str(ws)), totalWorkDays, firstDay, lastDay, '%.1f'%(totalWorkHours), ", ".join(wsUsers))
 
+            grandFirstDay = datetime.datetime.strptime(min(grandDaysList), "%y%m%d").strftime("%d.%b.%Y")
+            grandLastDay = datetime.datetime.strptime(max(grandDaysList), "%y%m%d").strftime("%d.%b.%Y")
             workstationReport = "{0}\nGrand Total:\n------------\nTotal Days: {1} ({2} - {3}\nTotal Hours: {4}\n\n*Please note that work hours are a rough estimation based on save/load periods".format(workstationReport, grandTotalDays, grandFirstDay, grandLastDay, '%.1f'%(grandTotalHours))
             return workstationReport
 
@@ -1348,6 +1812,7 @@ User(s): {7}
         self._currentNotes = "%s\n[%s] on %s\n%s\n" % (self._currentNotes, self.currentUser, now, note)
         self._currentSceneInfo["Versions"][self._currentVersionIndex-1]["Note"] = self._currentNotes
         self._dumpJson(self._currentSceneInfo, self._baseScenesInCategory[self._currentBaseSceneName])
+        self._updateSceneIndex(self._baseScenesInCategory[self._currentBaseSceneName], self._currentSceneInfo)
 
     def addUser(self, fullName, initials):
         """
@@ -1471,6 +1936,7 @@ User(s): {7}
             del self._currentPreviewsDict[self._currentPreviewCamera]
             self._currentSceneInfo["Versions"][self._currentVersionIndex-1]["Preview"] = self._currentPreviewsDict
             self._dumpJson(self._currentSceneInfo, self._baseScenesInCategory[self.currentBaseSceneName])
+            self._updateSceneIndex(self._baseScenesInCategory[self.currentBaseSceneName], self._currentSceneInfo)
             logger.info("""Preview file deleted and removed from database successfully 
             Preview Name: {0}
             Path: {1}
@@ -1523,6 +1989,7 @@ User(s): {7}
         except:
             msg = "Cannot delete scene path %s" % (databaseFile)
             self._exception(203, msg)
+        self._removeFromSceneIndex(os.path.join(self.projectDir, databaseFile))
         msg = "all database entries and version files of %s deleted" %databaseFile
         logger.debug(msg)
         self.errorLogger(title="Deleted Base Scene", errorMessage=msg)
@@ -1548,6 +2015,7 @@ User(s): {7}
                 jsonInfo["ReferenceFile"] = None
                 jsonInfo["ReferencedVersion"] = None
                 self._dumpJson(jsonInfo, databaseFile)
+                self._updateSceneIndex(databaseFile, jsonInfo)
                 self.errorLogger(title="Deleted Reference File", errorMessage="%s deleted" %referenceFile)
             except:
                 msg = "Cannot delete reference file %s" % (jsonInfo["ReferenceFile"])
@@ -1575,8 +2043,10 @@ User(s): {7}
         self._currentSceneInfo["ReferenceFile"] = relReferenceFile
         # SET the referenced version as the 'VISUAL INDEX NUMBER' starting from 1
         self._currentSceneInfo["ReferencedVersion"] = self._currentVersionIndex
+        self._storeChecksums(self._currentSceneInfo, self._currentVersionIndex, updateReference=True)
 
         self._dumpJson(self._currentSceneInfo, self._baseScenesInCategory[self.currentBaseSceneName])
+        self._updateSceneIndex(self._baseScenesInCategory[self.currentBaseSceneName], self._currentSceneInfo)
 
     def saveCallback(self):
         """Callback function to update reference files when files saved regularly"""
@@ -1602,7 +2072,11 @@ User(s): {7}
                         shutil.copyfile(self._pathsDict["sceneFile"], absRefFile)
                         print("Scene Manager Update:\nReference File Updated")
                     except:
-                        pass
+                        return
+                    # version file is overwritten in place, keep the stored checksums in sync
+                    self._storeChecksums(jsonInfo, int(jsonInfo["ReferencedVersion"]), updateReference=True)
+                    self._dumpJson(jsonInfo, openSceneInfo["jsonFile"])
+                    self._updateSceneIndex(openSceneInfo["jsonFile"], jsonInfo)
 
     def checkReference(self, databaseFile, deepCheck=False):
         """
@@ -1620,6 +2094,19 @@ User(s): {7}
         sceneInfo = self._loadJson(databaseFile)
         if sceneInfo == -2:
             return -2 # Corrupted database file
+        refreshed = []
+        status = self._checkReferenceInfo(sceneInfo, deepCheck=deepCheck, refreshed=refreshed)
+        if refreshed:
+            # keep the digests, the files are not hashed again until they change
+            self._saveChecksums(databaseFile, refreshed)
+        return status
+
+    def _checkReferenceInfo(self, sceneInfo, deepCheck=False, refreshed=None):
+        """
+        Reference integrity check on already loaded scene info. See checkReference for return codes
+        :param refreshed: (List) Extended with the checksum updates if the deep check refreshed the checksums
+        in sceneInfo. The caller should save them with _saveChecksums
+        """
         if sceneInfo["ReferenceFile"]:
             relVersionFile = sceneInfo["Versions"][sceneInfo["ReferencedVersion"] - 1]["RelativePath"].replace("\\", "/")
             absVersionFile = os.path.join(self.projectDir, relVersionFile)
@@ -1631,7 +2118,12 @@ User(s): {7}
                 return -1 # code red
             else:
                 if deepCheck:
-                    if filecmp.cmp(absVersionFile, absRefFile):
+                    updates = []
+                    match = self._compareChecksums(absVersionFile, sceneInfo["ReferencedVersion"] - 1, absRefFile,
+                                                   sceneInfo, updates=updates)
+                    if refreshed is not None:
+                        refreshed.extend(updates)
+                    if match:
                         logger.info("CODE GREEN: Everything is OK")
                         return 1 # code Green
                     else:
@@ -1644,6 +2136,208 @@ User(s): {7}
             logger.info("CODE YELLOW: File does not have a reference copy")
             return 0 # code yellow
 
+    def _fileChecksum(self, filePath, blockSize=1024*1024):
+        """Returns the sha1 hexdigest of the file content"""
+        sha = hashlib.sha1()
+        with open(filePath, "rb") as f:
+            while True:
+                block = f.read(blockSize)
+                if not block:
+                    break
+                sha.update(block)
+        return sha.hexdigest()
+
+    def _checksumInfo(self, filePath, stored=None, knownHash=None, force=False, deferHash=False):
+        """
+        Returns the checksum dictionary {"Hash", "Size", "Mtime"} of the file.
+        :param filePath: (String) Absolute path of the file
+        :param stored: (Dictionary) Previously stored checksum dictionary. Re-used as long as size and
+        modification time of the file did not change
+        :param knownHash: (String) Use this hash instead of reading the file. (eg. for the fresh copies)
+        :param force: (Bool) If True, always re-hashes the file
+        :param deferHash: (Bool) If True, the file is not read. Hash is None until a check needs it
+        :return: (Dictionary) or None if the file does not exist
+        """
+        try:
+            st = os.stat(filePath)
+        except OSError:
+            return None
+        if not force and stored and stored.get("Size") == st.st_size and stored.get("Mtime") == st.st_mtime \
+                and (stored.get("Hash") or deferHash):
+            return stored
+        if knownHash and not force:
+            fileHash = knownHash
+        elif deferHash:
+            fileHash = None
+        else:
+            try:
+                fileHash = self._fileChecksum(filePath)
+            except (IOError, OSError):
+                # deleted in the meantime
+                return None
+        return {"Hash": fileHash, "Size": st.st_size, "Mtime": st.st_mtime}
+
+    def _storeChecksums(self, jsonInfo, versionInt, updateReference=False):
+        """
+        Records the size and modification time of the version (and optionally the reference file) into the
+        scene info. Saving is not held up by reading back multi GB scenes; the hash is filled in by the first
+        deep check or verifyChecksums, which compare against the recorded size and modification time
+        :param jsonInfo: (Dictionary) Scene info which is going to be dumped
+        :param versionInt: (Integer) Version number starting from 1
+        :param updateReference: (Bool) If True the reference file is assumed to be a fresh copy of the version
+        :return: None
+        """
+        version = jsonInfo["Versions"][versionInt-1]
+        absVersionFile = os.path.join(self.projectDir, version["RelativePath"].replace("\\", "/"))
+        versionChecksum = self._checksumInfo(absVersionFile, stored=version.get("Checksum"), deferHash=True)
+        version["Checksum"] = versionChecksum
+        if updateReference and jsonInfo.get("ReferenceFile") and versionChecksum:
+            absRefFile = os.path.join(self.projectDir, jsonInfo["ReferenceFile"].replace("\\", "/"))
+            jsonInfo["ReferenceChecksum"] = self._checksumInfo(absRefFile, knownHash=versionChecksum["Hash"],
+                                                               deferHash=True)
+
+    def _compareChecksums(self, absVersionFile, versionIndex, absRefFile, sceneInfo, updates=None):
+        """
+        Compares the content of version and reference files. Files are hashed only if stored data is outdated
+        :param versionIndex: (Integer) Index of the version entry holding the "Checksum"
+        :param sceneInfo: (Dictionary) Scene info holding the "ReferenceChecksum". Refreshed checksums are
+        written into it
+        :param updates: (List) Appended with the refreshed checksums. See _saveChecksums
+        :return: (Boolean) True if the contents match
+        """
+        try:
+            if os.path.getsize(absVersionFile) != os.path.getsize(absRefFile):
+                return False
+        except OSError:
+            return False
+        versionInfo = sceneInfo["Versions"][versionIndex]
+        oldVersionChecksum = versionInfo.get("Checksum")
+        oldRefChecksum = sceneInfo.get("ReferenceChecksum")
+        versionChecksum = self._checksumInfo(absVersionFile, stored=oldVersionChecksum)
+        refChecksum = self._checksumInfo(absRefFile, stored=oldRefChecksum)
+        if versionChecksum is None or refChecksum is None:
+            # disappeared after the size check
+            return False
+        if versionChecksum is not oldVersionChecksum:
+            versionInfo["Checksum"] = versionChecksum
+            if updates is not None:
+                updates.append((versionIndex, versionInfo["RelativePath"], oldVersionChecksum, versionChecksum))
+        if refChecksum is not oldRefChecksum:
+            sceneInfo["ReferenceChecksum"] = refChecksum
+            if updates is not None:
+                updates.append((None, sceneInfo["ReferenceFile"], oldRefChecksum, refChecksum))
+        return versionChecksum["Hash"] == refChecksum["Hash"]
+
+    def _saveChecksums(self, databaseFile, updates):
+        """
+        Writes refreshed checksums into the database file. Hashing may take long, so the file is read again
+        right before writing and only the checksum keys are merged into it. A checksum is dropped if its
+        version or reference is changed since it was read
+        :param databaseFile: (String) Absolute path of the base scene database file
+        :param updates: (List) (version index or None for the reference file, relative path,
+        checksum the hash is started from, new checksum) tuples
+        :return: (Boolean) True if the file is written
+        """
+        try:
+            sceneInfo = self._readJsonFile(databaseFile)
+            versions = sceneInfo["Versions"]
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            return False
+        merged = False
+        for versionIndex, relPath, oldChecksum, newChecksum in updates:
+            if versionIndex is None:
+                owner, key, ownerPath = sceneInfo, "ReferenceChecksum", sceneInfo.get("ReferenceFile")
+            elif versionIndex < len(versions):
+                owner, key, ownerPath = versions[versionIndex], "Checksum", versions[versionIndex].get("RelativePath")
+            else:
+                continue
+            if ownerPath != relPath or owner.get(key) != oldChecksum:
+                continue
+            owner[key] = newChecksum
+            merged = True
+        if merged:
+            self._dumpJson(sceneInfo, databaseFile)
+            self._updateSceneIndex(databaseFile, sceneInfo)
+        return merged
+
+    def verifyChecksums(self, databaseDir=None, update=True, threads=4):
+        """
+        Re-hashes all version and reference files of the project and compares them with the stored checksums
+        :param databaseDir: (String) Limits the verification to a single software database folder.
+        Whole smDatabase folder is verified if not given
+        :param update: (Bool) If True, missing or outdated checksums are written back to the database files
+        :param threads: (Integer) Number of files hashed concurrently
+        :return: (Dictionary) Report {"verified": [], "corrupted": [], "missing": [], "updated": []}
+        """
+        logger.debug("Func: verifyChecksums")
+        if not databaseDir:
+            databaseDir = self._pathsDict["masterDir"]
+        report = {"verified": [], "corrupted": [], "missing": [], "updated": []}
+
+        dbFiles = []
+        for root, dirs, files in os.walk(databaseDir):
+            for f in files:
+                if f.endswith(".json"):
+                    dbFiles.append(os.path.join(root, f))
+
+        def verifyScene(dbFile):
+            try:
+                sceneInfo = self._readJsonFile(dbFile)
+                versions = sceneInfo["Versions"]
+            except (IOError, OSError, ValueError, KeyError, TypeError):
+                # not a base scene database file
+                return dbFile, [], []
+            results = []
+            updates = []
+            targets = [(index, v, "Checksum", v["RelativePath"]) for index, v in enumerate(versions)]
+            if sceneInfo.get("ReferenceFile"):
+                targets.append((None, sceneInfo, "ReferenceChecksum", sceneInfo["ReferenceFile"]))
+            for index, owner, key, relPath in targets:
+                absPath = os.path.join(self.projectDir, relPath.replace("\\", "/"))
+                stored = owner.get(key)
+                actual = self._checksumInfo(absPath, force=True)
+                if not actual:
+                    results.append(("missing", absPath))
+                    continue
+                if stored and stored.get("Hash") and stored.get("Size") == actual["Size"] \
+                        and stored.get("Mtime") == actual["Mtime"]:
+                    # file did not change since the checksum is stored, content must be the same
+                    status = "verified" if stored.get("Hash") == actual["Hash"] else "corrupted"
+                    results.append((status, absPath))
+                    continue
+                updates.append((index, relPath, stored, actual))
+                results.append(("updated", absPath))
+            return dbFile, results, updates
+
+        pool = ThreadPool(max(1, threads))
+        try:
+            for dbFile, results, updates in pool.imap_unordered(verifyScene, dbFiles):
+                for status, absPath in results:
+                    report[status].append(absPath)
+                # written from this thread only, the pool threads just hash
+                if updates and update:
+                    self._saveChecksums(dbFile, updates)
+        finally:
+            pool.close()
+            pool.join()
+        return report
+
+    def verifyChecksumsInBackground(self, callback=None, **kwargs):
+        """
+        Runs verifyChecksums on a background thread.
+        :param callback: (Callable) Called with the report dictionary when verification is finished.
+        Keep in mind it is called from the worker thread
+        :return: (threading.Thread)
+        """
+        def run():
+            report = self.verifyChecksums(**kwargs)
+            if callback:
+                callback(report)
+        worker = threading.Thread(target=run, name="smChecksumVerifier")
+        worker.daemon = True
+        worker.start()
+        return worker
+
     def errorLogger(self, title="", errorMessage=""):
         """
         Logs the error message
@@ -1651,17 +2345,12 @@ User(s): {7}
         :param errorMessage: (String) Body of the error message
         :return:
         """
-        #
-        logger = logging.getLogger('SceneManager')
         filePath = os.path.join(self._pathsDict["masterDir"], "sm_logs.log")
-        file_logger = logging.FileHandler(filePath)
-        logger.addHandler(file_logger)
-        logger.setLevel(logging.DEBUG)
 
         now = datetime.datetime.now()
         timeInfo = now.strftime("%d.%m.%Y - %H:%M")
         userInfo = self.currentUser
-        machineInfo = socket.gethostname()
+        machineInfo = self._hostName
         ## stuff
         logMessage = "-----------------------------------------\n" \
                      "{0} - {1}\n" \
@@ -1671,34 +2360,26 @@ User(s): {7}
                      "User: {3}\n" \
                      "Workstation: {4}\n".format(title, timeInfo, errorMessage, userInfo, machineInfo)
 
-        logger.debug(logMessage)
-
-        logger.removeHandler(file_logger)
-        file_logger.flush()
-        file_logger.close()
+        self._logSink.write("errors", filePath, logMessage)
 
     def progressLogger(self, action, actionPath):
-        logger = logging.getLogger('progressLogs')
         userInfo = self.currentUser
-        machineInfo = socket.gethostname()
+        machineInfo = self._hostName
 
         currentDT = datetime.datetime.now()
         today = currentDT.strftime("%y%m%d")
         timeStamp = currentDT.hour*60+currentDT.minute
 
-        logFolder = os.path.join(self._pathsDict["masterDir"], "progressLogs", machineInfo)
-        self._folderCheck(logFolder)
-        logFile = os.path.join(logFolder, "%s.log" %today)
-        file_logger = logging.FileHandler(logFile)
-        logger.addHandler(file_logger)
-        logger.setLevel(logging.DEBUG)
+        # log folder is created by the log sink when the file of the day is opened
+        logFile = os.path.join(self._pathsDict["masterDir"], "progressLogs", machineInfo, "%s.log" %today)
 
         logMessage = "{0}***{1}***{2}***{3}".format(action, userInfo, actionPath, timeStamp)
 
-        logger.debug(logMessage)
-        logger.removeHandler(file_logger)
-        file_logger.flush()
-        file_logger.close()
+        self._logSink.write("progress", logFile, logMessage)
+
+    def flushLogs(self):
+        """Writes the queued progress and error logs immediately"""
+        self._logSink.flush()
 
 
     def checkPassword(self, password):
@@ -1823,9 +2504,7 @@ User(s): {7}
         # TODO : Is it paranoid checking?
         if os.path.isfile(file):
             try:
-                with open(file, 'r') as f:
-                    data = json.load(f)
-                    return data
+                return self._readJsonFile(file)
             except ValueError:
                 msg = "Corrupted JSON file => %s" % file
                 # logger.error(msg)
@@ -1835,16 +2514,69 @@ User(s): {7}
             msg = "File cannot be found => %s" % file
             self._exception(201, msg)
 
-    def _dumpJson(self, data, file):
-        """Saves the data to the json file"""
+    def _readJsonFile(self, file):
+        """
+        Reads and parses the json file through the read cache.
+        Does not report anything to the user, so it is safe to call from worker threads.
+        Raises IOError/OSError for missing and ValueError for corrupted files
+        """
+        text = jsonCache.get(file)
+        if text is None:
+            with open(file, 'r') as f:
+                signature = JsonCache.statSignature(os.fstat(f.fileno()))
+                text = f.read()
+            data = json.loads(text)
+            jsonCache.store(file, text, signature)
+            return data
+        return json.loads(text)
+
+    def _dumpJson(self, data, file, compact=None):
+        """
+        Saves the data to the json file.
+        The data is written to a temporary file next to the target, flushed to the disk and
+        renamed over the target, so readers never see a half written database file.
+        :param data: Json serializable data
+        :param file: (String) Absolute path of the target file
+        :param compact: (Bool) If True, writes without indentation and whitespace. Uses the
+        'compactDatabase' user setting when not given
+        :return: None
+        """
+        startTime = time.time()
+        if compact is None:
+            compact = self._compactJson
         # name, ext = os.path.splitext(unicode(file).encode("utf-8"))
         name, ext = os.path.splitext(compat.encode(file))
         # tempFile = ("{0}.tmp".format(name)).decode("utf-8")
-        tempFile = ("{0}.tmp".format(name))
-        with open(tempFile, "w") as f:
-            json.dump(data, f, indent=4)
-        shutil.copyfile(tempFile, file)
-        os.remove(tempFile)
+        # unique per writer, concurrent saves to the same file must not share the temp file
+        tempFile = ("{0}.{1}_{2}.tmp".format(name, os.getpid(), threading.current_thread().ident))
+        if compact:
+            text = json.dumps(data, separators=(",", ":"))
+        else:
+            text = json.dumps(data, indent=4)
+        jsonCache.invalidate(file)
+        try:
+            with open(tempFile, "w") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+                # the rename keeps the size and modification time of the written file
+                signature = JsonCache.statSignature(os.fstat(f.fileno()))
+            _replaceFile(tempFile, file)
+        except:
+            if os.path.isfile(tempFile):
+                os.remove(tempFile)
+            raise
+        # write through, next read of the same file does not need to go to the disk
+        jsonCache.store(file, text, signature)
+        jsonWriteStats.add(len(text), time.time() - startTime)
+
+    def getJsonCacheStats(self):
+        """Returns the hit/miss counters of the json read cache"""
+        return jsonCache.stats()
+
+    def getJsonWriteStats(self):
+        """Returns the number of database writes with the bytes and the time spent"""
+        return jsonWriteStats.stats()
 
     def loadProjectSettings(self):
         """Loads Project Settings from file"""
@@ -2097,6 +2829,15 @@ User(s): {7}
             try: userSettings["inheritRanges"] # safety for pre 3.1.007 version
             except KeyError:
                 userSettings["inheritRanges"] = "Ask"
+            try: userSettings["useSceneIndex"]
+            except KeyError:
+                userSettings["useSceneIndex"] = False
+            try: userSettings["compactDatabase"]
+            except KeyError:
+                userSettings["compactDatabase"] = False
+            try: userSettings["liveUpdates"]
+            except KeyError:
+                userSettings["liveUpdates"] = True
             if userSettings == -2:
                 return -2
         else:
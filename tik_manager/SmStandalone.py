@@ -381,6 +381,7 @@ class StandaloneManager(RootManager):
 
     def init_database(self):
         """OVERRIDEN FUNCTION"""
+        self.flushUserPrefs()
         self._sceneManagerDefaults = self.loadManagerDefaults()
         self._userSettings = self.loadUserSettings()
 
@@ -658,6 +659,7 @@ class MainUI(baseUI):
         self._vEnableDisable()
 
     def _zero(self):
+        self._stopWatching()
         self.project_lineEdit.setText(self.manager.projectDir)
         self.category_tabWidget.blockSignals(True)
         self.category_tabWidget.clear()
@@ -124,6 +124,7 @@ import pprint
 
 # import tik_manager.ImageViewer as ImageViewer
 import ImageViewer
+import changeFeed
 
 import logging
 
@@ -216,6 +217,9 @@ class MainUI(QtWidgets.QMainWindow):
 
         self.superUser = False
 
+        self._changeFeed = None
+        self._changeFeedTimer = None
+
     def buildUI(self):
         self.setObjectName(self.windowName)
         self.resize(680, 620)
@@ -518,6 +522,7 @@ class MainUI(QtWidgets.QMainWindow):
         projectReport_fm = QtWidgets.QAction("&Project Report", self)
         projectReport_fm.setEnabled(True)
         checkReferences_fm = QtWidgets.QAction("&Check References", self)
+        rebuildSceneIndex_fm = QtWidgets.QAction("&Rebuild Scene Index", self)
 
         # save
         self.fileMenu.addAction(createProject_fm)
@@ -542,6 +547,7 @@ class MainUI(QtWidgets.QMainWindow):
         # misc
         self.fileMenu.addAction(projectReport_fm)
         self.fileMenu.addAction(checkReferences_fm)
+        self.fileMenu.addAction(rebuildSceneIndex_fm)
 
         self.toolsMenu = self.menubar.addMenu("Tools")
         imageViewer_mi = QtWidgets.QAction("&Image Viewer", self)
@@ -652,6 +658,8 @@ class MainUI(QtWidgets.QMainWindow):
 
         checkReferences_fm.triggered.connect(lambda: self.populateBaseScenes(deepCheck=True))
 
+        rebuildSceneIndex_fm.triggered.connect(self.onRebuildSceneIndex)
+
         imageViewer_mi.triggered.connect(self.onIviewer)
         projectMaterials_mi.triggered.connect(self.onPMaterials)
         self.assetLibrary_mi.triggered.connect(self.onAssetLibrary)
@@ -1971,6 +1979,9 @@ class MainUI(QtWidgets.QMainWindow):
             if extra_versionCount_cb.isChecked():
                 newExtraColumns.append("Version Count")
             userSettings["extraColumns"] = newExtraColumns
+            userSettings["useSceneIndex"] = sceneIndex_cb.isChecked()
+            userSettings["compactDatabase"] = compactDatabase_cb.isChecked()
+            userSettings["liveUpdates"] = liveUpdates_cb.isChecked()
 
             # enteredPath = os.path.normpath(unicode(commonDir_lineEdit.text()).encode("utf-8"))
             enteredPath = os.path.normpath(compat.encode(commonDir_lineEdit.text()))
@@ -2056,6 +2067,32 @@ class MainUI(QtWidgets.QMainWindow):
 
         userSettings_formLayout.setLayout(row, QtWidgets.QFormLayout.FieldRole, extraColumns_layout)
 
+        # form item - Scene Index
+        row += 1
+        sceneIndex_label = QtWidgets.QLabel(text="Scene Index Database:")
+        userSettings_formLayout.setWidget(row, QtWidgets.QFormLayout.LabelRole, sceneIndex_label)
+        sceneIndex_cb = QtWidgets.QCheckBox(text="Use Scene Index")
+        sceneIndex_cb.setToolTip("Lists the base scenes from an index database under smDatabase instead of scanning the json files.\nRecommended for crowded categories and slow network shares")
+        sceneIndex_cb.setChecked(userSettings.get("useSceneIndex", False))
+        userSettings_formLayout.setWidget(row, QtWidgets.QFormLayout.FieldRole, sceneIndex_cb)
+
+        # form item - Compact Database
+        row += 1
+        compactDatabase_label = QtWidgets.QLabel(text="Database Encoding:")
+        userSettings_formLayout.setWidget(row, QtWidgets.QFormLayout.LabelRole, compactDatabase_label)
+        compactDatabase_cb = QtWidgets.QCheckBox(text="Compact")
+        compactDatabase_cb.setToolTip("Writes database files without indentation.\nSmaller and faster to write for note heavy scenes, harder to read by eye")
+        compactDatabase_cb.setChecked(userSettings.get("compactDatabase", False))
+        userSettings_formLayout.setWidget(row, QtWidgets.QFormLayout.FieldRole, compactDatabase_cb)
+
+        # form item - Live Updates
+        row += 1
+        liveUpdates_label = QtWidgets.QLabel(text="Base Scene List:")
+        userSettings_formLayout.setWidget(row, QtWidgets.QFormLayout.LabelRole, liveUpdates_label)
+        liveUpdates_cb = QtWidgets.QCheckBox(text="Live Updates")
+        liveUpdates_cb.setToolTip("Follows the changes in the database and updates the base scene list without a refresh")
+        liveUpdates_cb.setChecked(userSettings.get("liveUpdates", True))
+        userSettings_formLayout.setWidget(row, QtWidgets.QFormLayout.FieldRole, liveUpdates_cb)
 
         # form item 3 - Common Settings Directory
         row += 1
@@ -2291,6 +2328,9 @@ class MainUI(QtWidgets.QMainWindow):
         extra_ref_cb.stateChanged.connect(updateDictionary)
         extra_creator_cb.stateChanged.connect(updateDictionary)
         extra_versionCount_cb.stateChanged.connect(updateDictionary)
+        sceneIndex_cb.stateChanged.connect(updateDictionary)
+        compactDatabase_cb.stateChanged.connect(updateDictionary)
+        liveUpdates_cb.stateChanged.connect(updateDictionary)
         localFavorites_radiobutton.clicked.connect(updateDictionary)
         commonDir_lineEdit.editingFinished.connect(updateDictionary)
 
@@ -2314,6 +2354,7 @@ class MainUI(QtWidgets.QMainWindow):
         def updateDictionary():
             settings["Resolution"] = [resolutionX_spinBox.value(), resolutionY_spinBox.value()]
             settings["FPS"] = float(fps_comboBox.currentText())
+            settings["MaterialDedup"] = materialDedup_cb.isChecked()
 
             self.settingsApply_btn.setEnabled(self.allSettingsDict.isChanged())
 
@@ -2372,6 +2413,11 @@ class MainUI(QtWidgets.QMainWindow):
 
         projectSettings_formLayout.addRow(fps_label, fps_comboBox)
 
+        materialDedup_cb = QtWidgets.QCheckBox(text="Deduplicate Project Materials")
+        materialDedup_cb.setToolTip("Stores each unique project material file once and hardlinks the copies to it.\nSaves space when the same files are added to several sub-projects")
+        materialDedup_cb.setChecked(settings.get("MaterialDedup", False))
+        projectSettings_formLayout.addRow(QtWidgets.QLabel(self.projectSettings_vis), materialDedup_cb)
+
         projectSettings_Layout.addLayout(projectSettings_formLayout)
 
         cmdButtons_layout = QtWidgets.QVBoxLayout()
@@ -2395,6 +2441,7 @@ class MainUI(QtWidgets.QMainWindow):
         resolutionX_spinBox.valueChanged.connect(updateDictionary)
         resolutionY_spinBox.valueChanged.connect(updateDictionary)
         fps_comboBox.currentIndexChanged.connect(updateDictionary)
+        materialDedup_cb.stateChanged.connect(updateDictionary)
 
         previewSettings_cmdButton.clicked.connect(
             lambda: self.settingsMenu_treeWidget.setCurrentItem(self.previewSettings_item))
@@ -5779,62 +5826,122 @@ class MainUI(QtWidgets.QMainWindow):
         header = self.scenes_listWidget.headerItem()
         columnCount = header.columnCount()
         extraColumns = [header.text(x) for x in range(1, columnCount)]
-        baseScenesDict = manager.getBaseScenesInCategory()
-        if self.reference_radioButton.isChecked():
-            for key in baseScenesDict:
-                if manager.checkReference(baseScenesDict[key]) == 1:
-                    timestamp = os.path.getmtime(baseScenesDict[key])
-                    timestampFormatted = datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
-                    item = QtWidgets.QTreeWidgetItem(self.scenes_listWidget, [key, str(timestampFormatted)])
+        # single pass over the database files of the category
+        summaryList = manager.getBaseScenesSummary(deepCheck=deepCheck)
+
+        for summary in summaryList:
+            row = self._baseSceneRow(summary, extraColumns)
+            if not row:
+                continue
+            columnData, color = row
+            item = QtWidgets.QTreeWidgetItem(self.scenes_listWidget, columnData)
+            if color:
+                item.setForeground(0, color)
 
-        else:
+        self.scenes_listWidget.blockSignals(False)
+
+        self._watchBaseScenes(manager)
 
-            codeDict = {-1: QtGui.QColor(255, 0, 0, 255), 1: QtGui.QColor(0, 255, 0, 255),
-                        0: QtGui.QColor(255, 255, 0, 255),
-                        -2: QtGui.QColor(20, 20, 20, 255)}  # dictionary for color codes red, green, yellow
-
-            for key in baseScenesDict:
-                retCode = manager.checkReference(baseScenesDict[key],
-                                                 deepCheck=deepCheck)  # returns -1, 0 or 1 for color ref
-                color = codeDict[retCode]
-                # timestamp = os.path.getmtime(baseScenesDict[key])
-                # timestampFormatted = datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
-                # item = QtWidgets.QTreeWidgetItem(self.scenes_listWidget, [key, str(timestampFormatted), str(34)])
-
-                columnData = [key]
-                if "Date" in extraColumns:
-                    timestamp = os.path.getmtime(baseScenesDict[key])
-                    timestampFormatted = datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
-                    columnData.append(timestampFormatted)
-
-                if "Ref. Version" in extraColumns or "Creator" in extraColumns or "Version Count" in extraColumns:
-                    manager.getBaseScenesInCategory()
-                    sInfo = manager.loadSceneInfo(asBaseScene=key)
-                    if 'Ref. Version' in extraColumns:
-                        refVersion = sInfo["ReferencedVersion"]
-                        refVersion = "" if not refVersion else str(refVersion)
-                        columnData.append(refVersion)
-                    if "Creator" in extraColumns:
-                        creator = sInfo["Creator"]
-                        columnData.append(creator)
-                    if "Version Count" in extraColumns:
-                        vCount = str(len(sInfo["Versions"]))
-                        columnData.append(vCount)
-
-                # if 'Ref. Version' in extraColumns:
-                #     manager.getBaseScenesInCategory()
-                #     refVersion = (manager.loadSceneInfo(asBaseScene=key)["ReferencedVersion"])
-                #     refVersion = "" if not refVersion else str(refVersion)
-                #     columnData.append(refVersion)
+    def _baseSceneRow(self, summary, extraColumns):
+        """Returns (column texts, name color) of the base scene summary for the scenes list or None if it should not be listed"""
+        def formatTimestamp(timestamp):
+            if timestamp is None:
+                return ""
+            return datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
 
+        if self.reference_radioButton.isChecked():
+            if summary["referenceStatus"] != 1:
+                return None
+            return [summary["name"], formatTimestamp(summary["mtime"])], None
+
+        codeDict = {-1: QtGui.QColor(255, 0, 0, 255), 1: QtGui.QColor(0, 255, 0, 255),
+                    0: QtGui.QColor(255, 255, 0, 255),
+                    -2: QtGui.QColor(20, 20, 20, 255)}  # dictionary for color codes red, green, yellow
+        color = codeDict[summary["referenceStatus"]] # -1, 0 or 1 for color ref
+
+        columnData = [summary["name"]]
+        if "Date" in extraColumns:
+            columnData.append(formatTimestamp(summary["mtime"]))
+        if 'Ref. Version' in extraColumns:
+            refVersion = summary["referencedVersion"]
+            refVersion = "" if not refVersion else str(refVersion)
+            columnData.append(refVersion)
+        if "Creator" in extraColumns:
+            columnData.append(summary["creator"])
+        if "Version Count" in extraColumns:
+            columnData.append(str(summary["versionCount"]))
+        return columnData, color
+
+    def _watchBaseScenes(self, manager):
+        """Points the change feed to the listed database folder"""
+        folder = manager.getBaseScenesFolder() if manager.getLiveUpdates() else None
+        if self._changeFeed and folder and self._changeFeed.folders == [os.path.normpath(folder)]:
+            return
+        self._stopWatching()
+        if not folder:
+            return
+        self._changeFeed = changeFeed.ChangeFeed([folder], recursive=False)
+        if not self._changeFeedTimer:
+            self._changeFeedTimer = QtCore.QTimer(self)
+            self._changeFeedTimer.timeout.connect(self._onBaseScenesChanged)
+        self._changeFeedTimer.start(2000)
+
+    def _stopWatching(self):
+        if self._changeFeedTimer:
+            self._changeFeedTimer.stop()
+        if self._changeFeed:
+            self._changeFeed.close()
+            self._changeFeed = None
+
+    def _onBaseScenesChanged(self):
+        """Applies the added, changed and removed database files to the scenes list"""
+        manager = self._getManager()
+        if not manager or not self._changeFeed:
+            return
+        events = self._changeFeed.poll()
+        if not events:
+            return
+        # keep the manager in sync with the folder content
+        manager.scanBaseScenes()
+        if len(events) > 50:
+            self.populateBaseScenes()
+            return
 
+        header = self.scenes_listWidget.headerItem()
+        extraColumns = [header.text(x) for x in range(1, header.columnCount())]
+        currentItem = self.scenes_listWidget.currentItem()
+        currentName = currentItem.text(0) if currentItem else None
+        refreshCurrent = False
 
+        self.scenes_listWidget.blockSignals(True)
+        for event, jsonFile in events:
+            name = manager.niceName(jsonFile)
+            found = self.scenes_listWidget.findItems(name, QtCore.Qt.MatchExactly, 0)
+            item = found[0] if found else None
+            row = None
+            if event != changeFeed.REMOVED:
+                row = self._baseSceneRow(manager.getBaseSceneSummary(jsonFile), extraColumns)
+            if not row:
+                if item:
+                    self.scenes_listWidget.takeTopLevelItem(self.scenes_listWidget.indexOfTopLevelItem(item))
+                continue
+            columnData, color = row
+            if not item:
                 item = QtWidgets.QTreeWidgetItem(self.scenes_listWidget, columnData)
-
+            else:
+                for column, text in enumerate(columnData):
+                    item.setText(column, text)
+            if color:
                 item.setForeground(0, color)
-
+            if name == currentName:
+                refreshCurrent = True
         self.scenes_listWidget.blockSignals(False)
 
+        if refreshCurrent and self.scenes_listWidget.currentItem():
+            # new versions or notes of the selected scene
+            self.onBaseSceneChange()
+        self.statusBar().showMessage("Status | Base scene list updated => %s change(s)" % len(events))
+
     def onLoadScene(self):
         # This method IS Software Specific. BUT overriding it is better, so it is not selecting manager
         # row = self.scenes_listWidget.currentRow()
@@ -6032,6 +6139,16 @@ class MainUI(QtWidgets.QMainWindow):
         messageLayout.addWidget(report_te)
         self.messageDialog.show()
 
+    def onRebuildSceneIndex(self):
+        manager = self._getManager()
+        if not manager._sceneIndex:
+            self.infoPop(textTitle="Scene Index", textHeader="Scene Index is not enabled",
+                         textInfo="Scene Index Database can be enabled from User Settings")
+            return
+        count = manager.rebuildSceneIndex()
+        self.populateBaseScenes()
+        self.statusBar().showMessage("Status | Scene Index rebuilt => %s base scenes" % count)
+
     def onIviewer(self):
         # This method is NOT Software Specific.
         ImageViewer.MainUI(self.manager.projectDir).show()
@@ -6054,6 +6171,14 @@ class MainUI(QtWidgets.QMainWindow):
         """Returns current manager"""
         return self.manager
 
+    def closeEvent(self, event):
+        self._stopWatching()
+        try:
+            self.manager.flushUserPrefs()
+        except AttributeError:
+            pass
+        super(MainUI, self).closeEvent(event)
+
     def _initSubProjects(self):
         # This method IS Software Specific.
         manager = self._getManager()
@@ -173,6 +173,13 @@ import tik_manager.iconsSource as icons
 import json
 # import os, fnmatch
 import logging
+import hashlib
+import threading
+from collections import OrderedDict
+try:
+    import queue
+except ImportError:  # python 2.7 compatibility
+    import Queue as queue
 
 __author__ = "Arda Kutlu"
 __copyright__ = "Copyright 2018, Asset Library"
@@ -186,6 +193,12 @@ logging.basicConfig()
 logger = logging.getLogger('AssetLibrary')
 logger.setLevel(logging.WARNING)
 
+CATALOG_VERSION = 1
+# folder under the library holding the catalog. Never listed as an asset
+CATALOG_DIR = "_catalog"
+# maximum number of decoded thumbnails held in memory per library tab
+PIXMAP_CACHE_SIZE = 600
+
 def getMainWindow():
     """This function should be overriden"""
     if BoilerDict["Environment"] == "Maya":
@@ -241,6 +254,9 @@ class AssetLibrary(AssetEditor, RootManager):
                          360: "Action not permitted"}
 
         self.assetsList=[]
+        self.assets = OrderedDict()  # in-memory model of the catalog {assetName: catalog entry}
+        self._catalogStamp = None  # library folder modification time the model is synced to
+        self._catalogFileStamp = None
         self._pathsDict={}
         self.swName = self.getSwName()
         self.init_paths(self.swName)
@@ -302,6 +318,7 @@ class AssetLibrary(AssetEditor, RootManager):
         self._pathsDict["sceneManagerDefaults"] = os.path.normpath(os.path.join(self._pathsDict["sharedSettingsDir"], "sceneManagerDefaults.json"))
         self._pathsDict["tikConventions"] = os.path.normpath(os.path.join(self._pathsDict["sharedSettingsDir"], "tikConventions.json"))
         self._pathsDict["adminPass"] = os.path.normpath(os.path.join(self._pathsDict["sharedSettingsDir"], "adminPass.psw"))
+        self._pathsDict["catalogFile"] = os.path.normpath(os.path.join(self.directory, CATALOG_DIR, "assetCatalog.json"))
             # self._pathsDict["exportSettingsFile"] = os.path.normpath(os.path.join(self._pathsDict["sharedSettingsDir"], "exportSettings.json"))
             # self._pathsDict["importSettingsFile"] = os.path.normpath(os.path.join(self._pathsDict["sharedSettingsDir"], "importSettings.json"))
             # self._pathsDict["iconsDir"] = os.path.join(os.path.dirname(os.path.abspath(__file__)), "CSS", "rc")
@@ -314,13 +331,14 @@ class AssetLibrary(AssetEditor, RootManager):
         self._userSettings = self.loadUserSettings()
         self.exportSettings = self.loadAlExportSettings()
         self.importSettings = self.loadAlImportSettings()
+        # RootManager.__init__ is not called for the library
+        self._compactJson = self._userSettings.get("compactDatabase", False)
 
 
     def scanAssets(self):
         """
-        Scans the directory for .json files, and gather info.
-        Args:
-            directory: (Unicode) Default Library location. Default is predefined outside of this class
+        Lists the assets from the library catalog and holds them in self.assets and self.assetsList.
+        The asset folders are probed only if the library folder is changed since the catalog is written.
 
         Returns:
             None
@@ -328,9 +346,117 @@ class AssetLibrary(AssetEditor, RootManager):
         """
         if not os.path.exists(self.directory):
             return
-        # first collect all the json files from second level subfolders
-        subDirs = next(os.walk(self.directory))[1]
-        self.assetsList = [d for d in subDirs if os.path.isfile(os.path.join(self.directory, d, "%s.json" %d))]
+        if self._catalogStamp == os.path.getmtime(self.directory) and self._catalogFileStamp == self._fileStamp():
+            # nothing is changed since the last scan
+            return
+        catalog = self._loadCatalog()
+        if self._syncCatalog(catalog):
+            self._dumpCatalog(catalog)
+        self._setModel(catalog)
+
+    def rebuildCatalog(self):
+        """Regenerates the catalog from the asset folders, reading every asset database file"""
+        if not os.path.exists(self.directory):
+            return
+        catalog = {"version": CATALOG_VERSION, "libraryMtime": None, "assets": {}}
+        self._syncCatalog(catalog)
+        self._dumpCatalog(catalog)
+        self._setModel(catalog)
+
+    def _loadCatalog(self):
+        try:
+            catalog = self._readJsonFile(self._pathsDict["catalogFile"])
+        except (IOError, OSError, ValueError):
+            catalog = None
+        if not isinstance(catalog, dict) or catalog.get("version") != CATALOG_VERSION:
+            catalog = {"version": CATALOG_VERSION, "libraryMtime": None, "assets": {}}
+        return catalog
+
+    def _dumpCatalog(self, catalog):
+        self._folderCheck(os.path.dirname(self._pathsDict["catalogFile"]))
+        self._dumpJson(catalog, self._pathsDict["catalogFile"])
+
+    def _catalogEntry(self, assetName, data=None):
+        """Builds the catalog entry of the asset. Reads the asset database file if the data is not given"""
+        jsonFile = os.path.join(self.directory, assetName, "%s.json" % assetName)
+        if data is None:
+            data = self._readJsonFile(jsonFile)
+        thumbPath = self.getAssetThumbnail(assetName)
+        return {"data": data,
+                "mtime": os.path.getmtime(jsonFile),
+                "thumbMtime": os.path.getmtime(thumbPath) if os.path.isfile(thumbPath) else None}
+
+    def _syncCatalog(self, catalog):
+        """
+        Brings the catalog in line with the library folder. Asset folders are probed only
+        if an asset is added, removed or renamed since the last sync
+        :return: (Boolean) True if the catalog is changed
+        """
+        libraryMtime = os.path.getmtime(self.directory)
+        if catalog["libraryMtime"] == libraryMtime:
+            return False
+        oldAssets = catalog["assets"]
+        assets = {}
+        for assetName in next(os.walk(self.directory))[1]:
+            if assetName == CATALOG_DIR:
+                continue
+            jsonFile = os.path.join(self.directory, assetName, "%s.json" % assetName)
+            if not os.path.isfile(jsonFile):
+                continue
+            entry = oldAssets.get(assetName)
+            if not entry or entry["mtime"] != os.path.getmtime(jsonFile):
+                try:
+                    entry = self._catalogEntry(assetName)
+                except (IOError, OSError, ValueError):
+                    logger.warning("Skipping corrupted asset database file => %s" % jsonFile)
+                    continue
+            assets[assetName] = entry
+        catalog["assets"] = assets
+        catalog["libraryMtime"] = libraryMtime
+        return True
+
+    def _setModel(self, catalog):
+        self.assets = OrderedDict(sorted(catalog["assets"].items(), key=lambda x: x[0].lower()))
+        self.assetsList = list(self.assets.keys())
+        self._catalogStamp = catalog["libraryMtime"]
+        self._catalogFileStamp = self._fileStamp()
+
+    def _fileStamp(self):
+        try:
+            catalogStat = os.stat(self._pathsDict["catalogFile"])
+        except OSError:
+            return None
+        return catalogStat.st_size, catalogStat.st_mtime
+
+    def _updateCatalog(self, assetName, data=None):
+        """Writes the current state of the asset into the catalog and the in-memory model"""
+        catalog = self._loadCatalog()
+        entry = self._catalogEntry(assetName, data=data)
+        # other assets may be added or removed since the catalog is written. The library mtime stays the one
+        # taken before listing, folders added by others meanwhile are picked up by the next sync
+        self._syncCatalog(catalog)
+        catalog["assets"][assetName] = entry
+        self._dumpCatalog(catalog)
+        self._setModel(catalog)
+
+    def getAssetData(self, assetName, fresh=False):
+        """Returns the catalog entry of the asset. Keys: data, mtime, thumbMtime
+        :param fresh: (Bool) If True, the asset database file is read again if it is changed since the
+        entry is made. Costs a stat, meant for the callers writing the data back
+        """
+        entry = self.assets.get(assetName)
+        if entry is not None and not fresh:
+            return entry
+        if entry is not None:
+            jsonFile = os.path.join(self.directory, assetName, "%s.json" % assetName)
+            try:
+                changed = entry["mtime"] != os.path.getmtime(jsonFile)
+            except OSError:
+                changed = False
+            if not changed:
+                return entry
+        self._updateCatalog(assetName)
+        return self.assets[assetName]
 
     def loadAsset(self, assetName):
         assetData = self._getData(assetName)
@@ -401,7 +527,7 @@ class AssetLibrary(AssetEditor, RootManager):
 
     def addNote(self, assetName, note):
         """Adds a note to the version at current position"""
-        data = self._getData(assetName)
+        data = self._getData(assetName, fresh=True)
         now = datetime.datetime.now().strftime("%d/%m/%Y-%H:%M")
         data["notes"] = "%s %s\n%s\n" % (data["notes"], now, note)
         self._setData(assetName, data)
@@ -422,14 +548,20 @@ class AssetLibrary(AssetEditor, RootManager):
         os.startfile(path)
         pass
 
-    def _getData(self, assetName):
-        jsonFile = os.path.join(self.directory, assetName, "%s.json" %assetName)
-        data = self._loadJson(jsonFile)
-        return data
+    def _getData(self, assetName, fresh=False):
+        # copy, callers modify the data before passing it to _setData. Those should ask for fresh data
+        return dict(self.getAssetData(assetName, fresh=fresh)["data"])
 
     def _setData(self, assetName, data):
         jsonFile = os.path.join(self.directory, assetName, "%s.json" % assetName)
         self._dumpJson(data, jsonFile)
+        self._updateCatalog(assetName, data=data)
+
+    def replaceWithCurrentView(self, assetName):
+        """Replaces the previews of the asset with the active viewport and updates the catalog"""
+        result = super(AssetLibrary, self).replaceWithCurrentView(assetName)
+        self._updateCatalog(assetName)
+        return result
 
 
     def _savePreviews(self, name, assetDirectory, uvSnap=True, selectionOnly=True):
@@ -510,9 +642,11 @@ class MainUI(QtWidgets.QMainWindow):
         self.addNewLibrary_mi= QtWidgets.QAction("&Add New Library", self)
         self.renameLibrary_mi = QtWidgets.QAction("&Rename Active Library", self)
         self.removeLibrary_mi = QtWidgets.QAction("&Remove Library", self)
+        self.rebuildCatalog_mi = QtWidgets.QAction("Re&build Library Catalog", self)
 
         self.fileMenu.addAction(self.addNewLibrary_mi)
         self.fileMenu.addAction(self.renameLibrary_mi)
+        self.fileMenu.addAction(self.rebuildCatalog_mi)
 
 
         self.fileMenu.addSeparator()
@@ -527,6 +661,7 @@ class MainUI(QtWidgets.QMainWindow):
         self.addNewLibrary_mi.triggered.connect(self.newLibraryUI)
         self.renameLibrary_mi.triggered.connect(self.renameLibrary)
         self.removeLibrary_mi.triggered.connect(lambda: self.removeLibrary(self.tabWidget.currentWidget().objectName()))
+        self.rebuildCatalog_mi.triggered.connect(self.rebuildCatalog)
 
 
         if self.viewOnly:
@@ -628,6 +763,15 @@ class MainUI(QtWidgets.QMainWindow):
         if self.tabWidget.currentWidget():
             self.tabWidget.currentWidget().populate()
 
+    def rebuildCatalog(self):
+        """Regenerates the catalog of the active library from the asset folders"""
+        tab = self.tabWidget.currentWidget()
+        if not tab:
+            return
+        tab.library.rebuildCatalog()
+        tab.populate()
+        self.statusBar().showMessage("Catalog rebuilt | %s assets" % len(tab.library.assetsList))
+
     def newLibraryUI(self):
             ## Custom Name for the new library (optional)
             ## Path for the library
@@ -817,8 +961,98 @@ class MainUI(QtWidgets.QMainWindow):
 
 
 
+class ThumbnailLoader(threading.Thread):
+    """
+    Decodes the asset thumbnails at the displayed size in a background thread.
+    Downscaled copies are kept in a local disk cache, stamped with the modification time of the source
+    """
+    def __init__(self, jobs, cacheDir):
+        """
+        :param jobs: (List) (assetName, thumbnail path, thumbnail mtime, size) tuples in the loading order
+        :param cacheDir: (String) Folder of the downscaled thumbnails
+        """
+        super(ThumbnailLoader, self).__init__()
+        self.daemon = True
+        self.jobs = jobs
+        self.cacheDir = cacheDir
+        self._queue = queue.Queue()
+        self._stopEvent = threading.Event()
+        self._finished = False
+
+    def stop(self):
+        self._stopEvent.set()
+
+    def cachePath(self, assetName, size):
+        return os.path.join(self.cacheDir, "%s_%s.jpg" % (assetName, size))
+
+    def _load(self, assetName, thumbPath, thumbMtime, size):
+        """Returns the thumbnail as a QImage scaled to the size. QImage is safe to use outside the GUI thread"""
+        cachePath = self.cachePath(assetName, size)
+        try:
+            if int(os.path.getmtime(cachePath)) == int(thumbMtime):
+                image = QtGui.QImage(cachePath)
+                if not image.isNull():
+                    return image
+        except OSError:
+            pass
+        image = QtGui.QImage(thumbPath)
+        if image.isNull():
+            return None
+        if image.width() > size or image.height() > size:
+            image = image.scaled(size, size, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+        # saved under a temporary name first, other library windows may read the same cache
+        tempPath = "%s.%s_%s.tmp" % (cachePath, os.getpid(), threading.current_thread().ident)
+        try:
+            if not os.path.isdir(self.cacheDir):
+                os.makedirs(self.cacheDir)
+            if image.save(tempPath, "JPG"):
+                os.utime(tempPath, (thumbMtime, thumbMtime))
+                try:
+                    os.replace(tempPath, cachePath)
+                except AttributeError:  # python 2.7 compatibility
+                    if os.path.exists(cachePath):
+                        os.remove(cachePath)
+                    os.rename(tempPath, cachePath)
+        except OSError as e:
+            logger.debug("Cannot cache the thumbnail %s\n%s" % (cachePath, e))
+            if os.path.isfile(tempPath):
+                os.remove(tempPath)
+        return image
+
+    def run(self):
+        try:
+            for assetName, thumbPath, thumbMtime, size in self.jobs:
+                if self._stopEvent.is_set():
+                    return
+                image = self._load(assetName, thumbPath, thumbMtime, size)
+                if image is not None:
+                    self._queue.put((assetName, (assetName, thumbMtime, size), image))
+        except Exception as e:
+            logger.error("Loading thumbnails failed\n%s" % e)
+        finally:
+            self._queue.put(None)
+
+    def collect(self):
+        """
+        Returns the thumbnails loaded since the last call. Called from the GUI thread
+        :return: (Tuple) (list of (assetName, cache key, QImage), finished)
+        """
+        loaded = []
+        while not self._finished:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._finished = True
+            else:
+                loaded.append(item)
+        return loaded, self._finished
+
+
 class LibraryTab(QtWidgets.QWidget):
     viewModeState = -1
+    thumbnailSize = 100
 
     def __init__(self, directory, viewOnly=True):
         self.directory = directory
@@ -828,6 +1062,17 @@ class LibraryTab(QtWidgets.QWidget):
 
         self.library = AssetLibrary(directory)
 
+        # thumbnails are loaded in the background, only for the visible items of the icon view
+        self._thumbnailLoaders = []
+        self._thumbnailsInFlight = {}  # {cache key: ThumbnailLoader} of the requested, not yet loaded thumbnails
+        self._pixmapCache = OrderedDict()  # {(assetName, thumbnail mtime, size): QPixmap} in LRU order
+        self._iconItems = {}  # {assetName: QListWidgetItem} of the icon view
+        libraryKey = os.path.normpath(directory)
+        if not isinstance(libraryKey, bytes):
+            libraryKey = libraryKey.encode("utf-8")
+        self._thumbnailCacheDir = os.path.join(self.library._pathsDict["userSettingsDir"], "assetLibraryThumbs",
+                                               hashlib.md5(libraryKey).hexdigest())
+
         if not self.library.swName:
             self.currentProject = ""
         else:
@@ -1151,6 +1396,15 @@ class LibraryTab(QtWidgets.QWidget):
 
 
         self.assets_listWidget.currentItemChanged.connect(self.onAssetChange)
+        self.assets_listWidget.verticalScrollBar().valueChanged.connect(self._scheduleThumbnails)
+        self.assets_listWidget.verticalScrollBar().rangeChanged.connect(self._scheduleThumbnails)
+
+        # wait for the scrolling to settle before requesting thumbnails
+        self._thumbnailRequestTimer = QtCore.QTimer(self)
+        self._thumbnailRequestTimer.setSingleShot(True)
+        self._thumbnailRequestTimer.timeout.connect(self._requestThumbnails)
+        self._thumbnailPollTimer = QtCore.QTimer(self)
+        self._thumbnailPollTimer.timeout.connect(self._collectThumbnails)
 
         # self.screenshot_label.clicked.connect(self.toggleWireframe)
         self.screenshot_label.leftClicked.connect(self.toggleWireframe)
@@ -1409,10 +1663,6 @@ class LibraryTab(QtWidgets.QWidget):
 
         # self.screenshot_label.setImage(self.tPixmap)
 
-        # get Notes
-        assetNotes = self.library.getAssetNotes(assetName)
-        self.notes_textEdit.setText(assetNotes)
-
         # get display data
         assetNotes = assetData["notes"]
         self.notes_textEdit.setText(assetNotes)
@@ -1501,28 +1751,31 @@ class LibraryTab(QtWidgets.QWidget):
         filterWord = str(self.filter_lineEdit.text())
 
         self.assets_listWidget.clear()
+        self._iconItems = {}
         self.library.scanAssets()
 
 
         if self.viewModeState == 1:
+            size = self.thumbnailSize
             self.assets_listWidget.setViewMode(QtWidgets.QListWidget.IconMode)
-            self.assets_listWidget.setIconSize(QtCore.QSize(100, 100))
+            self.assets_listWidget.setIconSize(QtCore.QSize(size, size))
             self.assets_listWidget.setMovement(QtWidgets.QListView.Static)
             self.assets_listWidget.setResizeMode(QtWidgets.QListWidget.Adjust)
-            self.assets_listWidget.setGridSize(QtCore.QSize(100*1.2, 100*1.4))
+            self.assets_listWidget.setGridSize(QtCore.QSize(size*1.2, size*1.4))
 
             # self.assets_listWidget.addItems(self.filterList(self.library.assetsList, filterWord))
+            # thumbnails already in memory are set right away, the rest is loaded for the visible items
+            placeholder = QtGui.QPixmap(size, size)
+            placeholder.fill(QtCore.Qt.transparent)
+            placeholderIcon = QtGui.QIcon(placeholder)
             filteredItems = self.filterList(self.library.assetsList, filterWord)
             for itemName in filteredItems:
                 item = QtWidgets.QListWidgetItem(itemName)
-                thumbPath = self.library.getAssetThumbnail(itemName)
-
-
-                icon = QtGui.QIcon(thumbPath)
-
-                item.setIcon(icon)
-
+                pixmap = self._cachedPixmap(self._thumbnailKey(itemName))
+                item.setIcon(QtGui.QIcon(pixmap) if pixmap else placeholderIcon)
                 self.assets_listWidget.addItem(item)
+                self._iconItems[itemName] = item
+            self._scheduleThumbnails()
 
         else:
             self.assets_listWidget.setViewMode(QtWidgets.QListWidget.ListMode)
@@ -1532,6 +1785,82 @@ class LibraryTab(QtWidgets.QWidget):
 
 
 
+    def _thumbnailKey(self, assetName):
+        # straight from the catalog model, called for every listed asset
+        return assetName, self.library.assets[assetName]["thumbMtime"], self.thumbnailSize
+
+    def _cachedPixmap(self, key):
+        pixmap = self._pixmapCache.pop(key, None)
+        if pixmap is not None:
+            # re-insert as the most recently used
+            self._pixmapCache[key] = pixmap
+        return pixmap
+
+    def _scheduleThumbnails(self, *args):
+        if self.viewModeState == 1:
+            self._thumbnailRequestTimer.start(50)
+
+    def _visibleItems(self):
+        """Returns the icon view items intersecting the viewport, in the display order"""
+        viewRect = self.assets_listWidget.viewport().rect()
+        visible = []
+        for row in range(self.assets_listWidget.count()):
+            item = self.assets_listWidget.item(row)
+            if self.assets_listWidget.visualItemRect(item).intersects(viewRect):
+                visible.append(item)
+            elif visible:
+                # items are laid out in order, nothing after the visible block is visible
+                break
+        return visible
+
+    def _requestThumbnails(self):
+        """Starts loading the thumbnails of the visible items which are not in the memory cache"""
+        wanted = []
+        for item in self._visibleItems():
+            assetName = str(item.text())
+            key = self._thumbnailKey(assetName)
+            if key[1] is None or key in self._pixmapCache:
+                continue
+            wanted.append(key)
+        # loaders with nothing visible left are not needed anymore, the others keep going
+        busy = set(self._thumbnailsInFlight[key] for key in wanted if key in self._thumbnailsInFlight)
+        for loader in self._thumbnailLoaders:
+            if loader not in busy:
+                loader.stop()
+        self._thumbnailsInFlight = dict((key, loader) for key, loader in self._thumbnailsInFlight.items()
+                                        if loader in busy)
+        jobs = [(key[0], self.library.getAssetThumbnail(key[0]), key[1], key[2])
+                for key in wanted if key not in self._thumbnailsInFlight]
+        if not jobs:
+            return
+        loader = ThumbnailLoader(jobs, self._thumbnailCacheDir)
+        self._thumbnailLoaders.append(loader)
+        for assetName, thumbPath, thumbMtime, size in jobs:
+            self._thumbnailsInFlight[(assetName, thumbMtime, size)] = loader
+        loader.start()
+        self._thumbnailPollTimer.start(50)
+
+    def _collectThumbnails(self):
+        """Sets the loaded thumbnails to the items. Called by the poll timer"""
+        for loader in list(self._thumbnailLoaders):
+            loaded, finished = loader.collect()
+            for assetName, key, image in loaded:
+                self._thumbnailsInFlight.pop(key, None)
+                pixmap = QtGui.QPixmap.fromImage(image)
+                self._pixmapCache[key] = pixmap
+                item = self._iconItems.get(assetName)
+                if item is not None:
+                    item.setIcon(QtGui.QIcon(pixmap))
+            if finished:
+                self._thumbnailLoaders.remove(loader)
+                # thumbnails which could not be loaded can be requested again
+                self._thumbnailsInFlight = dict((key, owner) for key, owner in self._thumbnailsInFlight.items()
+                                                if owner is not loader)
+        while len(self._pixmapCache) > PIXMAP_CACHE_SIZE:
+            self._pixmapCache.popitem(last=False)
+        if not self._thumbnailLoaders:
+            self._thumbnailPollTimer.stop()
+
     def onMergeAsset(self):
         assetName = self._getCurrentAssetName()
         if assetName:
@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------------------------
+# Copyright (c) 2017-2018, Arda Kutlu (ardakutlu@gmail.com)
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#  - Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+#  - Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+#  - Neither the name of the software nor the names of its contributors
+#    may be used to endorse or promote products derived from this software
+#    without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# -----------------------------------------------------------------------------
+
+
+"""
+Change notifications for database folders.
+
+A ChangeFeed keeps a snapshot of the files under the watched folders and reports the
+difference as ("added" | "changed" | "removed", absolute path) events on each poll().
+On every poll the folder mtimes are compared with the snapshot, so only the folders
+touched since the last poll are listed again. On Linux, inotify marks the folders
+touched by local processes as well, which also catches files re-written in place.
+Changes made by other workstations on a network share only show up in the folder
+mtimes, the polling sweep covers them.
+"""
+
+import os
+import sys
+import struct
+import logging
+
+try:
+    import ctypes
+    import ctypes.util
+except ImportError:
+    ctypes = None
+
+__author__ = "Arda Kutlu"
+__copyright__ = "Copyright 2018, Tik Manager Change Feed"
+__credits__ = []
+__license__ = "GPL"
+__maintainer__ = "Arda Kutlu"
+__email__ = "ardakutlu@gmail.com"
+__status__ = "Development"
+
+logging.basicConfig()
+logger = logging.getLogger('changeFeed')
+logger.setLevel(logging.WARNING)
+
+ADDED = "added"
+CHANGED = "changed"
+REMOVED = "removed"
+
+
+class _Inotify(object):
+    """Minimal ctypes binding of linux inotify. Reports the folders with activity"""
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | \
+           IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+    HEADER = struct.Struct("iIII")
+
+    def __init__(self):
+        libcName = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(libcName, use_errno=True)
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches = {}  # watch descriptor: folder
+        self._folders = {}  # folder: watch descriptor
+
+    @classmethod
+    def isAvailable(cls):
+        if ctypes is None or not sys.platform.startswith("linux"):
+            return False
+        libcName = ctypes.util.find_library("c")
+        if not libcName:
+            return False
+        return hasattr(ctypes.CDLL(libcName), "inotify_init1")
+
+    def addWatch(self, folder):
+        if folder in self._folders:
+            return
+        path = folder.encode(sys.getfilesystemencoding()) if not isinstance(folder, bytes) else folder
+        wd = self._libc.inotify_add_watch(self._fd, path, self.MASK)
+        if wd < 0:
+            # out of watches or no permission, the polling sweep still covers the folder
+            logger.debug("Cannot watch %s" % folder)
+            return
+        self._watches[wd] = folder
+        self._folders[folder] = wd
+
+    def removeWatch(self, folder):
+        wd = self._folders.pop(folder, None)
+        if wd is not None:
+            self._watches.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def read(self):
+        """Returns the set of folders with activity since the last read. None means the queue is overflown"""
+        touched = set()
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except OSError:
+                # EAGAIN, nothing left to read
+                break
+            if not data:
+                break
+            offset = 0
+            while offset + self.HEADER.size <= len(data):
+                wd, mask, cookie, length = self.HEADER.unpack_from(data, offset)
+                offset += self.HEADER.size + length
+                if mask & self.IN_Q_OVERFLOW:
+                    return None
+                if mask & self.IN_IGNORED:
+                    folder = self._watches.pop(wd, None)
+                    self._folders.pop(folder, None)
+                    continue
+                folder = self._watches.get(wd)
+                if folder:
+                    touched.add(folder)
+        return touched
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self._watches = {}
+        self._folders = {}
+
+
+class ChangeFeed(object):
+    """Reports added, changed and removed files under the watched folders"""
+    def __init__(self, folders, extensions=(".json",), recursive=True, useInotify=True):
+        """
+        :param folders: (List) Absolute paths of the folders to watch
+        :param extensions: (Tuple) Only the files with these extensions are reported
+        :param recursive: (Bool) If True sub folders are watched as well
+        :param useInotify: (Bool) Use inotify where available. Polling is used otherwise
+        """
+        self.folders = [os.path.normpath(f) for f in folders]
+        self.extensions = tuple(extensions)
+        self.recursive = recursive
+        self._folderMtimes = {}
+        self._files = {}  # path: (mtime, size)
+        self._inotify = None
+        if useInotify and _Inotify.isAvailable():
+            try:
+                self._inotify = _Inotify()
+            except OSError as e:
+                logger.debug("inotify is not available, falling back to polling\n%s" % e)
+        for folder in self.folders:
+            self._scanFolder(folder, [])
+
+    @property
+    def backend(self):
+        return "inotify" if self._inotify else "polling"
+
+    def _listFolder(self, folder):
+        """Returns ({file path: (mtime, size)}, [sub folders]) for the folder"""
+        files = {}
+        subFolders = []
+        try:
+            scandir = os.scandir
+        except AttributeError: # python 2.7 compatibility
+            for name in os.listdir(folder):
+                path = os.path.join(folder, name)
+                if os.path.isdir(path):
+                    subFolders.append(path)
+                elif name.endswith(self.extensions):
+                    st = os.stat(path)
+                    files[path] = (st.st_mtime, st.st_size)
+            return files, subFolders
+        for entry in scandir(folder):
+            if entry.is_dir():
+                subFolders.append(entry.path)
+            elif entry.name.endswith(self.extensions):
+                st = entry.stat()
+                files[entry.path] = (st.st_mtime, st.st_size)
+        return files, subFolders
+
+    def _scanFolder(self, folder, events):
+        """Compares the folder content with the snapshot, appending the differences to events"""
+        try:
+            mtime = os.stat(folder).st_mtime
+            files, subFolders = self._listFolder(folder)
+        except OSError:
+            self._dropFolder(folder, events)
+            return
+        if self._inotify and folder not in self._folderMtimes:
+            self._inotify.addWatch(folder)
+        self._folderMtimes[folder] = mtime
+
+        for path in [p for p in self._files if os.path.dirname(p) == folder and p not in files]:
+            del self._files[path]
+            events.append((REMOVED, path))
+        for path, stamp in files.items():
+            old = self._files.get(path)
+            if old is None:
+                events.append((ADDED, path))
+            elif old != stamp:
+                events.append((CHANGED, path))
+            self._files[path] = stamp
+
+        if not self.recursive:
+            return
+        for subFolder in subFolders:
+            if subFolder not in self._folderMtimes:
+                self._scanFolder(subFolder, events)
+        # sub folders which are gone
+        for known in [f for f in self._folderMtimes if os.path.dirname(f) == folder and f not in subFolders]:
+            self._dropFolder(known, events)
+
+    def _dropFolder(self, folder, events):
+        prefix = folder + os.sep
+        for path in [p for p in self._files if p.startswith(prefix)]:
+            del self._files[path]
+            events.append((REMOVED, path))
+        for known in [f for f in self._folderMtimes if f == folder or f.startswith(prefix)]:
+            del self._folderMtimes[known]
+            if self._inotify:
+                self._inotify.removeWatch(known)
+
+    def poll(self):
+        """
+        Checks the watched folders for changes since the last poll
+        :return: (List) of (event, absolute file path) tuples. event is one of ADDED, CHANGED, REMOVED
+        """
+        dirty = set()
+        if self._inotify:
+            touched = self._inotify.read()
+            if touched is None:
+                # events are lost, check everything
+                dirty.update(self._folderMtimes)
+            else:
+                dirty.update(touched)
+        for folder, mtime in list(self._folderMtimes.items()):
+            try:
+                if os.stat(folder).st_mtime != mtime:
+                    dirty.add(folder)
+            except OSError:
+                dirty.add(folder)
+        for folder in self.folders:
+            if folder not in self._folderMtimes:
+                # watched root is created after the feed
+                dirty.add(folder)
+
+        events = []
+        # parents first, so the removed folders are dropped only once
+        for folder in sorted(dirty, key=len):
+            if folder in self._folderMtimes or folder in self.folders:
+                self._scanFolder(folder, events)
+        return events
+
+    def close(self):
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
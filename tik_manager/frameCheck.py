@@ -0,0 +1,336 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------------------------
+# Copyright (c) 2017-2018, Arda Kutlu (ardakutlu@gmail.com)
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#  - Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+#  - Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+#  - Neither the name of the software nor the names of its contributors
+#    may be used to endorse or promote products derived from this software
+#    without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# -----------------------------------------------------------------------------
+
+
+"""
+Integrity check for rendered image sequences.
+
+Flags the missing frames, zero byte frames, frames with an outlier size compared to the
+rest of the sequence and frames with an unreadable header or footer for the common
+formats (EXR, PNG, JPG, TGA and TIF). Sizes come from the stat data the pyseq walker
+already collected, only the header bytes are read from the disk. Reports are cached
+per sequence modification time, checking an unchanged sequence again is free.
+
+Can be used without the UI:
+
+    python frameCheck.py /path/to/renders --recursive
+"""
+
+import os
+import struct
+import logging
+import threading
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+
+__author__ = "Arda Kutlu"
+__copyright__ = "Copyright 2018, Tik Manager Frame Check"
+__credits__ = []
+__license__ = "GPL"
+__maintainer__ = "Arda Kutlu"
+__email__ = "ardakutlu@gmail.com"
+__status__ = "Development"
+
+logging.basicConfig()
+logger = logging.getLogger('frameCheck')
+logger.setLevel(logging.WARNING)
+
+# frames smaller or bigger than these ratios of the median frame size are flagged
+LOW_SIZE_RATIO = 0.5
+HIGH_SIZE_RATIO = 3.0
+# outliers are meaningless for very short sequences
+MIN_FRAMES_FOR_OUTLIERS = 5
+# least recently checked reports are dropped above this count
+MAX_CACHED_REPORTS = 2000
+TAIL_SIZE = 64
+
+
+def _checkExr(head, tail):
+    if head[:4] != b"\x76\x2f\x31\x01":
+        return "bad exr header"
+    return None
+
+
+def _checkPng(head, tail):
+    if head[:8] != b"\x89PNG\r\n\x1a\n":
+        return "bad png header"
+    if b"IEND" not in tail:
+        return "truncated png"
+    return None
+
+
+def _checkJpg(head, tail):
+    if head[:3] != b"\xff\xd8\xff":
+        return "bad jpg header"
+    # some writers pad the file after the end of image marker
+    if b"\xff\xd9" not in tail:
+        return "truncated jpg"
+    return None
+
+
+def _checkTga(head, tail):
+    if len(head) < 18:
+        return "bad tga header"
+    colorMapType, imageType = struct.unpack("<BB", head[1:3])
+    width, height, depth = struct.unpack("<HHB", head[12:17])
+    if colorMapType not in (0, 1) or imageType not in (1, 2, 3, 9, 10, 11):
+        return "bad tga header"
+    if not width or not height or depth not in (8, 15, 16, 24, 32):
+        return "bad tga header"
+    return None
+
+
+def _checkTif(head, tail):
+    if head[:4] not in (b"II*\x00", b"MM\x00*", b"II+\x00", b"MM\x00+"):
+        return "bad tif header"
+    return None
+
+
+HEADER_CHECKS = {".exr": _checkExr,
+                 ".png": _checkPng,
+                 ".jpg": _checkJpg,
+                 ".jpeg": _checkJpg,
+                 ".tga": _checkTga,
+                 ".tif": _checkTif,
+                 ".tiff": _checkTif}
+
+
+def checkHeader(filePath, size):
+    """
+    Reads only the first and the last bytes of the image file and validates them
+    :param filePath: (String) Absolute path of the image
+    :param size: (Integer) Size of the file, known from the stat data
+    :return: (String) The problem or None if the file looks fine or the format is unknown
+    """
+    check = HEADER_CHECKS.get(os.path.splitext(filePath)[1].lower())
+    if not check:
+        return None
+    try:
+        with open(filePath, "rb") as f:
+            head = f.read(32)
+            if size > TAIL_SIZE:
+                f.seek(size - TAIL_SIZE)
+            tail = f.read(TAIL_SIZE)
+    except (IOError, OSError) as e:
+        return "unreadable (%s)" % e
+    return check(head, tail)
+
+
+def _toRanges(frames):
+    """Converts a sorted list of frame numbers to (start, end) tuples"""
+    ranges = []
+    for frame in frames:
+        if ranges and ranges[-1][1] == frame - 1:
+            ranges[-1][1] = frame
+        else:
+            ranges.append([frame, frame])
+    return [tuple(x) for x in ranges]
+
+
+def formatReport(report):
+    """Returns the report as readable lines"""
+    lines = []
+    for start, end in report["missing"]:
+        lines.append("missing frame%s %s" % ("s" if start != end else "", start if start == end else "%s-%s" % (start, end)))
+    for name in report["empty"]:
+        lines.append("zero byte - %s" % name)
+    for name, size, median in report["outliers"]:
+        lines.append("outlier size %s bytes (median %s) - %s" % (size, median, name))
+    for name, problem in report["corrupted"]:
+        lines.append("%s - %s" % (problem, name))
+    return lines
+
+
+class FrameChecker(object):
+    """Checks pyseq sequences in parallel and caches the reports per sequence modification time"""
+    def __init__(self, threads=8):
+        self.threads = max(1, threads)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clearCache(self):
+        with self._lock:
+            self._cache = OrderedDict()
+
+    @staticmethod
+    def _key(sequence):
+        return sequence.path()
+
+    @staticmethod
+    def _knownMtime(sequence):
+        """Returns the latest mtime of the sequence if it is known without a stat call, else None"""
+        mtime = getattr(sequence, "_mtime", None)
+        if mtime is not None:
+            return mtime
+        stats = [getattr(item, "_stat", None) for item in sequence]
+        if stats and all(stats):
+            return max(st.st_mtime for st in stats)
+        return None
+
+    def _getCached(self, sequence, mtime):
+        """Returns the cached report if the sequence did not change since, else None"""
+        key = self._key(sequence)
+        with self._lock:
+            cached = self._cache.pop(key, None)
+            if cached is None:
+                return None
+            self._cache[key] = cached
+        if cached["mtime"] == mtime and cached["frames"] == len(sequence):
+            return cached
+        return None
+
+    def _setCached(self, report):
+        with self._lock:
+            self._cache.pop(report["path"], None)
+            self._cache[report["path"]] = report
+            while len(self._cache) > MAX_CACHED_REPORTS:
+                self._cache.popitem(last=False)
+
+    def _inspect(self, sequence):
+        """
+        Collects everything which does not need a disk read
+        :return: (Tuple) (report, [(name, path, size), ...] of the frames to check the headers of)
+        """
+        frames = []
+        latest = 0
+        report = {"sequence": str(sequence),
+                  "path": sequence.path(),
+                  "frames": len(sequence),
+                  "missing": [],
+                  "empty": [],
+                  "outliers": [],
+                  "corrupted": []}
+        for item in sequence:
+            try:
+                st = item.stat
+            except OSError:
+                report["corrupted"].append((item.name, "deleted"))
+                continue
+            latest = max(latest, st.st_mtime)
+            if st.st_size == 0:
+                report["empty"].append(item.name)
+            else:
+                frames.append((item.name, item.path, st.st_size))
+        report["mtime"] = latest
+        if len(sequence) > 1:
+            report["missing"] = _toRanges(sequence.missing())
+
+        if len(frames) >= MIN_FRAMES_FOR_OUTLIERS:
+            sizes = sorted(x[2] for x in frames)
+            median = sizes[len(sizes) // 2]
+            for name, path, size in frames:
+                if size < median * LOW_SIZE_RATIO or size > median * HIGH_SIZE_RATIO:
+                    report["outliers"].append((name, size, median))
+        return report, frames
+
+    def checkSequences(self, sequences, progress=None, cancelEvent=None):
+        """
+        Checks the sequences. Headers of all frames are read concurrently
+        :param sequences: (List) pyseq Sequence or FrameSequence objects
+        :param progress: (Callable) Called with (frames done, frames total)
+        :param cancelEvent: (threading.Event) Check stops if the event is set. Reports of the
+                        unfinished sequences are not returned
+        :return: (List) Report dictionaries in the order of the sequences. Check the 'ok' key
+        """
+        reports = [None] * len(sequences)
+        pending = {}
+        tasks = []
+        for index, sequence in enumerate(sequences):
+            # the frames are not stat'ed again when the sequence already knows its mtime
+            mtime = self._knownMtime(sequence)
+            cached = self._getCached(sequence, mtime) if mtime is not None else None
+            if cached is None:
+                report, frames = self._inspect(sequence)
+                if mtime is None:
+                    cached = self._getCached(sequence, report["mtime"])
+            if cached:
+                reports[index] = cached
+                continue
+            pending[index] = report
+            tasks += [(index, name, path, size) for name, path, size in frames]
+
+        def run(task):
+            index, name, path, size = task
+            return index, name, checkHeader(path, size)
+
+        done = 0
+        total = len(tasks)
+        cancelled = False
+        if tasks:
+            pool = ThreadPool(min(self.threads, total))
+            try:
+                for index, name, problem in pool.imap_unordered(run, tasks, chunksize=16):
+                    if problem:
+                        pending[index]["corrupted"].append((name, problem))
+                    done += 1
+                    if progress:
+                        progress(done, total)
+                    if cancelEvent is not None and cancelEvent.is_set():
+                        cancelled = True
+                        pool.terminate()
+                        break
+            finally:
+                pool.close()
+                pool.join()
+        if cancelled:
+            return [x for x in reports if x]
+
+        for index, report in pending.items():
+            report["corrupted"].sort()
+            report["ok"] = not (report["missing"] or report["empty"] or report["outliers"] or report["corrupted"])
+            reports[index] = report
+            self._setCached(report)
+        return reports
+
+
+if __name__ == '__main__':
+    import sys
+    import argparse
+    import pyseq
+    parser = argparse.ArgumentParser(description="Checks the image sequences under the folder for bad frames")
+    parser.add_argument("folder", help="folder to search the sequences in")
+    parser.add_argument("--recursive", action="store_true", help="search the sub folders too")
+    args = parser.parse_args()
+    sequenceList = []
+    for root, dirs, seqs in pyseq.walk(args.folder, level=-1 if args.recursive else 1,
+                                       includes=tuple("*%s" % x for x in HEADER_CHECKS), threads=4):
+        sequenceList += seqs
+    failed = 0
+    for report in FrameChecker().checkSequences(sequenceList):
+        if report["ok"]:
+            continue
+        failed += 1
+        print(report["path"])
+        for line in formatReport(report):
+            print("    %s" % line)
+    print("%s of %s sequence(s) have problems" % (failed, len(sequenceList)))
+    sys.exit(1 if failed else 0)
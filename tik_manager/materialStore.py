@@ -0,0 +1,350 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------------------------
+# Copyright (c) 2017-2018, Arda Kutlu (ardakutlu@gmail.com)
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#  - Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+#  - Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+#  - Neither the name of the software nor the names of its contributors
+#    may be used to endorse or promote products derived from this software
+#    without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# -----------------------------------------------------------------------------
+
+
+
+"""
+Content addressed storage for the project materials.
+
+Every file ingested through the store is hashed and kept once under the blob folder,
+named after its checksum. The material files themselves are hardlinks to the blobs, or
+plain copies where the file system does not support hardlinks. The same reference image
+dropped into several sub-projects takes the disk space only once.
+
+The blobs referenced by each material are kept in a references file inside the store.
+Blobs which are not referenced by any material anymore are removed with collectGarbage.
+
+Hardlinks share the content, so the blobs are made read-only once they are stored. A
+material file cannot be edited in place, which would change all the materials using the
+same blob. Applications saving through a temporary file (most of them) break the link
+instead, which is safe. Use removeFile and removeTree to delete the material files.
+"""
+
+import os
+import stat
+import json
+import shutil
+import time
+import logging
+import threading
+
+import tik_manager.sequenceTransfer as sequenceTransfer
+
+__author__ = "Arda Kutlu"
+__copyright__ = "Copyright 2018, Tik Manager Material Store"
+__credits__ = []
+__license__ = "GPL"
+__maintainer__ = "Arda Kutlu"
+__email__ = "ardakutlu@gmail.com"
+__status__ = "Development"
+
+logging.basicConfig()
+logger = logging.getLogger('materialStore')
+logger.setLevel(logging.WARNING)
+
+STORE_VERSION = 1
+REFERENCES_FILE = "references.json"
+# blobs touched more recently than this are kept by the garbage collector,
+# they may belong to an ingest which is not registered yet
+GC_GRACE_PERIOD = 3600
+
+# one lock per store folder, shared by all the BlobStore objects of the process
+_storeLocks = {}
+_storeLocksGuard = threading.Lock()
+
+
+def _storeLock(storeDir):
+    with _storeLocksGuard:
+        return _storeLocks.setdefault(os.path.normcase(storeDir), threading.Lock())
+
+
+_WRITE_BITS = stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH
+
+
+def _makeReadOnly(filePath):
+    try:
+        mode = os.stat(filePath).st_mode
+        if mode & _WRITE_BITS:
+            os.chmod(filePath, mode & ~_WRITE_BITS)
+    except OSError as e:
+        # blobs of other users are made read-only by the ingest storing them
+        logger.debug("Cannot make the blob read-only %s\n%s" % (filePath, e))
+
+
+def removeFile(filePath):
+    """Deletes the file. Windows refuses to delete the read-only material files and blobs
+    without clearing the flag first"""
+    try:
+        os.remove(filePath)
+    except OSError:
+        if os.name != "nt" or not os.path.isfile(filePath):
+            raise
+        os.chmod(filePath, stat.S_IWRITE)
+        os.remove(filePath)
+
+
+def removeTree(folder):
+    """Deletes the folder with its content, including the read-only files. See removeFile"""
+    def onError(func, path, excInfo):
+        if os.name == "nt" and func in (os.remove, os.unlink):
+            os.chmod(path, stat.S_IWRITE)
+            func(path)
+        else:
+            raise excInfo[1]
+    shutil.rmtree(folder, onerror=onError)
+
+
+def formatBytes(size):
+    """Returns the size in a human readable form"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024.0:
+            return "%.1f %s" % (size, unit) if unit != "B" else "%d B" % size
+        size /= 1024.0
+    return "%.1f TB" % size
+
+
+class BlobStore(object):
+    """Keeps each unique file content once and materialises the material files from it"""
+    def __init__(self, storeDir, root):
+        """
+        :param storeDir: (String) Absolute path of the blob store folder
+        :param root: (String) Project folder. Materials are registered relative to it
+        """
+        self.storeDir = os.path.normpath(storeDir)
+        self.root = os.path.normpath(root)
+        self.referencesFile = os.path.join(self.storeDir, REFERENCES_FILE)
+        self._lock = _storeLock(self.storeDir)
+
+    def blobPath(self, digest):
+        return os.path.join(self.storeDir, digest[:2], digest)
+
+    def materialKey(self, materialPath):
+        """Returns the project relative key of the material"""
+        return os.path.relpath(os.path.normpath(materialPath), self.root).replace("\\", "/")
+
+    def _loadReferences(self):
+        try:
+            with open(self.referencesFile, "r") as f:
+                references = json.load(f)
+        except (IOError, OSError, ValueError):
+            references = None
+        if not isinstance(references, dict) or references.get("version") != STORE_VERSION:
+            references = {"version": STORE_VERSION, "blobs": {}, "materials": {}}
+        return references
+
+    def _dumpReferences(self, references):
+        if not os.path.isdir(self.storeDir):
+            os.makedirs(self.storeDir)
+        # unique per writer, other users may save the references at the same time
+        name, ext = os.path.splitext(self.referencesFile)
+        tempFile = "{0}.{1}_{2}.tmp".format(name, os.getpid(), threading.current_thread().ident)
+        try:
+            with open(tempFile, "w") as f:
+                json.dump(references, f, indent=1, sort_keys=True)
+                f.flush()
+                os.fsync(f.fileno())
+            sequenceTransfer.replaceFile(tempFile, self.referencesFile)
+        except:
+            if os.path.isfile(tempFile):
+                os.remove(tempFile)
+            raise
+
+    def _materialise(self, blob, dst):
+        """Hardlinks the blob to the target, copies it if linking is not possible.
+        Returns True if it is linked"""
+        # the links share the permissions, editing any of them in place must not change the blob
+        _makeReadOnly(blob)
+        tempPath = dst + sequenceTransfer.TEMP_SUFFIX
+        try:
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+            os.link(blob, tempPath)
+            sequenceTransfer.replaceFile(tempPath, dst)
+            return True
+        except (OSError, AttributeError):
+            # cross device, unsupported file system or os.link missing (python 2 on Windows)
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+        sequenceTransfer.copyFile(blob, dst)
+        return False
+
+    def ingest(self, pairs, materialPath, copier=None, progress=None, cancelEvent=None):
+        """
+        Stores the source files and materialises the targets from the store
+        :param pairs: (List) (source path, target path) tuples of a single material
+        :param materialPath: (String) Absolute path of the material file or folder the targets belong to
+        :param copier: (sequenceTransfer.SequenceCopier) Copies the new blobs. A new one is used if None
+        :param progress: (Callable) Called with (bytes done, bytes total) while hashing and storing
+        :param cancelEvent: (threading.Event) Ingest stops if the event is set
+        :return: (Dictionary) {"files": int, "bytes": int, "storedBytes": int, "savedBytes": int,
+                               "linked": int, "copied": int, "failed": [(src, error)], "cancelled": bool}
+        """
+        result = {"files": len(pairs), "bytes": 0, "storedBytes": 0, "savedBytes": 0,
+                  "linked": 0, "copied": 0, "failed": [], "cancelled": False}
+        hashes = sequenceTransfer.hashFiles([src for src, _ in pairs], progress=progress, cancelEvent=cancelEvent)
+        if cancelEvent is not None and cancelEvent.is_set():
+            result["cancelled"] = True
+            return result
+
+        # first source of each missing content is copied into the store
+        newBlobs = {}
+        for src, _ in pairs:
+            size, digest = hashes.get(src, (None, None))
+            if digest is None:
+                result["failed"].append((src, "source cannot be read"))
+                continue
+            if digest not in newBlobs and not os.path.isfile(self.blobPath(digest)):
+                newBlobs[digest] = src
+        for digest in newBlobs:
+            blobDir = os.path.dirname(self.blobPath(digest))
+            if not os.path.isdir(blobDir):
+                os.makedirs(blobDir)
+        if newBlobs:
+            copier = copier or sequenceTransfer.SequenceCopier()
+            copyResult = copier.copyFiles([(src, self.blobPath(digest)) for digest, src in newBlobs.items()],
+                                          progress=progress)
+            result["failed"].extend(copyResult["failed"])
+            if copyResult["cancelled"]:
+                result["cancelled"] = True
+                return result
+
+        digests = set()
+        fileDigests = []
+        copiedBytes = 0
+        failedSources = set(src for src, _ in result["failed"])
+        for src, dst in pairs:
+            size, digest = hashes.get(src, (None, None))
+            if digest is None:
+                continue  # already reported
+            blob = self.blobPath(digest)
+            if not os.path.isfile(blob):
+                # storing failed, or the blob is collected meanwhile
+                if src not in failedSources:
+                    result["failed"].append((src, "blob missing"))
+                continue
+            try:
+                linked = self._materialise(blob, dst)
+            except (IOError, OSError) as e:
+                result["failed"].append((src, str(e)))
+                continue
+            digests.add(digest)
+            fileDigests.append(digest)
+            result["bytes"] += size
+            if linked:
+                result["linked"] += 1
+            else:
+                result["copied"] += 1
+                copiedBytes += size
+        storedBytes = sum(hashes[src][0] for digest, src in newBlobs.items() if os.path.isfile(self.blobPath(digest)))
+        result["storedBytes"] = storedBytes
+        result["savedBytes"] = max(0, result["bytes"] - storedBytes - copiedBytes)
+
+        with self._lock:
+            references = self._loadReferences()
+            key = self.materialKey(materialPath)
+            entry = references["materials"].setdefault(key, {"digests": [], "copiedBytes": 0})
+            entry["digests"].extend(fileDigests)
+            entry["copiedBytes"] += copiedBytes
+            for src, _ in pairs:
+                size, digest = hashes.get(src, (None, None))
+                if digest in digests:
+                    references["blobs"][digest] = size
+            self._dumpReferences(references)
+        return result
+
+    def release(self, materialPath):
+        """Removes the references of the material. Returns True if the material was in the store"""
+        with self._lock:
+            references = self._loadReferences()
+            if references["materials"].pop(self.materialKey(materialPath), None) is None:
+                return False
+            self._dumpReferences(references)
+        return True
+
+    def collectGarbage(self):
+        """
+        Deletes the blobs which are not referenced by any material
+        :return: (Tuple) (number of deleted blobs, freed bytes)
+        """
+        if not os.path.isdir(self.storeDir):
+            return 0, 0
+        deleted, freed = 0, 0
+        now = time.time()
+        with self._lock:
+            references = self._loadReferences()
+            referenced = set()
+            for entry in references["materials"].values():
+                referenced.update(entry["digests"])
+            for prefix in os.listdir(self.storeDir):
+                prefixDir = os.path.join(self.storeDir, prefix)
+                if not os.path.isdir(prefixDir):
+                    continue
+                for digest in os.listdir(prefixDir):
+                    if digest in referenced or digest.endswith(sequenceTransfer.TEMP_SUFFIX):
+                        continue
+                    blob = os.path.join(prefixDir, digest)
+                    try:
+                        blobStat = os.stat(blob)
+                        # linking a material to the blob updates its ctime too
+                        if now - blobStat.st_ctime < GC_GRACE_PERIOD:
+                            continue
+                        removeFile(blob)
+                    except OSError as e:
+                        logger.warning("Cannot remove blob %s\n%s" % (blob, e))
+                        continue
+                    references["blobs"].pop(digest, None)
+                    deleted += 1
+                    # the space is given back only if no material file is linked to it anymore
+                    if blobStat.st_nlink <= 1:
+                        freed += blobStat.st_size
+            self._dumpReferences(references)
+        return deleted, freed
+
+    def report(self):
+        """
+        Returns the storage statistics of the store
+        :return: (Dictionary) {"materials": int, "blobs": int, "referencedBytes": int, "storedBytes": int,
+                               "savedBytes": int}
+        """
+        references = self._loadReferences()
+        blobs = references["blobs"]
+        referencedBytes = 0
+        copiedBytes = 0
+        for entry in references["materials"].values():
+            referencedBytes += sum(blobs.get(digest, 0) for digest in entry["digests"])
+            copiedBytes += entry["copiedBytes"]
+        storedBytes = sum(blobs.values())
+        return {"materials": len(references["materials"]),
+                "blobs": len(blobs),
+                "referencedBytes": referencedBytes,
+                "storedBytes": storedBytes,
+                "savedBytes": max(0, referencedBytes - storedBytes - copiedBytes)}
@@ -119,6 +119,8 @@ from glob import glob
 #     from Qt import QtWidgets, QtCore, QtGui
 
 from tik_manager.SmRoot import RootManager
+import tik_manager.sequenceTransfer as sequenceTransfer
+import tik_manager.materialStore as materialStore
 
 # import pyseq as seq
 
@@ -127,6 +129,8 @@ import datetime
 # from shutil import copyfile
 import shutil
 import logging
+import threading
+from collections import OrderedDict
 
 ## DO NOT REMOVE THIS:
 import tik_manager.iconsSource as icons
@@ -146,6 +150,8 @@ __status__ = "Development"
 
 
 
+MATERIAL_INDEX_VERSION = 1
+
 ColorStyleDict = {"Storyboard": "border: 2px solid #ff7b00",
              "Brief": "border: 2px solid #faff00",
              "Reference": "border: 2px solid #72ff00",
@@ -450,8 +456,13 @@ class QtImageViewer(QtWidgets.QGraphicsView):
 
 class CopyProgress(QtWidgets.QWidget):
     """Custom Widget for visualizing progress of file transfer"""
+    # PyInstaller and Standalone version compatibility
+    if FORCE_QT5:
+        progressChanged = QtCore.pyqtSignal(object, object)
+    else:
+        progressChanged = Qt.QtCore.Signal(object, object)
 
-    def __init__(self, logPath=None):
+    def __init__(self, logPath=None, workers=4, blobStore=None):
         super(CopyProgress, self).__init__()
         self.logPath = logPath
         self.logger = None
@@ -461,6 +472,14 @@ class CopyProgress(QtWidgets.QWidget):
         self.terminated = False
         self.cancelAll = False
         self.errorFlag = False
+        self.copier = sequenceTransfer.SequenceCopier(workers=workers)
+        # files are deduplicated through the content addressed store if given
+        self.blobStore = blobStore
+        self.dedupResult = {"bytes": 0, "storedBytes": 0, "savedBytes": 0}
+        self._cancelEvent = threading.Event()
+        self._overallDone = 0
+        self._overallTotal = 0
+        self.progressChanged.connect(self.onProgress)
         # self.copyfileobj(src=self.src, dst=self.dest)
 
     def build_ui(self):
@@ -569,40 +588,86 @@ class CopyProgress(QtWidgets.QWidget):
     #     except:
     #         pass
 
+    def onProgress(self, done, total):
+        """Updates the progress bars with the bytes written for the current item"""
+        self.pb.setValue(int(100 * done / total) if total else 100)
+        if self._overallTotal:
+            self.pbOverall.setValue(int(100 * (self._overallDone + done) / self._overallTotal))
+
+    def _waitFor(self, function, cancel):
+        """Runs the function in a thread and keeps the window responsive until it returns"""
+        worker = threading.Thread(target=function)
+        worker.start()
+        while worker.is_alive():
+            QtWidgets.QApplication.processEvents()
+            if self.terminated or self.cancelAll:
+                cancel()
+            worker.join(0.05)
+        QtWidgets.QApplication.processEvents()
+
+    def _cancel(self):
+        self._cancelEvent.set()
+        self.copier.cancel()
+
+    def _copyPairs(self, pairs, stats=None, material=None):
+        """
+        Copies the (source, target) file pairs concurrently. Returns True if all files are copied
+        :param material: (String) Absolute path of the material the targets belong to. Required for deduplication
+        """
+        self.pb.setValue(0)
+        self.terminated = False  # reset the termination status
+        self._cancelEvent.clear()
+        result = {}
+
+        def run():
+            try:
+                if self.blobStore and material:
+                    result.update(self.blobStore.ingest(pairs, material, copier=self.copier,
+                                                        progress=self.progressChanged.emit,
+                                                        cancelEvent=self._cancelEvent))
+                    for key in self.dedupResult:
+                        self.dedupResult[key] += result[key]
+                else:
+                    result.update(self.copier.copyFiles(pairs, progress=self.progressChanged.emit, stats=stats))
+            except Exception as e:
+                logger.error("Copy failed\n%s" % e)
+
+        self._waitFor(run, self._cancel)
+        for src, error in result.get("failed", []):
+            logger.error("Cannot copy %s\n%s" % (src, error))
+        if not result or result["failed"] or result["cancelled"]:
+            self.errorFlag = True
+            return False
+        return True
+
     def masterCopy(self, srcList, dst):
-        # logName = "fileTransferLog_{0}.txt".format(now.strftime("%Y.%m.%d.%H.%M"))
-        # logFile = os.path.join(logPath, logName)
-        # self.logger = self.setupLogger(logFile)
-        totalCount = len(srcList)
-        current = 0
+        # the file lists and sizes of all items are collected once, before anything is copied
+        manifest = {}
+        for sel in list(srcList):
+            try:
+                if os.path.isdir(sel):
+                    manifest[sel] = sequenceTransfer.scanTree(sel)
+                else:
+                    manifest[sel] = ([], [(sel, os.path.basename(sel), os.stat(sel))])
+            except OSError as e:
+                logger.error("Cannot read %s\n%s" % (sel, e))
+                self.errorFlag = True
+                srcList = [x for x in srcList if x != sel]
+        sizes = [sum(st.st_size for _, _, st in manifest[sel][1] if st) for sel in srcList]
+        self._overallDone = 0
+        self._overallTotal = sum(sizes)
+
         copiedPathList = []
-        for sel in srcList:
+        for sel, size in zip(srcList, sizes):
             if self.cancelAll:
                 # self.safeLog("ALL CANCELED")
                 break
-            # self.logger.debug(
-            #     "---------------------------------------------\n"
-            #     "Copy Progress - {0}\n"
-            #     "---------------------------------------------".format(
-            #         sequenceData[sel]))
-            percent = (100 * current) / totalCount
-            self.pbOverall.setValue(percent)
-            current += 1
-            # tFilesList = [i.path for i in sequenceData[sel]]
-            # subPath = os.path.split(os.path.relpath(tFilesList[0], root))[0]  ## get the relative path
-            # currentDate = now.strftime("%y%m%d")
-            # targetPath = os.path.join(destination, currentDate, subPath)
 
             if os.path.isdir(sel):
                 # re-define dst starting from the folder name
                 newDst = os.path.join(dst, os.path.basename(sel))
-                # if not os.path.isdir(os.path.normpath(newDst)):
-                #     os.makedirs(os.path.normpath(newDst))
                 newDst = self.strip_accents(newDst)
-                # if not os.path.isdir(os.path.normpath(newDst)):
-                #     os.makedirs(os.path.normpath(newDst))
-
-                copiedPathList.append(self.copyFolder(src=sel, dst=newDst))
+                copiedPathList.append(self.copyFolder(src=sel, dst=newDst, manifest=manifest[sel]))
 
             else:
                 dst = self.strip_accents(dst)
@@ -610,117 +675,60 @@ class CopyProgress(QtWidgets.QWidget):
                 if not os.path.isdir(os.path.normpath(dst)):
                     os.makedirs(os.path.normpath(dst))
 
-                copiedPathList.append(self.copyItem(src=sel, dst=dst))
-
-        # self.deleteLogger(self.logger)
+                copiedPathList.append(self.copyItem(src=sel, dst=dst, stat=manifest[sel][1][0][2]))
+            self._overallDone += size
 
         self.close()
         if self.cancelAll:
             self.results_ui("Canceled by user", logPath=self.logPath, destPath=dst)
         elif self.errorFlag:
             self.results_ui("Finished with Error(s)", color="red", logPath=self.logPath, destPath=dst)
+        elif self.blobStore and self.dedupResult["bytes"]:
+            status = "Success\n%s saved by deduplication" % materialStore.formatBytes(self.dedupResult["savedBytes"])
+            self.results_ui(status, logPath=self.logPath, destPath=dst)
         else:
             self.results_ui("Success", logPath=self.logPath, destPath=dst)
         return copiedPathList
 
-    def copyFolder(self, src, dst):
-
-        # src = os.path.normpath(src.replace(" ", "_"))
-        # dst = os.path.normpath(dst.replace(" ", "_"))
+    def copyFolder(self, src, dst, manifest=None):
+        """
+        Copies the folder with all its content
+        :param src: (String) Absolute path of the source folder
+        :param dst: (String) Absolute path of the target folder. Made unique if it exists
+        :param manifest: (Tuple) Result of sequenceTransfer.scanTree(src) if it is already collected
+        :return: (String) The target folder or None if it is not copied completely
+        """
         dst = self.uniqueFolderName(os.path.normpath(dst.replace(" ", "_")))
         if not os.path.isdir(dst):
             os.makedirs(dst)
 
-        self.pb.setValue(0)
-        self.terminated = False  # reset the termination status
-        totalCount = self.countFiles(src)
-        current = 0
-        QtWidgets.QApplication.processEvents()
-
-        for path, dirs, filenames in os.walk(src):
-            for directory in dirs:
-
-                destDir = path.replace(src, dst)
-                targetDir = os.path.join(destDir, directory)
-                targetDir = self.strip_accents(targetDir)
-
-                if not os.path.isdir(targetDir):
-                    os.makedirs(targetDir)
-
-            for sfile in filenames:
-                srcFile = os.path.join(path, sfile)
-
-                destFile = os.path.join(path.replace(src, dst), sfile)
-                self.copyItem(srcFile, os.path.split(destFile)[0])
-
-                # destFile = os.path.join(path.replace(src, dst), sfile)
-                # destFile = self.strip_accents(destFile)
-                # try:
-                #     # self.copyItem(srcFile, destFile)
-                #     shutil.copyfile(srcFile, destFile)
-                #
-                # except:
-                #     self.errorFlag = True
-                #     #     # self.safeLog("FAILED - unknown error")
-                #     return None
-                percent = (100 * current) / totalCount
-                # self.pb.setValue(percent)
-                self.pbOverall.setValue(percent)
-                current += 1
-                QtWidgets.QApplication.processEvents()
-                # self.safeLog("Success - {0}".format(targetPath))
-                if self.terminated or self.cancelAll:
-                    self.errorFlag = True
-                    # self.safeLog("FAILED - skipped by user")
-                    return None
-                    # break
+        folders, files = manifest or sequenceTransfer.scanTree(src)
+        for relDir in folders:
+            targetDir = self.strip_accents(os.path.join(dst, relDir))
+            if not os.path.isdir(targetDir):
+                os.makedirs(targetDir)
 
+        pairs = [(srcFile, self.strip_accents(os.path.join(dst, relPath))) for srcFile, relPath, _ in files]
+        stats = dict((srcFile, st) for srcFile, _, st in files if st)
+        if not self._copyPairs(pairs, stats=stats, material=dst):
+            return None
         return dst
 
-    def copyItem(self, src, dst):
+    def copyItem(self, src, dst, stat=None):
+        """
+        Copies the file into the target folder
+        :param src: (String) Absolute path of the source file
+        :param dst: (String) Absolute path of the target folder
+        :param stat: (os.stat_result) Stat of the source file if it is already known
+        :return: (String) Absolute path of the copied file or None if it is not copied
+        """
         src = os.path.normpath(src)
         dst = os.path.normpath(dst)
-        length = 8*1024
-        self.pb.setValue(0)
-        self.terminated = False  # reset the termination status
-        totalCount = self.countFiles(src)
-        current = 0
-        QtWidgets.QApplication.processEvents()
-
-        # Prevent progress callback from being made each cycle
-        c = 0
-        c_max = 50
-
-        # try:
         fileLocation = self.uniqueFileName(os.path.join(dst, os.path.basename(src)))
         fileLocation = self.strip_accents(fileLocation)
-        with open(src, 'rb') as fsrc:
-            with open(fileLocation, 'wb') as fdst:
-                copied = 0
-                while self.errorFlag==False:
-                    buf = fsrc.read(length)
-                    if not buf:
-                        break
-                    fdst.write(buf)
-                    copied += len(buf)
-                    c += 1
-                    if c == c_max:
-                        size_src = os.stat(fsrc.name).st_size
-                        size_dst =os.stat(fdst.name).st_size
-                        float_src = float(size_src)
-                        float_dst = float(size_dst)
-                        percentage = int(float_dst/float_src*100)
-                        self.pb.setValue(percentage)
-                        c = 0
-                        QtWidgets.QApplication.processEvents()
-                    if self.terminated or self.cancelAll:
-
-                        self.errorFlag = True
-        if self.errorFlag:
-            os.remove(fileLocation)
+        if not self._copyPairs([(src, fileLocation)], stats={src: stat} if stat else None, material=fileLocation):
             return None
-        else:
-            return fileLocation
+        return fileLocation
 
     # def copyItem(self, src, dst):
     #     src = os.path.normpath(src)
@@ -908,6 +916,7 @@ class ProjectMaterials(RootManager, CoreFunctions):
 
 
         self._pathsDict["databaseDir"] = os.path.normpath(os.path.join(self._pathsDict["masterDir"], "projectMaterialsDB"))
+        self._pathsDict["blobStoreDir"] = os.path.normpath(os.path.join(self._pathsDict["databaseDir"], "blobs"))
 
 
         self._pathsDict["subprojectsFile"] = os.path.normpath(os.path.join(self._pathsDict["masterDir"], "subPdata.json"))
@@ -937,6 +946,7 @@ class ProjectMaterials(RootManager, CoreFunctions):
         self._currentsDict = {"currentSubIndex": 0}  # default is 0 as "None"
 
         self.materialsInCategory = {}  # empty materials directory
+        self.materialEntries = {}  # index entries of the listed materials
         self.currentMaterialInfo = None
 
     @property
@@ -961,10 +971,122 @@ class ProjectMaterials(RootManager, CoreFunctions):
         self._currentsDict["currentSubIndex"] = indexData
 
     def _loadMaterialInfo(self, path):
-        """Loads material info from json file and holds it in the self.currentMaterialInfo"""
-        self.currentMaterialInfo = self._loadJson(path)
+        """Loads material info from the index (or the json file) and holds it in the self.currentMaterialInfo"""
+        entry = self.materialEntries.get(self.niceName(path))
+        if entry and os.path.basename(path) == entry["dbFile"]:
+            self.currentMaterialInfo = entry
+        else:
+            self.currentMaterialInfo = self._loadJson(path)
         return self.currentMaterialInfo
 
+    def getMaterialEntry(self, niceName):
+        """Returns the index entry of a listed material. Keys: niceName, relativePath, materialType,
+        subProject, entryDate, size, fileCount, dbFile, mtime"""
+        return self.materialEntries.get(niceName)
+
+    def _materialIndexFile(self, materialType):
+        return os.path.join(self._pathsDict["databaseDir"], "%s_index.json" % materialType)
+
+    def _loadMaterialIndex(self, materialType):
+        indexFile = self._materialIndexFile(materialType)
+        try:
+            index = self._readJsonFile(indexFile)
+        except (IOError, OSError, ValueError):
+            index = None
+        if not isinstance(index, dict) or index.get("version") != MATERIAL_INDEX_VERSION:
+            index = {"version": MATERIAL_INDEX_VERSION, "subProjects": {}}
+        return index
+
+    def _measureMaterial(self, absPath):
+        """Returns (size in bytes, file count) of the material file or folder"""
+        if os.path.isdir(absPath):
+            folders, files = sequenceTransfer.scanTree(absPath)
+            return sum(st.st_size for _, _, st in files if st), len(files)
+        try:
+            return os.path.getsize(absPath), 1
+        except OSError:
+            return 0, 0
+
+    def _materialEntry(self, dbFile, dbInfo):
+        """Builds the index entry from the database file content"""
+        size, fileCount = self._measureMaterial(os.path.join(self._pathsDict["projectDir"], dbInfo["relativePath"]))
+        return {"niceName": dbInfo["niceName"],
+                "relativePath": dbInfo["relativePath"],
+                "materialType": dbInfo.get("materialType"),
+                "subProject": dbInfo.get("subProject", ""),
+                "entryDate": dbInfo.get("entryDate"),
+                "size": size,
+                "fileCount": fileCount,
+                "dbFile": os.path.basename(dbFile),
+                "mtime": os.path.getmtime(dbFile)}
+
+    def _syncMaterialIndex(self, index, materialType, subProject):
+        """
+        Brings the sub-project section of the index in line with the database folder.
+        Only the database files which are new or modified since the last sync are read.
+        :return: (Boolean) True if the index is changed
+        """
+        searchDir = os.path.join(self._pathsDict["databaseDir"], materialType, subProject)
+        folderMtime = os.path.getmtime(searchDir)
+        section = index["subProjects"].get(subProject)
+        if section and section["folderMtime"] == folderMtime:
+            return False
+        oldMaterials = section["materials"] if section else {}
+        materials = {}
+        for dbFile in glob(os.path.join(searchDir, '*.json')):
+            name = self.niceName(dbFile)
+            entry = oldMaterials.get(name)
+            if not entry or entry["mtime"] != os.path.getmtime(dbFile):
+                try:
+                    entry = self._materialEntry(dbFile, self._readJsonFile(dbFile))
+                except (IOError, OSError, ValueError, KeyError):
+                    logger.warning("Skipping corrupted material database file => %s" % dbFile)
+                    continue
+            materials[name] = entry
+        index["subProjects"][subProject] = {"folderMtime": folderMtime, "materials": materials}
+        return True
+
+    def _updateMaterialIndex(self, materialType, subProject, folderMtime, added=None, removed=None):
+        """
+        Applies the saved or deleted materials to the index
+        :param folderMtime: (Float) Modification time of the database folder before the change
+        :param added: (Dictionary) {name: database file} of the new materials
+        :param removed: (List) names of the deleted materials
+        :return: None
+        """
+        index = self._loadMaterialIndex(materialType)
+        section = index["subProjects"].get(subProject)
+        if section and section["folderMtime"] == folderMtime:
+            # nobody else touched the folder since the last sync, no need to read the others.
+            # folderMtime is left as it is, another user may have changed the folder meanwhile
+            # and the next sync has to compare the files. Entries applied here are not read again
+            for name, dbFile in (added or {}).items():
+                section["materials"][name] = self._materialEntry(dbFile, self._readJsonFile(dbFile))
+            for name in removed or []:
+                section["materials"].pop(name, None)
+        else:
+            self._syncMaterialIndex(index, materialType, subProject)
+        self._dumpJson(index, self._materialIndexFile(materialType))
+
+    def isDedupEnabled(self):
+        """Returns True if the project materials are stored in the content addressed store"""
+        # load it each time, since this setting is not limited to a single user
+        projectSettingsDB = self.loadProjectSettings()
+        try:
+            return bool(projectSettingsDB.get("MaterialDedup", False))
+        except AttributeError:
+            msg = "Database Error while reading projectSettings.json"
+            logger.error(msg)
+            return False
+
+    def getBlobStore(self):
+        """Returns the content addressed store of the project materials"""
+        return materialStore.BlobStore(self._pathsDict["blobStoreDir"], self._pathsDict["projectDir"])
+
+    def getDedupReport(self):
+        """Returns the storage statistics of the material store. See materialStore.BlobStore.report"""
+        return self.getBlobStore().report()
+
     def getMaterialPath(self):
         """Returns the absolute material path of currentMaterialInfo"""
         return os.path.join(self.projectDir, self.currentMaterialInfo["relativePath"].replace("\\", "/"))
@@ -991,18 +1113,23 @@ class ProjectMaterials(RootManager, CoreFunctions):
 
     def saveMaterial(self, pathList, materialType):
         subProject = "" if self.currentSubIndex == 0 else self.subProject
-        copier = CopyProgress()
+        copier = CopyProgress(blobStore=self.getBlobStore() if self.isDedupEnabled() else None)
         dateDir = datetime.datetime.now().strftime("%y%m%d")
         # targetLocation = os.path.join(self._pathsDict[materialType], subProject, dateDir)
         targetLocation = os.path.join(self._pathsDict[materialType], subProject)
         # matDatabaseDir = os.path.join(self._pathsDict["databaseDir"], materialType, subProject, dateDir)
         matDatabaseDir = os.path.join(self._pathsDict["databaseDir"], materialType, subProject)
         self._folderCheck(matDatabaseDir)
+        folderMtime = os.path.getmtime(matDatabaseDir)
 
         # copy the files and collect returned absolute paths in a list
         absPaths = copier.masterCopy(pathList, targetLocation)
+        added = {}
 
         for item in absPaths:
+            if not item:
+                # canceled or failed copies are not registered
+                continue
             # build a dictionary
             baseName = os.path.basename(item)
             # niceName = os.path.splitext(baseName)[0]
@@ -1017,6 +1144,10 @@ class ProjectMaterials(RootManager, CoreFunctions):
             }
             matDatabaseFile = os.path.join(matDatabaseDir, "%s.json" % niceName)
             self._dumpJson(dictItem, matDatabaseFile)
+            added[niceName] = matDatabaseFile
+
+        self._updateMaterialIndex(materialType, subProject, folderMtime, added=added)
+        return copier.dedupResult
 
     def deleteMaterial(self, dbPath):
 
@@ -1024,29 +1155,53 @@ class ProjectMaterials(RootManager, CoreFunctions):
 
         material_absPath = os.path.join(self._pathsDict["projectDir"], dbInfo["relativePath"])
 
+        # files linked to the material store are read-only
         if os.path.isdir(material_absPath):
             # os.rmdir(material_absPath)
-            shutil.rmtree(material_absPath)
+            materialStore.removeTree(material_absPath)
         else:
-            os.remove(material_absPath)
+            materialStore.removeFile(material_absPath)
 
+        # materials saved while deduplication was enabled keep their blobs in the store
+        if os.path.isdir(self._pathsDict["blobStoreDir"]):
+            blobStore = self.getBlobStore()
+            if blobStore.release(material_absPath):
+                blobStore.collectGarbage()
+
+        folderMtime = os.path.getmtime(os.path.dirname(dbPath))
         os.remove(dbPath)
+        self._updateMaterialIndex(dbInfo["materialType"], dbInfo["subProject"], folderMtime,
+                                  removed=[self.niceName(dbPath)])
         return True
 
     def scanMaterials(self, materialType, sortBy="date"):
+        """
+        Lists the materials of the type under the current sub-project from the material index
+        :param materialType: (String) Storyboard, Brief, Reference, Artwork, Footage or Other
+        :param sortBy: (String) "date", "size" or "name"
+        :return: (OrderedDict) {niceName: absolute database file path} in the sort order
+        """
         # materialType = str(materialType)
         subProject = "" if self.currentSubIndex == 0 else self.subProject
         # matDatabaseDir = os.path.join(self._pathsDict["databaseDir"], materialType, subProject, dateDir)
         searchDir = os.path.join(self._pathsDict["databaseDir"], materialType, subProject)
-
-        dbFiles = glob(os.path.join(searchDir, '*.json'))
-        if sortBy == "date":
-            dbFiles.sort(key=os.path.getmtime)
-        elif sortBy == "size":
-            dbFiles.sort(key=os.path.getsize)
-        elif sortBy == "name":
-            dbFiles.sort()
-        self.materialsInCategory = {self.niceName(file): file for file in glob(os.path.join(searchDir, '*.json'))}
+        if not os.path.isdir(searchDir):
+            self.materialEntries = {}
+            self.materialsInCategory = OrderedDict()
+            return self.materialsInCategory
+
+        index = self._loadMaterialIndex(materialType)
+        if self._syncMaterialIndex(index, materialType, subProject):
+            self._dumpJson(index, self._materialIndexFile(materialType))
+        self.materialEntries = index["subProjects"][subProject]["materials"]
+
+        sortKeys = {"date": lambda entry: entry["mtime"],
+                    "size": lambda entry: entry["size"],
+                    "name": lambda entry: entry["niceName"].lower()}
+        sortKey = sortKeys.get(sortBy, sortKeys["date"])
+        self.materialsInCategory = OrderedDict(
+            (name, os.path.join(searchDir, entry["dbFile"]))
+            for name, entry in sorted(self.materialEntries.items(), key=lambda x: sortKey(x[1])))
         return self.materialsInCategory
 
     def execute(self):
@@ -1480,13 +1635,16 @@ class MainUI(QtWidgets.QMainWindow):
         self.popMenu = QtWidgets.QMenu()
         rcA = QtWidgets.QAction('Show in Explorer', self)
         rcB = QtWidgets.QAction('Delete Item', self)
+        rcC = QtWidgets.QAction('Storage Report', self)
         for tree in tabTrees:
             tree.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
             self.popMenu.addAction(rcB)
             self.popMenu.addAction(rcA)
+            self.popMenu.addAction(rcC)
 
         rcA.triggered.connect(lambda: self.onRightClick("showInExplorer"))
         rcB.triggered.connect(lambda: self.onRightClick("deleteItem"))
+        rcC.triggered.connect(lambda: self.onRightClick("storageReport"))
 
         #
         self.storyboard_treeWidget.customContextMenuRequested.connect(lambda x: self.onContextMenu(x, self.storyboard_treeWidget))
@@ -1586,7 +1744,7 @@ class MainUI(QtWidgets.QMainWindow):
 
         treewidget.clear()
         for x in materials.items():
-            timestamp = os.path.getmtime(x[1])
+            timestamp = self.promat.getMaterialEntry(x[0])["mtime"]
             timestampFormatted = datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
             item = QtWidgets.QTreeWidgetItem(treewidget, [x[0], str(timestampFormatted)])
         # sort by date default
@@ -1655,6 +1813,20 @@ class MainUI(QtWidgets.QMainWindow):
             elif ret == QtWidgets.QMessageBox.Cancel:
                 return
 
+        if cmd == "storageReport":
+            report = self.promat.getDedupReport()
+            msg = "Deduplication: %s\n\n" \
+                  "Materials in store: %s\n" \
+                  "Unique files: %s\n" \
+                  "Referenced size: %s\n" \
+                  "Stored size: %s\n" \
+                  "Saved: %s" % ("Enabled" if self.promat.isDedupEnabled() else "Disabled",
+                                 report["materials"], report["blobs"],
+                                 materialStore.formatBytes(report["referencedBytes"]),
+                                 materialStore.formatBytes(report["storedBytes"]),
+                                 materialStore.formatBytes(report["savedBytes"]))
+            QtWidgets.QMessageBox.information(self, "Material Storage Report", msg)
+
     def droppedPath(self, paths, material):
         self.statusBar().showMessage("Status | Idle")
         # try:
@@ -1680,9 +1852,14 @@ class MainUI(QtWidgets.QMainWindow):
             self.statusBar().showMessage("Warning | There is no file path in dropped item")
             return
 
-        self.promat.saveMaterial(paths, material)
+        dedupResult = self.promat.saveMaterial(paths, material)
         self.initCategoryItems()
-        self.statusBar().showMessage("Success | Item(s) added")
+        self.statusBar().showMessage(self._addedMessage(dedupResult))
+
+    def _addedMessage(self, dedupResult):
+        if dedupResult and dedupResult["bytes"]:
+            return "Success | Item(s) added | %s saved by deduplication" % materialStore.formatBytes(dedupResult["savedBytes"])
+        return "Success | Item(s) added"
 
     def onButtonPush(self, material):
         self.statusBar().showMessage("Status | Idle")
@@ -1696,9 +1873,9 @@ class MainUI(QtWidgets.QMainWindow):
         # this is a workaround for skipping the save material procedure when the gui closed
         try:
             len(paths)
-            self.promat.saveMaterial(paths, material)
+            dedupResult = self.promat.saveMaterial(paths, material)
             self.initCategoryItems()
-            self.statusBar().showMessage("Success | Item(s) added")
+            self.statusBar().showMessage(self._addedMessage(dedupResult))
         except:
             pass
 
@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------------------------
+# Copyright (c) 2017-2018, Arda Kutlu (ardakutlu@gmail.com)
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#  - Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+#  - Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+#  - Neither the name of the software nor the names of its contributors
+#    may be used to endorse or promote products derived from this software
+#    without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# -----------------------------------------------------------------------------
+
+"""
+Incremental data collection for the project report.
+
+Aggregates of every base scene database file and every progress log are kept in
+smDatabase/reportCache.json together with the modification time they are computed
+from. On the next report only the files which are new or changed are processed.
+Progress logs are append only, so only the appended part of a log is read.
+"""
+
+import os
+import json
+import logging
+from multiprocessing.pool import ThreadPool
+
+__author__ = "Arda Kutlu"
+__copyright__ = "Copyright 2018, Tik Manager Project Report"
+__credits__ = []
+__license__ = "GPL"
+__maintainer__ = "Arda Kutlu"
+__email__ = "ardakutlu@gmail.com"
+__status__ = "Development"
+
+logging.basicConfig()
+logger = logging.getLogger('projectReport')
+logger.setLevel(logging.WARNING)
+
+CACHE_FILE_NAME = "reportCache.json"
+CACHE_VERSION = 1
+SOFTWARE_DB_LIST = ["mayaDB", "maxDB", "houdiniDB", "nukeDB", "photoshopDB"]
+
+
+def uniqueList(seq):
+    """Removes the duplicates by preserving the order"""
+    seen = set()
+    result = []
+    for item in seq:
+        if item in seen:
+            continue
+        seen.add(item)
+        result.append(item)
+    return result
+
+
+def _walkFiles(folder, extension):
+    """Yields (absolute path, mtime, size) of the files with given extension under the folder recursively"""
+    try:
+        scandir = os.scandir
+    except AttributeError: # python 2.7 compatibility
+        for root, dirs, files in os.walk(folder):
+            for f in files:
+                if f.endswith(extension):
+                    path = os.path.join(root, f)
+                    st = os.stat(path)
+                    yield path, st.st_mtime, st.st_size
+        return
+    try:
+        entries = list(scandir(folder))
+    except OSError:
+        return
+    for entry in entries:
+        if entry.is_dir():
+            for item in _walkFiles(entry.path, extension):
+                yield item
+        elif entry.name.endswith(extension):
+            st = entry.stat()
+            yield entry.path, st.st_mtime, st.st_size
+
+
+def _parseLogLine(line):
+    """Returns (user, timestamp) from a progress log line 'action***user***path***timestamp'"""
+    fields = line.split("***")
+    if len(fields) < 4:
+        return None, None
+    try:
+        return fields[1], float(fields[3])
+    except ValueError:
+        return fields[1], None
+
+
+def _readLastLine(f, size, blockSize=4096):
+    """Reads the last non-empty line of a file by seeking from the end"""
+    offset = size
+    data = b""
+    while offset > 0:
+        step = min(blockSize, offset)
+        offset -= step
+        f.seek(offset)
+        data = f.read(step) + data
+        lines = [l for l in data.splitlines() if l.strip()]
+        # the first line is complete only if the whole file is read
+        if len(lines) > 1 or (lines and offset == 0):
+            return lines[-1]
+    return b""
+
+
+class ProjectReportCache(object):
+    """Collects report data for a project by re-using the cached aggregates of unchanged files"""
+    def __init__(self, masterDir, readJson=None, writeJson=None):
+        """
+        :param masterDir: (String) Absolute path of smDatabase folder
+        :param readJson: (Callable) Function to read the json files. Must be safe to call from threads
+        :param writeJson: (Callable) Function with (data, filePath) arguments to save the cache file
+        """
+        self.masterDir = masterDir
+        self.cacheFile = os.path.join(masterDir, CACHE_FILE_NAME)
+        self.readJson = readJson or self._readJson
+        self.writeJson = writeJson or self._writeJson
+        self.cache = self._loadCache()
+
+    @staticmethod
+    def _readJson(filePath):
+        with open(filePath, "r") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _writeJson(data, filePath):
+        with open(filePath, "w") as f:
+            json.dump(data, f)
+
+    def _loadCache(self):
+        empty = {"version": CACHE_VERSION, "databases": {}, "logs": {}}
+        if not os.path.isfile(self.cacheFile):
+            return empty
+        try:
+            cache = self.readJson(self.cacheFile)
+        except Exception:
+            logger.warning("Report cache is corrupted, it will be regenerated")
+            return empty
+        if cache.get("version") != CACHE_VERSION:
+            return empty
+        return cache
+
+    def save(self):
+        self.cache["version"] = CACHE_VERSION
+        try:
+            self.writeJson(self.cache, self.cacheFile)
+        except Exception as e:
+            logger.warning("Cannot save report cache\n%s" % e)
+
+    def _relative(self, path):
+        return os.path.relpath(path, self.masterDir).replace("\\", "/")
+
+    def collectSoftware(self, dbName):
+        """
+        Returns the users, workstations and categories used in the software database.
+        Only the new or modified database files are read.
+        :param dbName: (String) Name of the database folder. eg. 'mayaDB'
+        :return: (Dictionary) {"users": [], "workstations": [], "categories": []}
+        """
+        folder = os.path.join(self.masterDir, dbName)
+        oldEntries = self.cache["databases"].get(dbName, {})
+        newEntries = {}
+        users = []
+        workstations = []
+        categories = []
+        if os.path.isdir(folder):
+            for path, mtime, size in _walkFiles(folder, ".json"):
+                relPath = self._relative(path)
+                entry = oldEntries.get(relPath)
+                if not entry or entry["mtime"] != mtime:
+                    try:
+                        dbData = self.readJson(path)
+                        entry = {"mtime": mtime,
+                                 "users": [v["User"] for v in dbData["Versions"]],
+                                 "workstations": [v["Workstation"] for v in dbData["Versions"]],
+                                 "category": dbData["Category"]}
+                    except Exception:
+                        # not a base scene database file (eg. categories file) or corrupted
+                        entry = {"mtime": mtime, "users": [], "workstations": [], "category": None}
+                newEntries[relPath] = entry
+                users += entry["users"]
+                workstations += entry["workstations"]
+                if entry["category"]:
+                    categories.append(entry["category"])
+        self.cache["databases"][dbName] = newEntries
+        return {"users": uniqueList(users),
+                "workstations": uniqueList(workstations),
+                "categories": uniqueList(categories)}
+
+    def _processLog(self, path, mtime, size, entry):
+        """Updates the cache entry of a single daily log file reading only the appended part"""
+        if entry and entry["mtime"] == mtime and entry["size"] == size:
+            return entry
+        if not entry or size < entry["offset"]:
+            # new or truncated log file, start over
+            entry = {"offset": 0, "first": None, "last": None, "users": []}
+        with open(path, "rb") as f:
+            if entry["first"] is None:
+                user, entry["first"] = _parseLogLine(f.readline().decode("utf-8", "replace"))
+            user, lastStamp = _parseLogLine(_readLastLine(f, size).decode("utf-8", "replace"))
+            if lastStamp is not None:
+                entry["last"] = lastStamp
+            f.seek(entry["offset"])
+            appended = f.read(size - entry["offset"])
+        # only consume complete lines, the rest is read again next time
+        completeLength = appended.rfind(b"\n") + 1
+        for line in appended[:completeLength].splitlines():
+            user, stamp = _parseLogLine(line.decode("utf-8", "replace"))
+            if user and user not in entry["users"]:
+                entry["users"].append(user)
+        entry["offset"] += completeLength
+        entry["mtime"] = mtime
+        entry["size"] = size
+        return entry
+
+    def collectWorkstations(self):
+        """
+        Returns per workstation working day data from the progress logs.
+        :return: (Dictionary) {workstation: [{"day": "yymmdd", "first": stamp, "last": stamp, "users": []}, ...]}
+        """
+        logFolder = os.path.join(self.masterDir, "progressLogs")
+        oldLogs = self.cache["logs"]
+        newLogs = {}
+        result = {}
+        if not os.path.isdir(logFolder):
+            self.cache["logs"] = newLogs
+            return result
+        for ws in sorted(os.listdir(logFolder)):
+            wsFolder = os.path.join(logFolder, ws)
+            if not os.path.isdir(wsFolder):
+                continue
+            oldEntries = oldLogs.get(ws, {})
+            newEntries = {}
+            days = []
+            for logFile in sorted(os.listdir(wsFolder)):
+                if os.path.splitext(logFile)[1] != ".log":
+                    continue
+                path = os.path.join(wsFolder, logFile)
+                st = os.stat(path)
+                entry = self._processLog(path, st.st_mtime, st.st_size, oldEntries.get(logFile))
+                newEntries[logFile] = entry
+                if entry["first"] is None or entry["last"] is None:
+                    continue
+                days.append({"day": logFile.replace(".log", ""),
+                             "first": entry["first"],
+                             "last": entry["last"],
+                             "users": entry["users"]})
+            newLogs[ws] = newEntries
+            if days:
+                result[ws] = days
+        self.cache["logs"] = newLogs
+        return result
+
+    def collect(self, threads=4):
+        """
+        Collects software and workstation data concurrently and saves the cache
+        :return: (Tuple) ({dbName: software data}, {workstation: days})
+        """
+        tasks = [("software", dbName) for dbName in SOFTWARE_DB_LIST] + [("workstations", None)]
+
+        def run(task):
+            kind, dbName = task
+            if kind == "software":
+                return dbName, self.collectSoftware(dbName)
+            return None, self.collectWorkstations()
+
+        pool = ThreadPool(max(1, min(threads, len(tasks))))
+        try:
+            results = pool.map(run, tasks)
+        finally:
+            pool.close()
+            pool.join()
+        softwareData = dict(x for x in results if x[0])
+        workstationData = [x[1] for x in results if not x[0]][0]
+        self.save()
+        return softwareData, workstationData
@@ -35,6 +35,11 @@
 # Modification History:
     # added filtering to the 'walk method'
     # minor optimizations considering it will only work as a module for imageViewer
+    # single pass, bucketed grouping of items in get_sequences
+    # range encoded FrameSequence
+    # slotted Item with a single tokeniser and scandir stat reuse
+    # scandir based walk with optional thread pool
+    # persistent per directory sequence cache
 # -----------------------------------------------------------------------------
 
 """PySeq is a python module that finds groups of items that follow a naming
@@ -64,6 +69,14 @@ from glob import glob
 from glob import iglob
 from datetime import datetime
 import fnmatch
+import json
+import time
+import threading
+
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
 
 __version__ = "0.5.1"
 
@@ -78,6 +91,9 @@ strict_pad = True
 # regex for matching numerical characters
 digits_re = re.compile(r'\d+')
 
+# same as digits_re but keeps the digits when splitting: [part, digits, part, ...]
+tokenise_re = re.compile(r'(\d+)')
+
 # regex for matching format directives
 format_re = re.compile(r'%(?P<pad>\d+)?(?P<var>\w+)')
 
@@ -85,8 +101,8 @@ format_re = re.compile(r'%(?P<pad>\d+)?(?P<var>\w+)')
 range_join = os.environ.get('PYSEQ_RANGE_SEP', ', ')
 
 __all__ = [
-    'SequenceError', 'FormatError', 'Item', 'Sequence', 'diff', 'uncompress',
-    'getSequences', 'get_sequences', 'walk'
+    'SequenceError', 'FormatError', 'Item', 'Sequence', 'FrameSequence', 'diff', 'uncompress',
+    'getSequences', 'get_sequences', 'walk', 'SequenceCache'
 ]
 
 # logging handlers
@@ -112,6 +128,20 @@ else:
     basestring = basestring
 
 
+try:
+    _DirEntry = os.DirEntry
+except AttributeError:
+    # no scandir before python 3.5
+    _DirEntry = ()
+
+try:
+    class _SlotsTest(str):
+        __slots__ = ('test',)
+    _STR_SLOTS = True
+except TypeError:
+    _STR_SLOTS = False
+
+
 def _natural_key(x):
     """ Splits a string into characters and digits.  This helps in sorting file
     names in a 'natural' way.
@@ -170,24 +200,40 @@ def deprecated(func):
 class Item(str):
     """Sequence member file class
 
-    :param item: Path to file.
+    :param item: Path to file, os.scandir entry or an object with a path attribute.
+    :param stat: Optional os.stat result of the file, saves a stat call later.
     """
 
-    def __init__(self, item):
+    # str subclasses cannot have slots on python 2
+    if _STR_SLOTS:
+        __slots__ = ('item', 'frame', 'head', 'tail', 'pad',
+                     '_path', '_dirname', '_filename', '_digits', '_parts', '_stat')
+
+    def __new__(cls, item, stat=None):
+        if isinstance(item, _DirEntry):
+            return super(Item, cls).__new__(cls, item.path)
+        return super(Item, cls).__new__(cls, item)
+
+    def __init__(self, item, stat=None):
         super(Item, self).__init__()
         log.debug('adding %s', item)
         self.item = item
-        self.__path = getattr(item, 'path', None)
-        if self.__path is None:
-            self.__path = os.path.abspath(str(item))
-        self.__dirname, self.__filename = os.path.split(self.__path)
-        self.__digits = digits_re.findall(self.name)
-        self.__parts = digits_re.split(self.name)
-        self.__stat = None
+        path = getattr(item, 'path', None)
+        if path is None:
+            path = os.path.abspath(str(item))
+        elif isinstance(item, _DirEntry):
+            path = os.path.abspath(path)
+        self._path = path
+        self._dirname, self._filename = os.path.split(path)
+        # single pass over the name, parts and digits are interleaved
+        tokens = tokenise_re.split(self._filename)
+        self._digits = tokens[1::2]
+        self._parts = tokens[0::2]
+        self._stat = stat
 
         # modified by self.is_sibling()
         self.frame = None
-        self.head = self.name
+        self.head = self._filename
         self.tail = ''
         self.pad = None
 
@@ -216,43 +262,45 @@ class Item(str):
         return '<pyseq.Item "%s">' % self.name
 
     def __getattr__(self, key):
+        if key == 'item':
+            raise AttributeError(key)
         return getattr(self.item, key)
 
     @property
     def path(self):
         """Item absolute path, if a filesystem item.
         """
-        return self.__path
+        return self._path
 
     @property
     def name(self):
         """Item base name attribute
         """
-        return self.__filename
+        return self._filename
 
     @property
     def dirname(self):
         """"Item directory name, if a filesystem item."
         """
-        return self.__dirname
+        return self._dirname
 
     @property
     def digits(self):
         """Numerical components of item name.
         """
-        return self.__digits
+        return self._digits
 
     @property
     def parts(self):
         """Non-numerical components of item name
         """
-        return self.__parts
+        return self._parts
 
     @property
     def exists(self):
         """Returns True if this item exists on disk
         """
-        return os.path.isfile(self.__path)
+        return os.path.isfile(self._path)
 
     @property
     def size(self):
@@ -270,9 +318,15 @@ class Item(str):
     def stat(self):
         """ Returns the os.stat object for this file.
         """
-        if self.__stat is None:
-            self.__stat = os.stat(self.__path)
-        return self.__stat
+        if self._stat is None:
+            if isinstance(self.item, Item):
+                self._stat = self.item.stat
+            elif isinstance(self.item, _DirEntry):
+                # cached by the entry, free on windows
+                self._stat = self.item.stat()
+            else:
+                self._stat = os.stat(self._path)
+        return self._stat
 
     @deprecated
     def isSibling(self, item):
@@ -719,6 +773,10 @@ class Sequence(list):
         else:
             self.frames()
 
+    def compact(self):
+        """:return: :class:`.FrameSequence` holding only the frame numbers of this sequence."""
+        return FrameSequence.from_sequence(self)
+
     def _get_padding(self):
         """:return: padding string, e.g. %07d"""
         try:
@@ -791,6 +849,284 @@ class Sequence(list):
         return sorted(list(set(frames).symmetric_difference(r)))
 
 
+class FrameSequence(object):
+    """Compact, read mostly counterpart of :class:`.Sequence`.
+
+    Stores only the directory, head, tail, padding and the frame numbers as
+    a list of (start, end) ranges instead of an :class:`.Item` per frame.
+    Items are created on access. Formatting, start/end/missing, length and
+    iteration behave like :class:`.Sequence`.
+
+        >>> s = Sequence(['file.0001.jpg', 'file.0002.jpg', 'file.0006.jpg']).compact()
+        >>> print(s.format('%4l %h%p%t %R'))
+           3 file.%04d.jpg [1-2, 6]
+        >>> s.missing()
+        [3, 4, 5]
+        >>> s[-1]
+        <pyseq.Item "file.0006.jpg">
+    """
+
+    def __init__(self, directory, head, tail='', pad=None, frames=()):
+        """
+        Create a new FrameSequence class object.
+
+        :param directory: Directory of the sequence files.
+        :param head: String preceding the sequence number.
+        :param tail: String after the sequence number.
+        :param pad: Length of the sequence number. None for a single file
+                    which is not part of a sequence (named head + tail).
+        :param frames: Iterable of frame numbers.
+
+        :return: pyseq.FrameSequence class instance.
+        """
+        self._dirname = directory
+        self._head = head
+        self._tail = tail
+        self._pad = pad
+        self._ranges = []
+        self._length = 0
+        self.__frames = None
+        # total size and latest mtime when known without touching the disk
+        self._size = None
+        self._mtime = None
+        if pad is not None:
+            self._set_frames(frames)
+
+    @classmethod
+    def from_sequence(cls, sequence):
+        """Creates a FrameSequence from a :class:`.Sequence`
+
+        :exc:`SequenceError` raised if the items are not in the same directory.
+        """
+        first = sequence[0]
+        if any(item.dirname != first.dirname for item in sequence):
+            raise SequenceError("Sequence items are not in the same directory")
+        if first.pad is None:
+            return cls(first.dirname, first.name)
+        return cls(first.dirname, first.head, first.tail, first.pad,
+                   sequence.frames())
+
+    def _set_frames(self, frames):
+        ranges = []
+        for frame in sorted(set(frames)):
+            if ranges and ranges[-1][1] + 1 == frame:
+                ranges[-1][1] = frame
+            else:
+                ranges.append([frame, frame])
+        self._set_ranges(ranges)
+
+    def _set_ranges(self, ranges):
+        self._ranges = [tuple(r) for r in ranges]
+        self._length = sum(e - s + 1 for s, e in self._ranges)
+        self.__frames = None
+        self._size = None
+        self._mtime = None
+
+    def _item_name(self, frame):
+        if self._pad is None:
+            return self._head + self._tail
+        return '%s%0*d%s' % (self._head, self._pad, frame, self._tail)
+
+    def _item(self, frame):
+        item = Item(os.path.join(self._dirname, self._item_name(frame)))
+        if self._pad is not None:
+            item.frame = frame
+            item.pad = self._pad
+            item.head = self._head
+            item.tail = self._tail
+        return item
+
+    def __attrs__(self):
+        """Replaces format directives with callables to get their values."""
+        return {
+            'l': self.length,
+            's': self.start,
+            'e': self.end,
+            'f': self.frames,
+            'm': self.missing,
+            'M': functools.partial(self._format_ranges, missing=True),
+            'd': lambda *x: self.size,
+            'D': self.directory,
+            'p': self._get_padding,
+            'r': self._get_implied_range,
+            'R': self._format_ranges,
+            'h': self.head,
+            't': self.tail
+        }
+
+    format = Sequence.__dict__['format']
+
+    def __str__(self):
+        return self.format(default_format)
+
+    def __repr__(self):
+        return '<pyseq.FrameSequence "%s">' % str(self)
+
+    def __len__(self):
+        return self.length()
+
+    def __iter__(self):
+        if self._pad is None:
+            yield self._item(None)
+            return
+        for start, end in self._ranges:
+            for frame in range(start, end + 1):
+                yield self._item(frame)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("FrameSequence index out of range")
+        if self._pad is None:
+            return self._item(None)
+        for start, end in self._ranges:
+            if index <= end - start:
+                return self._item(start + index)
+            index -= end - start + 1
+
+    def __getattr__(self, key):
+        if key.startswith('_'):
+            raise AttributeError(key)
+        return getattr(self[0], key)
+
+    @property
+    def dirname(self):
+        return self._dirname
+
+    @property
+    def mtime(self):
+        """Returns the latest mtime of all items
+        """
+        if self._mtime is None:
+            self._mtime = max(i.mtime for i in self)
+        return self._mtime
+
+    @property
+    def size(self):
+        """Returns the size all items (divide by 1024*1024 for MBs)
+        """
+        if self._size is None:
+            self._size = sum(i.size for i in self)
+        return self._size
+
+    def directory(self):
+        return self._dirname + os.sep
+
+    def length(self):
+        """:return: The length of the sequence."""
+        return 1 if self._pad is None else self._length
+
+    def frames(self):
+        """:return: List of frame numbers in sequence."""
+        if self.__frames is None:
+            self.__frames = [f for s, e in self._ranges for f in range(s, e + 1)]
+        return self.__frames
+
+    def ranges(self):
+        """:return: List of (start, end) tuples of the continuous frame ranges."""
+        return list(self._ranges)
+
+    def start(self):
+        """:return: First index number in sequence
+        """
+        return self._ranges[0][0] if self._ranges else 0
+
+    def end(self):
+        """:return: Last index number in sequence
+        """
+        return self._ranges[-1][1] if self._ranges else 0
+
+    def missing(self):
+        """:return: List of missing frame numbers."""
+        return [f for s, e in self._missing_ranges() for f in range(s, e + 1)]
+
+    def _missing_ranges(self):
+        return [(self._ranges[i][1] + 1, self._ranges[i + 1][0] - 1)
+                for i in range(len(self._ranges) - 1)]
+
+    def head(self):
+        """:return: String before the sequence index number."""
+        return self._head
+
+    def tail(self):
+        """:return: String after the sequence index number."""
+        return self._tail
+
+    def path(self):
+        """:return: Absolute path to sequence."""
+        return os.path.join(os.path.abspath(self._dirname), str(self))
+
+    def includes(self, item):
+        """Checks if the item can be contained in this sequence
+
+        :param item: pyseq.Item object or path.
+        """
+        return self._parse_frame(item) is not None
+
+    def contains(self, item):
+        """Checks if the item is a member of this sequence
+
+        :param item: pyseq.Item object or path.
+        """
+        frame = self._parse_frame(item)
+        if frame is None:
+            return False
+        return any(s <= frame <= e for s, e in self._ranges)
+
+    def append(self, item):
+        """Adds another member to the sequence.
+
+        :exc:`SequenceError` raised if item is not a sequence member.
+        """
+        frame = self._parse_frame(item)
+        if frame is None:
+            raise SequenceError('Item is not a member of this sequence')
+        self._set_frames(self.frames() + [frame])
+
+    def to_sequence(self):
+        """:return: :class:`.Sequence` with all the items materialised."""
+        sequence = Sequence([self[0]])
+        sequence.extend(self[1:])
+        return sequence
+
+    def _parse_frame(self, item):
+        """Returns the frame number of the item if it fits to the sequence naming, else None"""
+        if self._pad is None:
+            return None
+        name = os.path.basename(getattr(item, 'path', None) or str(item))
+        digits = name[len(self._head):len(name) - len(self._tail)]
+        if not (name.startswith(self._head) and name.endswith(self._tail)
+                and digits.isdigit()):
+            return None
+        if strict_pad is True and len(digits) != self._pad:
+            return None
+        return int(digits)
+
+    def _get_padding(self):
+        """:return: padding string, e.g. %07d"""
+        if self._pad is None:
+            return ''
+        if self._pad < 2:
+            return '%d'
+        return '%%%02dd' % self._pad
+
+    def _get_implied_range(self):
+        if not self._ranges:
+            return ''
+        return '%s-%s' % (self.start(), self.end())
+
+    def _format_ranges(self, missing=False):
+        """Returns frame range string of the frames (or the missing frames), e.g. [1-500]."""
+        ranges = self._missing_ranges() if missing else self._ranges
+        if not ranges:
+            return ''
+        return "[%s]" % range_join.join(
+            str(s) if s == e else '%s-%s' % (s, e) for s, e in ranges)
+
+
 def diff(f1, f2):
     """Examines diffs between f1 and f2 and deduces numerical sequence number.
 
@@ -807,28 +1143,33 @@ def diff(f1, f2):
 
     :return: Dictionary with keys: frames, start, end.
     """
-    log.debug('diff: %s %s' % (f1, f2))
+    log.debug('diff: %s %s', f1, f2)
     if not type(f1) == Item:
         f1 = Item(f1)
     if not type(f2) == Item:
         f2 = Item(f2)
 
-    l1 = [m for m in digits_re.finditer(f1.name)]
-    l2 = [m for m in digits_re.finditer(f2.name)]
+    # positions of the digit groups are derived from the already tokenised names
+    digits1, digits2 = f1.digits, f2.digits
+    parts1, parts2 = f1.parts, f2.parts
 
     d = []
-    if len(l1) == len(l2):
-        for i in range(0, len(l1)):
-            m1 = l1.pop(0)
-            m2 = l2.pop(0)
-            if (m1.start() == m2.start()) and (m1.group() != m2.group()):
-                if strict_pad is True and (len(m1.group()) != len(m2.group())):
-                    continue
-                d.append({
-                    'start': m1.start(),
-                    'end': m1.end(),
-                    'frames': (m1.group(), m2.group())
-                })
+    if len(digits1) == len(digits2):
+        start1 = start2 = 0
+        for i in range(0, len(digits1)):
+            start1 += len(parts1[i])
+            start2 += len(parts2[i])
+            group1 = digits1[i]
+            group2 = digits2[i]
+            if (start1 == start2) and (group1 != group2):
+                if not (strict_pad is True and (len(group1) != len(group2))):
+                    d.append({
+                        'start': start1,
+                        'end': start1 + len(group1),
+                        'frames': (group1, group2)
+                    })
+            start1 += len(group1)
+            start2 += len(group2)
 
     log.debug(d)
     return d
@@ -999,7 +1340,7 @@ def getSequences(source):
     return get_sequences(source)
 
 
-def get_sequences(source):
+def get_sequences(source, compact=False, cache=None):
     """Returns a list of Sequence objects given a directory or list that contain
     sequential members.
 
@@ -1041,11 +1382,34 @@ def get_sequences(source):
         datetime.datetime(2011, 3, 21, 17, 31, 24)
 
     :param source: Can be directory path, list of strings, or sortable list of objects.
+    :param compact: Return :class:`.FrameSequence` objects instead, which keep
+                    only the frame numbers in memory. Items must not span directories.
+    :param cache: :class:`.SequenceCache` instance, or True for the default one.
+                  Only used when source is a directory. If the directory mtime
+                  did not change since it was cached, the sequences are
+                  rebuilt from the cache without listing it.
 
     :return: List of pyseq.Sequence class objects.
     """
     start = datetime.now()
 
+    if cache is not None and isinstance(source, basestring) and os.path.isdir(source):
+        if cache is True:
+            cache = SequenceCache.default()
+        directory = os.path.abspath(source)
+        mtime = os.stat(directory).st_mtime
+        cached = cache.get(directory, mtime, 'get_sequences')
+        if cached is not None:
+            if compact:
+                return [seq if isinstance(seq, FrameSequence) else seq.compact()
+                        for seq in cached[1]]
+            return [seq.to_sequence() if isinstance(seq, FrameSequence) else seq
+                    for seq in cached[1]]
+        seqs = get_sequences(source, compact=compact)
+        cache.put(directory, mtime, 'get_sequences', [], seqs)
+        cache.commit()
+        return seqs
+
     # list for storing sequences to be returned later
     seqs = []
     try:
@@ -1068,23 +1432,92 @@ def get_sequences(source):
     log.debug('Found %s files' % len(items))
 
     # organize the items into sequences
-    while items:
-        item = Item(items.pop(0))
-        found = False
-        for seq in seqs[::-1]:
-            if seq.includes(item):
-                seq.append(item)
-                found = True
-                break
-        if not found:
-            seq = Sequence([item])
-            seqs.append(seq)
+    seqs = _group_items(items)
+    if compact:
+        seqs = [seq.compact() for seq in seqs]
 
     log.debug('time: %s' % (datetime.now() - start))
 
     return list(seqs)
 
 
+def _group_items(items, wrap=True):
+    """Organizes the sorted items into sequences in a single pass.
+
+    Gives the same result as testing each item against all the sequences found
+    so far (newest first). Two items can only be siblings if they have the same
+    non-numerical parts and the same number of digit groups (their 'shape').
+    Within a shape, items whose digit groups have the same lengths are siblings
+    when all but one digit group match, so the sequences are bucketed by their
+    last item with one digit group masked at a time. Shapes mixing different
+    digit lengths, duplicate paths and non strict padding fall back to testing
+    the sequences of the same shape one by one.
+
+    :param items: sorted list of strings or objects.
+    :param wrap: if False, items are :class:`.Item` objects and used as they are.
+
+    :return: List of pyseq.Sequence class objects.
+    """
+    seqs = []
+    # shape: indexes of the sequences in creation order
+    shape_seqs = {}
+    # shape: set of digit length signatures seen
+    shape_pads = {}
+    # (shape, masked index, masked digits, digit lengths): {sequence index: last digits}
+    buckets = {}
+    # sequence index: bucket keys of its last item
+    seq_keys = {}
+    seen_paths = set()
+
+    def keys_of(shape, digits, pads):
+        for i in range(len(digits)):
+            yield (shape, i, tuple(digits[:i]) + tuple(digits[i + 1:]), pads)
+
+    def index_last(index, shape, digits, pads):
+        for key in seq_keys.pop(index, ()):
+            bucket = buckets[key]
+            del bucket[index]
+            if not bucket:
+                del buckets[key]
+        keys = list(keys_of(shape, digits, pads))
+        for key in keys:
+            buckets.setdefault(key, {})[index] = digits
+        seq_keys[index] = keys
+
+    for source_item in items:
+        item = Item(source_item) if wrap else source_item
+        digits = item.digits
+        shape = (tuple(item.parts), len(digits))
+        pads = tuple(len(d) for d in digits)
+        shape_pads.setdefault(shape, set()).add(pads)
+
+        fast = strict_pad is True and len(shape_pads[shape]) == 1 and item.path not in seen_paths
+        seen_paths.add(item.path)
+
+        found = None
+        if fast:
+            for key in keys_of(shape, digits, pads):
+                for index, last_digits in buckets.get(key, {}).items():
+                    # identical names are not siblings
+                    if last_digits != digits and (found is None or index > found):
+                        found = index
+        else:
+            for index in reversed(shape_seqs.get(shape, [])):
+                if seqs[index].includes(item):
+                    found = index
+                    break
+
+        if found is None:
+            found = len(seqs)
+            seqs.append(Sequence([item]))
+            shape_seqs.setdefault(shape, []).append(found)
+        else:
+            seqs[found].append(item)
+        index_last(found, shape, digits, pads)
+
+    return seqs
+
+
 def iget_sequences(source):
     """ Generator version of get_sequences.  Creates Sequences from a various
     source files.  A notable difference is the sort order of iget_sequences
@@ -1164,10 +1597,285 @@ def iget_sequences(source):
     log.debug("time: %s", datetime.now() - start)
 
 
-def walk(source, level=-1, topdown=True, onerror=None, followlinks=False, hidden=False, includes=()):
+def _default_cache_dir():
+    """Local (never shared) folder for the sequence cache"""
+    folder = os.environ.get('PYSEQ_CACHE_DIR')
+    if folder:
+        return folder
+    if os.name == 'nt' and os.environ.get('LOCALAPPDATA'):
+        return os.path.join(os.environ['LOCALAPPDATA'], 'pyseq')
+    return os.path.join(os.path.expanduser('~'), '.cache', 'pyseq')
+
+
+def _encode_sequence(seq):
+    """Returns a json friendly description of a Sequence or FrameSequence.
+    The files are stat'ed here, once per stored directory, so cached sequences carry
+    their size and mtime.
+    """
+    try:
+        size, mtime = seq.size, seq.mtime
+    except OSError:
+        size = mtime = None
+    if not isinstance(seq, FrameSequence):
+        first = seq[0]
+        regular = all(item.dirname == first.dirname and item.head == first.head
+                      and item.tail == first.tail and item.pad == first.pad
+                      for item in seq)
+        frames = seq.frames()
+        if not regular or len(set(frames)) != len(frames):
+            # cannot be described by head, padding and tail. Keep the names
+            return {'n': [item.name for item in seq], 's': size, 'm': mtime}
+        seq = seq.compact()
+    return {'h': seq.head(), 't': seq.tail(), 'p': seq._pad,
+            'r': seq.ranges(), 's': size, 'm': mtime}
+
+
+def _decode_sequence(directory, data):
+    if 'n' in data:
+        items = [Item(os.path.join(directory, name)) for name in data['n']]
+        return _group_items(items, wrap=False)
+    seq = FrameSequence(directory, data['h'], data['t'], data['p'])
+    if data['p'] is not None:
+        seq._set_ranges(data['r'])
+    seq._size = data['s']
+    seq._mtime = data['m']
+    return [seq]
+
+
+class SequenceCache(object):
+    """On disk cache of the sequences found in directories.
+
+    Entries are keyed by the directory path (and the listing options) and are
+    valid as long as the directory mtime does not change. Frames modified in
+    place do not change the directory mtime, their size and mtime may be stale
+    until a file is added or removed. The cache lives in a local sqlite
+    database; least recently used directories are evicted once the stored
+    data exceeds max_bytes.
+    """
+    _default = None
+    _default_lock = threading.Lock()
+    # directories modified within this many seconds are not cached, file
+    # systems with coarse mtime resolution could hide a following change
+    settle_time = 2.0
+
+    def __init__(self, path=None, max_bytes=64 * 1024 * 1024):
+        """
+        :param path: Path of the cache database file. Defaults to a file in
+                     the PYSEQ_CACHE_DIR or the local user cache folder.
+        :param max_bytes: Stored data is trimmed below this size.
+        """
+        if sqlite3 is None:
+            raise SequenceError("sqlite3 module is not available")
+        if path is None:
+            folder = _default_cache_dir()
+            if not os.path.isdir(folder):
+                os.makedirs(folder)
+            path = os.path.join(folder, 'sequenceCache.db')
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._accessed = {}
+        self._connection = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._connection.execute('PRAGMA synchronous=OFF')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS listings ('
+            'directory TEXT, options TEXT, mtime REAL, data TEXT, '
+            'bytes INTEGER, accessed REAL, PRIMARY KEY (directory, options))')
+        self._connection.commit()
+        self._total = self._connection.execute(
+            'SELECT COALESCE(SUM(bytes), 0) FROM listings').fetchone()[0]
+
+    @classmethod
+    def default(cls):
+        """Returns the shared cache instance at the default location"""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def get(self, directory, mtime, options=''):
+        """Returns (dir entries, sequences) cached for the directory or None
+
+        :param directory: Absolute directory path.
+        :param mtime: Current mtime of the directory.
+        :param options: Listing options the entry was stored with.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT mtime, data FROM listings WHERE directory=? AND options=?',
+                (directory, options)).fetchone()
+            if row is None or row[0] != mtime:
+                return None
+            self._accessed[(directory, options)] = time.time()
+        try:
+            data = json.loads(row[1])
+            seqs = []
+            for seq_data in data['seqs']:
+                seqs.extend(_decode_sequence(directory, seq_data))
+        except (ValueError, KeyError, TypeError):
+            return None
+        return [tuple(x) for x in data['dirs']], seqs
+
+    def put(self, directory, mtime, options, dir_entries, seqs):
+        """Stores the listing of the directory
+
+        :param directory: Absolute directory path.
+        :param mtime: mtime of the directory taken before it was listed.
+        :param options: Listing options, entries are kept per options.
+        :param dir_entries: List of (name, is_real_dir) tuples of the sub directories.
+        :param seqs: List of Sequence or FrameSequence objects found in the directory.
+        """
+        if time.time() - mtime < self.settle_time:
+            return
+        data = json.dumps({'dirs': dir_entries,
+                           'seqs': [_encode_sequence(seq) for seq in seqs]},
+                          separators=(',', ':'))
+        with self._lock:
+            old = self._connection.execute(
+                'SELECT bytes FROM listings WHERE directory=? AND options=?',
+                (directory, options)).fetchone()
+            self._connection.execute(
+                'INSERT OR REPLACE INTO listings VALUES (?,?,?,?,?,?)',
+                (directory, options, mtime, data, len(data), time.time()))
+            self._total += len(data) - (old[0] if old else 0)
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Drops the least recently used entries down to 3/4 of max_bytes"""
+        self._flush_accessed()
+        target = self.max_bytes * 3 // 4
+        rows = self._connection.execute(
+            'SELECT directory, options, bytes FROM listings ORDER BY accessed').fetchall()
+        removed = []
+        for directory, options, size in rows:
+            if self._total <= target:
+                break
+            removed.append((directory, options))
+            self._total -= size
+        self._connection.executemany(
+            'DELETE FROM listings WHERE directory=? AND options=?', removed)
+
+    def _flush_accessed(self):
+        if self._accessed:
+            self._connection.executemany(
+                'UPDATE listings SET accessed=? WHERE directory=? AND options=?',
+                [(stamp, key[0], key[1]) for key, stamp in self._accessed.items()])
+            self._accessed = {}
+
+    def commit(self):
+        """Writes the pending changes to disk"""
+        with self._lock:
+            if self._connection is None:
+                return
+            self._flush_accessed()
+            self._connection.commit()
+
+    def clear(self):
+        """Removes all the cached listings"""
+        with self._lock:
+            self._connection.execute('DELETE FROM listings')
+            self._connection.commit()
+            self._accessed = {}
+            self._total = 0
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self.commit()
+                self._connection.close()
+                self._connection = None
+                if SequenceCache._default is self:
+                    SequenceCache._default = None
+
+
+def _scandir(path):
+    """Returns (name, path, is_dir, descend, entry) tuples for the directory content.
+    entry is the os.scandir entry or None where scandir is not available.
+    """
+    try:
+        scandir = os.scandir
+    except AttributeError:
+        # python 2.7 compatibility
+        result = []
+        for name in os.listdir(path):
+            full_path = os.path.join(path, name)
+            is_dir = os.path.isdir(full_path)
+            result.append((name, full_path, is_dir,
+                           is_dir and not os.path.islink(full_path), None))
+        return result
+    result = []
+    for entry in scandir(path):
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        result.append((entry.name, entry.path, is_dir,
+                       is_dir and not entry.is_symlink(), entry))
+    return result
+
+
+def _walk_dir(root, includes_re, hidden, followlinks, onerror, cache=None):
+    """Lists a single directory for walk.
+
+    :return: (dirs, descend, sequences) or None if the directory cannot be listed.
+        descend is the set of dir names walk can follow.
+    """
+    root_mtime = None
+    cache_key = None
+    if cache is not None:
+        cache_key = 'walk|%s|%s' % (includes_re.pattern, hidden)
+        try:
+            root_mtime = os.stat(root).st_mtime
+        except OSError:
+            pass
+        cached = cache.get(root, root_mtime, cache_key) if root_mtime else None
+        if cached is not None:
+            dir_entries, seqs = cached
+            dirs = [name for name, is_real_dir in dir_entries]
+            descend = set(name for name, is_real_dir in dir_entries
+                          if followlinks or is_real_dir)
+            return dirs, descend, seqs
+
+    try:
+        content = _scandir(root)
+    except OSError as err:
+        if onerror is not None:
+            onerror(err)
+        return None
+
+    dir_entries = []
+    items = []
+    for name, path, is_dir, is_real_dir, entry in content:
+        if not hidden and name[0] == '.':
+            continue
+        if is_dir:
+            dir_entries.append((name, is_real_dir))
+        elif includes_re.match(name):
+            items.append(Item(entry if entry is not None else path))
+
+    # names of the same directory sort the same as their paths
+    items.sort(key=str)
+    seqs = _group_items(items, wrap=False)
+
+    if root_mtime:
+        cache.put(root, root_mtime, cache_key, dir_entries, seqs)
+
+    dirs = [name for name, is_real_dir in dir_entries]
+    descend = set(name for name, is_real_dir in dir_entries
+                  if followlinks or is_real_dir)
+    return dirs, descend, seqs
+
+
+def walk(source, level=-1, topdown=True, onerror=None, followlinks=False, hidden=False, includes=(), threads=1, cache=None):
     """Generator that traverses a directory structure starting at
     source looking for sequences.
 
+    Items of the yielded sequences keep their scandir entries and are only
+    stat'ed when their mtime or size is asked for. With a cache the files are
+    stat'ed once when the directory is stored, sequences served from the cache
+    know their size and mtime without touching the files.
+
     :param source: valid folder path to traverse
     :param level: int, if < 0 traverse entire structure otherwise
                   traverse to given depth
@@ -1175,34 +1883,79 @@ def walk(source, level=-1, topdown=True, onerror=None, followlinks=False, hidden
     :param onerror: callable to handle os.listdir errors
     :param followlinks: whether to follow links
     :param hidden: include hidden files and dirs
+    :param threads: number of directories listed concurrently. Helps on high
+                    latency network shares. When greater than 1 the tree is
+                    walked level by level (always top down) instead of depth
+                    first. Pruning dirs in place is still honored.
+    :param cache: :class:`.SequenceCache` instance, or True for the default
+                  one. Directories whose mtime did not change since they were
+                  cached are not listed again and yield
+                  :class:`.FrameSequence` objects.
 
     Args:
         includes: (List) List of extensions to filter down
     """
-    # transform glob patterns to regular expressions
-    includes = r'|'.join([fnmatch.translate(x) for x in includes])
+    # transform glob patterns to a single regular expression, compiled once
+    includes_re = re.compile(r'|'.join([fnmatch.translate(x) for x in includes]))
     start = datetime.now()
     assert isinstance(source, basestring) is True
     assert os.path.exists(source) is True
     source = os.path.abspath(source)
 
-    for root, dirs, files in os.walk(source, topdown, onerror, followlinks):
+    def depth(root):
+        parts = root.replace(source, "").split(os.sep)
+        return len([p for p in parts if p])
 
-        if not hidden:
-            files = [f for f in files if not f[0] == '.']
-            dirs[:] = [d for d in dirs if not d[0] == '.']
+    if cache is True:
+        cache = SequenceCache.default()
 
-        files = [os.path.join(root, f) for f in files if re.match(includes,f)]
-        # files = [f for f in files if re.match(includes, f)]
-        ##
+    def list_dir(root):
+        return root, _walk_dir(root, includes_re, hidden, followlinks, onerror, cache)
 
+    if threads > 1:
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(threads)
+        try:
+            frontier = [source]
+            while frontier:
+                next_frontier = []
+                for root, listing in pool.imap(list_dir, frontier):
+                    if listing is None:
+                        continue
+                    dirs, descend, seqs = listing
+                    if depth(root) == level - 1:
+                        del dirs[:]
+                    yield root, dirs, seqs
+                    next_frontier.extend(os.path.join(root, d) for d in dirs if d in descend)
+                frontier = next_frontier
+        finally:
+            pool.terminate()
+            if cache is not None:
+                cache.commit()
+        log.debug('time: %s' % (datetime.now() - start))
+        return
+
+    def walk_tree(root):
+        root, listing = list_dir(root)
+        if listing is None:
+            return
+        dirs, descend, seqs = listing
         if topdown is True:
-            parts = root.replace(source, "").split(os.sep)
-            while "" in parts:
-                parts.remove("")
-            if len(parts) == level - 1:
+            if depth(root) == level - 1:
                 del dirs[:]
+            yield root, dirs, seqs
+        for d in dirs:
+            if d in descend:
+                for result in walk_tree(os.path.join(root, d)):
+                    yield result
+        if topdown is not True:
+            yield root, dirs, seqs
 
-        yield root, dirs, get_sequences(files)
+    try:
+        for result in walk_tree(source):
+            yield result
+    finally:
+        if cache is not None:
+            cache.commit()
 
     log.debug('time: %s' % (datetime.now() - start))
@@ -0,0 +1,287 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------------------------
+# Copyright (c) 2017-2018, Arda Kutlu (ardakutlu@gmail.com)
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#  - Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+#  - Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+#  - Neither the name of the software nor the names of its contributors
+#    may be used to endorse or promote products derived from this software
+#    without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# -----------------------------------------------------------------------------
+
+"""
+SQLite mirror of the base scene json database files.
+
+The json files under smDatabase stay the source of truth. The index keeps a row
+for each of them so that listing a category is a single query instead of a glob
+plus a json read per scene. Every folder row stores the folder mtime at the time
+it was synced; when the folder mtime moves (a colleague added or removed a scene)
+only that folder is re-synced.
+"""
+
+import os
+import json
+import logging
+import threading
+
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
+
+__author__ = "Arda Kutlu"
+__copyright__ = "Copyright 2018, Tik Manager Scene Index"
+__credits__ = []
+__license__ = "GPL"
+__maintainer__ = "Arda Kutlu"
+__email__ = "ardakutlu@gmail.com"
+__status__ = "Development"
+
+logging.basicConfig()
+logger = logging.getLogger('sceneIndex')
+logger.setLevel(logging.WARNING)
+
+INDEX_FILE_NAME = "sceneIndex.db"
+# bump when the schema changes. The index is only a mirror, older versions are dropped and re-synced
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenes (
+    jsonFile TEXT PRIMARY KEY,
+    folder TEXT NOT NULL,
+    name TEXT,
+    category TEXT,
+    subProject TEXT,
+    creator TEXT,
+    versionCount INTEGER,
+    referencedVersion INTEGER,
+    mtime REAL,
+    referenceFile TEXT
+);
+CREATE INDEX IF NOT EXISTS scenes_folder ON scenes (folder);
+CREATE TABLE IF NOT EXISTS folders (
+    folder TEXT PRIMARY KEY,
+    mtime REAL
+);
+"""
+
+
+def isAvailable():
+    """Returns True if the python interpreter has sqlite support"""
+    return sqlite3 is not None
+
+
+class SceneIndex(object):
+    """Per project index database living under smDatabase"""
+    def __init__(self, masterDir):
+        if not isAvailable():
+            raise Exception(202, "sqlite3 module is not available")
+        self.masterDir = os.path.normpath(masterDir)
+        self.indexFile = os.path.join(self.masterDir, INDEX_FILE_NAME)
+        self._lock = threading.RLock()
+        # network shares does not play well with WAL, stick to the default rollback journal
+        self._connection = sqlite3.connect(self.indexFile, timeout=10, check_same_thread=False)
+        if self._connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self._connection.executescript("DROP TABLE IF EXISTS scenes; DROP TABLE IF EXISTS folders;")
+            self._connection.execute("PRAGMA user_version = %d" % SCHEMA_VERSION)
+        self._connection.executescript(_SCHEMA)
+        self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            if self._connection:
+                self._connection.close()
+                self._connection = None
+
+    def _relative(self, path):
+        """Database keys are stored relative to smDatabase with forward slashes"""
+        return os.path.relpath(os.path.normpath(path), self.masterDir).replace("\\", "/")
+
+    def _absolute(self, relPath):
+        return os.path.normpath(os.path.join(self.masterDir, relPath))
+
+    def _rowFromInfo(self, jsonFile, sceneInfo, mtime):
+        return (self._relative(jsonFile),
+                self._relative(os.path.dirname(jsonFile)),
+                sceneInfo.get("Name"),
+                sceneInfo.get("Category"),
+                sceneInfo.get("SubProject"),
+                sceneInfo.get("Creator"),
+                len(sceneInfo.get("Versions", [])),
+                sceneInfo.get("ReferencedVersion"),
+                mtime,
+                sceneInfo.get("ReferenceFile"))
+
+    def _readInfo(self, jsonFile):
+        try:
+            with open(jsonFile, 'r') as f:
+                return json.load(f)
+        except (IOError, OSError, ValueError):
+            logger.warning("Cannot index corrupted or missing database file => %s" % jsonFile)
+            return None
+
+    def updateScene(self, jsonFile, sceneInfo=None):
+        """
+        Updates (or inserts) the row of given base scene database file
+        :param jsonFile: (String) Absolute path of the base scene database file
+        :param sceneInfo: (Dictionary) Already loaded content of the json file. Read from disk if not given
+        :return: None
+        """
+        if sceneInfo is None:
+            sceneInfo = self._readInfo(jsonFile)
+            if sceneInfo is None:
+                return
+        try:
+            mtime = os.path.getmtime(jsonFile)
+        except OSError:
+            return
+        with self._lock:
+            self._connection.execute("INSERT OR REPLACE INTO scenes VALUES (?,?,?,?,?,?,?,?,?,?)",
+                                     self._rowFromInfo(jsonFile, sceneInfo, mtime))
+            self._connection.commit()
+
+    def removeScene(self, jsonFile):
+        """Removes the row of the given base scene database file"""
+        with self._lock:
+            self._connection.execute("DELETE FROM scenes WHERE jsonFile=?", (self._relative(jsonFile),))
+            self._connection.commit()
+
+    def _scanFolder(self, folder):
+        """Returns {absolute json path: mtime} for the json files directly under the folder"""
+        found = {}
+        try:
+            scandir = os.scandir
+        except AttributeError:
+            scandir = None
+        if scandir:
+            for entry in scandir(folder):
+                if entry.name.endswith(".json") and entry.is_file():
+                    found[os.path.join(folder, entry.name)] = entry.stat().st_mtime
+        else:
+            for name in os.listdir(folder):
+                path = os.path.join(folder, name)
+                if name.endswith(".json") and os.path.isfile(path):
+                    found[path] = os.path.getmtime(path)
+        return found
+
+    def syncFolder(self, folder):
+        """
+        Brings the rows of the folder in line with the json files on disk.
+        Only the new or modified json files are read.
+        :param folder: (String) Absolute path of the category or sub-project database folder
+        :return: None
+        """
+        folder = os.path.normpath(folder)
+        if not os.path.isdir(folder):
+            return
+        folderMtime = os.path.getmtime(folder)
+        onDisk = self._scanFolder(folder)
+        relFolder = self._relative(folder)
+        with self._lock:
+            indexed = dict(self._connection.execute("SELECT jsonFile, mtime FROM scenes WHERE folder=?", (relFolder,)).fetchall())
+            rows = []
+            for path, mtime in onDisk.items():
+                if indexed.pop(self._relative(path), None) == mtime:
+                    continue
+                sceneInfo = self._readInfo(path)
+                if sceneInfo is None:
+                    continue
+                rows.append(self._rowFromInfo(path, sceneInfo, mtime))
+            self._connection.executemany("INSERT OR REPLACE INTO scenes VALUES (?,?,?,?,?,?,?,?,?,?)", rows)
+            # whatever left in indexed dictionary is deleted from the disk
+            self._connection.executemany("DELETE FROM scenes WHERE jsonFile=?", [(x,) for x in indexed])
+            self._connection.execute("INSERT OR REPLACE INTO folders VALUES (?,?)", (relFolder, folderMtime))
+            self._connection.commit()
+
+    def _validateFolder(self, folder):
+        """Re-syncs the folder if it is changed since the last sync"""
+        folder = os.path.normpath(folder)
+        try:
+            currentMtime = os.path.getmtime(folder)
+        except OSError:
+            return False
+        with self._lock:
+            row = self._connection.execute("SELECT mtime FROM folders WHERE folder=?", (self._relative(folder),)).fetchone()
+        if not row or row[0] != currentMtime:
+            self.syncFolder(folder)
+        return True
+
+    def listFolder(self, folder):
+        """
+        Returns the base scenes under the given database folder
+        :param folder: (String) Absolute path of the category or sub-project database folder
+        :return: (Dictionary) {niceName: absolute json path}
+        """
+        if not self._validateFolder(folder):
+            return {}
+        with self._lock:
+            rows = self._connection.execute("SELECT jsonFile FROM scenes WHERE folder=?", (self._relative(folder),)).fetchall()
+        return {os.path.splitext(os.path.basename(row[0]))[0]: self._absolute(row[0]) for row in rows}
+
+    def getScenes(self, folder):
+        """
+        Returns all indexed data of the base scenes under the given database folder
+        :param folder: (String) Absolute path of the category or sub-project database folder
+        :return: (List) of dictionaries
+        """
+        if not self._validateFolder(folder):
+            return []
+        with self._lock:
+            cursor = self._connection.execute("SELECT * FROM scenes WHERE folder=?", (self._relative(folder),))
+            keys = [x[0] for x in cursor.description]
+            rows = cursor.fetchall()
+        sceneList = []
+        for row in rows:
+            data = dict(zip(keys, row))
+            data["jsonFile"] = self._absolute(data["jsonFile"])
+            data["folder"] = self._absolute(data["folder"])
+            sceneList.append(data)
+        return sceneList
+
+    def _inTree(self, column):
+        """SQL condition matching the rows under a folder. substr is used instead of LIKE,
+        underscores and percent signs in folder names are not wildcards there"""
+        return "substr(%s, 1, ?) = ?" % column
+
+    def rebuild(self, databaseDir):
+        """
+        Drops all rows belonging to the software database folder and re-creates them from the json files
+        :param databaseDir: (String) Absolute path of the software database folder (eg. smDatabase/mayaDB)
+        :return: (Integer) Number of indexed base scenes
+        """
+        databaseDir = os.path.normpath(databaseDir)
+        prefix = "%s/" % self._relative(databaseDir)
+        treeArgs = (len(prefix), prefix)
+        with self._lock:
+            self._connection.execute("DELETE FROM scenes WHERE %s" % self._inTree("folder"), treeArgs)
+            self._connection.execute("DELETE FROM folders WHERE %s" % self._inTree("folder"), treeArgs)
+            self._connection.commit()
+        for root, dirs, files in os.walk(databaseDir):
+            # category files lives directly under the software database folder
+            if os.path.normpath(root) == databaseDir:
+                continue
+            self.syncFolder(root)
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM scenes WHERE %s" % self._inTree("folder"),
+                                            treeArgs).fetchone()[0]
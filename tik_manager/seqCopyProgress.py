@@ -4,11 +4,13 @@ Works on PySeq objects
 """
 
 import os
-from shutil import copyfile
+import threading
 # import pyseq
 import datetime
 import logging
 
+import tik_manager.sequenceTransfer as sequenceTransfer
+
 import tik_manager.Qt as Qt
 from tik_manager.Qt import QtWidgets, QtCore, QtGui
 if Qt.__binding__ == "PySide":
@@ -16,14 +18,15 @@ if Qt.__binding__ == "PySide":
     from Qt.QtCore import Signal
 elif Qt.__binding__.startswith('PyQt'):
     from sip import wrapinstance as wrapInstance
-    from Qt.Core import pyqtSignal as Signal
+    from Qt.QtCore import pyqtSignal as Signal
 else:
     from shiboken2 import wrapInstance
     from Qt.QtCore import Signal
 
 class SeqCopyProgress(QtWidgets.QWidget):
+    progressChanged = Signal(object, object)
 
-    def __init__(self, src=None, dest=None):
+    def __init__(self, src=None, dest=None, workers=4):
         super(SeqCopyProgress, self).__init__()
         self.logger = None
         self.src = src
@@ -32,6 +35,10 @@ class SeqCopyProgress(QtWidgets.QWidget):
         self.terminated = False
         self.cancelAll = False
         self.errorFlag = False
+        self.copier = sequenceTransfer.SequenceCopier(workers=workers)
+        self._overallDone = 0
+        self._overallTotal = 0
+        self.progressChanged.connect(self.onProgress)
         # self.copyfileobj(src=self.src, dst=self.dest)
 
 
@@ -140,29 +147,61 @@ class SeqCopyProgress(QtWidgets.QWidget):
         except AttributeError:
             pass
 
-    def copyfileobj(self, src, dst):
+    def onProgress(self, done, total):
+        """Updates the progress bars with the bytes copied from the current sequence"""
+        self.pb.setValue(int(100 * done / total) if total else 100)
+        if self._overallTotal:
+            self.pbOverall.setValue(int(100 * (self._overallDone + done) / self._overallTotal))
+
+    def logFileResult(self, src, dst, status):
+        """Called from the copy workers for every frame"""
+        if status == "copied":
+            self.safeLog("Success - {0}".format(dst))
+        elif status == "skipped":
+            self.safeLog("Skipped - already up to date - {0}".format(dst))
+        elif status != "cancelled":
+            self.safeLog("FAILED - {0} - {1}".format(status, src))
+
+    def copyfileobj(self, src, dst, journal=None):
 
         self.pb.setValue(0)
-        self.terminated = False # reset the termination status
-        totalCount = len(src)
-        current = 0
+        self.terminated = False  # reset the termination status
+        pairs = [(i, os.path.join(dst, os.path.basename(i))) for i in src]
+        result = {}
 
-        for i in src:
-            targetPath = os.path.join(dst, os.path.basename(i))
+        def run():
             try:
-                copyfile(i, targetPath)
-            except:
-                self.errorFlag = True
-                self.safeLog("FAILED - unknown error")
-            percent = (100 * current) / totalCount
-            self.pb.setValue(percent)
-            current += 1
+                result.update(self.copier.copyFiles(pairs, journal=journal,
+                                                    progress=self.progressChanged.emit,
+                                                    fileDone=self.logFileResult))
+            except Exception as e:
+                self.safeLog("FAILED - {0}".format(e))
+
+        # frames are copied by the worker pool, the window only waits for them
+        worker = threading.Thread(target=run)
+        worker.start()
+        while worker.is_alive():
             QtWidgets.QApplication.processEvents()
-            self.safeLog("Success - {0}".format(targetPath))
             if self.terminated or self.cancelAll:
-                self.errorFlag = True
-                self.safeLog("FAILED - skipped by user")
-                break
+                self.copier.cancel()
+            worker.join(0.05)
+        QtWidgets.QApplication.processEvents()
+
+        if not result or result["failed"]:
+            self.errorFlag = True
+        if result.get("cancelled"):
+            self.errorFlag = True
+            self.safeLog("FAILED - skipped by user")
+
+    @staticmethod
+    def _sequenceSize(sequence):
+        size = 0
+        for i in sequence:
+            try:
+                size += i.size
+            except OSError:
+                pass
+        return size
 
     def copysequence(self, sequenceData, selectionList, destination, logPath, root):
 
@@ -170,9 +209,23 @@ class SeqCopyProgress(QtWidgets.QWidget):
         logName = "fileTransferLog_{0}.txt".format(now.strftime("%Y.%m.%d.%H.%M"))
         logFile = os.path.join(logPath, logName)
         self.logger = self.setupLogger(logFile)
-        totalCount = len(selectionList)
-        current = 0
-        for sel in selectionList:
+
+        # the same selection sent to the same destination again resumes into the same target folders
+        firstFrames = [sequenceData[str(sel)][0].path for sel in selectionList]
+        journal = sequenceTransfer.TransferJournal.forTransfer(logPath, destination, firstFrames)
+        if journal.isResumed:
+            self.safeLog("Resuming the interrupted transfer, finished frames will be skipped")
+        targets = {}
+        for firstFrame in firstFrames:
+            subPath = os.path.split(os.path.relpath(firstFrame, root))[0]  ## get the relative path
+            currentDate = now.strftime("%y%m%d")
+            targets[firstFrame] = journal.targets.get(firstFrame) or os.path.join(destination, currentDate, subPath)
+        journal.setTargets(targets)
+
+        sizes = [self._sequenceSize(sequenceData[str(sel)]) for sel in selectionList]
+        self._overallDone = 0
+        self._overallTotal = sum(sizes)
+        for sel, firstFrame, size in zip(selectionList, firstFrames, sizes):
             if self.cancelAll:
                 self.safeLog("ALL CANCELED")
                 break
@@ -180,17 +233,19 @@ class SeqCopyProgress(QtWidgets.QWidget):
                 "---------------------------------------------\n"
                 "Copy Progress - {0}\n"
                 "---------------------------------------------".format(
-                    sequenceData[sel]))
-            percent = (100 * current) / totalCount
-            self.pbOverall.setValue(percent)
-            current += 1
-            tFilesList = [i.path for i in sequenceData[sel]]
-            subPath = os.path.split(os.path.relpath(tFilesList[0], root))[0]  ## get the relative path
-            currentDate = now.strftime("%y%m%d")
-            targetPath = os.path.join(destination, currentDate, subPath)
+                    sequenceData[str(sel)]))
+            tFilesList = [i.path for i in sequenceData[str(sel)]]
+            targetPath = targets[firstFrame]
             if not os.path.isdir(os.path.normpath(targetPath)):
                 os.makedirs(os.path.normpath(targetPath))
-            self.copyfileobj(src=tFilesList, dst=targetPath)
+            self.copyfileobj(src=tFilesList, dst=targetPath, journal=journal)
+            self._overallDone += size
+
+        if self.errorFlag or self.cancelAll:
+            journal.close()
+            self.safeLog("Transfer the same sequences to the same location again to resume")
+        else:
+            journal.remove()
 
         self.deleteLogger(self.logger)
 
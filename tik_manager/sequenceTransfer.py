@@ -0,0 +1,583 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------------------------
+# Copyright (c) 2017-2018, Arda Kutlu (ardakutlu@gmail.com)
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#  - Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+#  - Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+#  - Neither the name of the software nor the names of its contributors
+#    may be used to endorse or promote products derived from this software
+#    without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# -----------------------------------------------------------------------------
+
+
+"""
+Copy engine for the image sequence transfers and the project material ingests.
+
+Frames are copied by a pool of worker threads. On Linux the data is moved by the
+kernel (copy_file_range, falling back to sendfile) and everywhere else with large
+buffers. Each frame is written to a temporary file and renamed once complete, and
+the source modification time is applied to the copy. A frame already at the
+destination with the same size and modification time is skipped, so re-running an
+interrupted transfer continues where it left off. The transfer journal keeps the
+target folders and the finished frames of a transfer for that purpose.
+
+Optionally the copies are verified by hashing the source and the destination frames.
+The checksums are written into a manifest next to the transfer log, which can be used
+to re-verify the destination later without the source:
+
+    python sequenceTransfer.py --verify fileTransferLog_2018.11.01.12.00_manifest.json
+"""
+
+import os
+import sys
+import json
+import time
+import errno
+import hashlib
+import logging
+import threading
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+
+__author__ = "Arda Kutlu"
+__copyright__ = "Copyright 2018, Tik Manager Sequence Transfer"
+__credits__ = []
+__license__ = "GPL"
+__maintainer__ = "Arda Kutlu"
+__email__ = "ardakutlu@gmail.com"
+__status__ = "Development"
+
+logging.basicConfig()
+logger = logging.getLogger('sequenceTransfer')
+logger.setLevel(logging.WARNING)
+
+CHUNK_SIZE = 8 * 1024 * 1024
+MIN_CHUNK_SIZE = 64 * 1024
+# network shares and FAT volumes store the modification time with 2 seconds precision
+MTIME_TOLERANCE = 2.0
+TEMP_SUFFIX = ".tikpart"
+
+# kernel copy methods are disabled for the session only if the kernel does not have them,
+# other unsupported errors depend on the file systems and fall back for that file alone
+_kernelCopy = {"copy_file_range": hasattr(os, "copy_file_range"),
+               "sendfile": hasattr(os, "sendfile") and sys.platform.startswith("linux")}
+_UNSUPPORTED = (errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF)
+
+MANIFEST_VERSION = 1
+# blake2b is not available before python 3.6
+HASH_ALGORITHM = "blake2b" if hasattr(hashlib, "blake2b") else "sha1"
+
+
+class TransferCancelled(Exception):
+    pass
+
+
+def isUpToDate(srcStat, dst):
+    """Returns True if the destination file has the same size and modification time with the source"""
+    try:
+        dstStat = os.stat(dst)
+    except OSError:
+        return False
+    return dstStat.st_size == srcStat.st_size and abs(dstStat.st_mtime - srcStat.st_mtime) <= MTIME_TOLERANCE
+
+
+def replaceFile(src, dst):
+    """Renames src over dst. Atomic on python 3 and on posix systems"""
+    try:
+        os.replace(src, dst)
+    except AttributeError:  # python 2.7 compatibility
+        if os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+
+def _kernelLoop(method, fin, fout, size, progress, cancelEvent):
+    """Copies with the given kernel method. Returns False if the method is not usable for these files"""
+    offset = 0
+    while offset < size:
+        if cancelEvent is not None and cancelEvent.is_set():
+            raise TransferCancelled()
+        count = min(CHUNK_SIZE, size - offset)
+        try:
+            if method == "copy_file_range":
+                sent = os.copy_file_range(fin.fileno(), fout.fileno(), count)
+            else:
+                sent = os.sendfile(fout.fileno(), fin.fileno(), offset, count)
+        except OSError as e:
+            if offset == 0 and e.errno in _UNSUPPORTED:
+                if e.errno == errno.ENOSYS:
+                    _kernelCopy[method] = False
+                return False
+            raise
+        if sent == 0:
+            break  # source is truncated while copying
+        offset += sent
+        if progress:
+            progress(sent)
+    return True
+
+
+def _bufferLoop(fin, fout, size, progress, cancelEvent):
+    # small files are read at once without allocating the full chunk
+    blockSize = min(CHUNK_SIZE, max(MIN_CHUNK_SIZE, size))
+    while True:
+        if cancelEvent is not None and cancelEvent.is_set():
+            raise TransferCancelled()
+        block = fin.read(blockSize)
+        if not block:
+            break
+        fout.write(block)
+        if progress:
+            progress(len(block))
+
+
+def scanTree(folder):
+    """
+    Lists everything under the folder in a single pass, re-using the stat data of the directory listing.
+    Symbolic links to folders are not followed, a link pointing to its parent would never end
+    :param folder: (String) Absolute path of the folder
+    :return: (Tuple) ([relative folder paths], [(absolute file path, relative file path, os.stat_result)]).
+        The stat is None for the files which cannot be stat'd, e.g. broken links
+    """
+    folders = []
+    files = []
+    stack = [""]
+    while stack:
+        relDir = stack.pop()
+        absDir = os.path.join(folder, relDir)
+        try:
+            # is_dir only stats the symbolic links, file types of the others come with the listing
+            entries = [(e.name, e.is_dir(follow_symlinks=False), e.is_dir(), e) for e in os.scandir(absDir)]
+        except AttributeError:  # python 2.7 compatibility
+            entries = []
+            for name in os.listdir(absDir):
+                absPath = os.path.join(absDir, name)
+                isDir = os.path.isdir(absPath)
+                entries.append((name, isDir and not os.path.islink(absPath), isDir, None))
+        for name, isDir, isLinkedDir, entry in sorted(entries, key=lambda x: x[0]):
+            relPath = os.path.join(relDir, name)
+            absPath = os.path.join(absDir, name)
+            if isDir:
+                folders.append(relPath)
+                stack.append(relPath)
+                continue
+            if isLinkedDir:
+                logger.warning("Linked folder is not followed => %s" % absPath)
+                continue
+            try:
+                st = entry.stat() if entry else os.stat(absPath)
+            except OSError:
+                st = None
+            files.append((absPath, relPath, st))
+    return folders, files
+
+
+def copyFile(src, dst, srcStat=None, progress=None, cancelEvent=None):
+    """
+    Copies a single file with the fastest method available and applies the source modification time
+    :param src: (String) Absolute path of the source file
+    :param dst: (String) Absolute path of the target file
+    :param srcStat: (os.stat_result) Stat of the source file if it is already known
+    :param progress: (Callable) Called with the number of bytes copied with each chunk
+    :param cancelEvent: (threading.Event) Copy stops between chunks if the event is set
+    :return: (Integer) Size of the file
+    """
+    srcStat = srcStat or os.stat(src)
+    tempPath = dst + TEMP_SUFFIX
+    try:
+        with open(src, "rb") as fin:
+            with open(tempPath, "wb") as fout:
+                done = False
+                for method in ("copy_file_range", "sendfile"):
+                    if _kernelCopy[method]:
+                        done = _kernelLoop(method, fin, fout, srcStat.st_size, progress, cancelEvent)
+                        if done:
+                            break
+                if not done:
+                    _bufferLoop(fin, fout, srcStat.st_size, progress, cancelEvent)
+        os.utime(tempPath, (srcStat.st_atime, srcStat.st_mtime))
+        replaceFile(tempPath, dst)
+    except BaseException:
+        try:
+            os.remove(tempPath)
+        except OSError:
+            pass
+        raise
+    return srcStat.st_size
+
+
+class TransferJournal(object):
+    """
+    Append only record of a transfer, kept next to the transfer logs until the transfer completes.
+    The first line holds the target folders, each following line is a finished frame.
+    """
+    def __init__(self, journalFile):
+        self.journalFile = journalFile
+        self.targets = {}
+        self._done = set()
+        self._lock = threading.Lock()
+        self._handle = None
+        self._load()
+
+    @classmethod
+    def forTransfer(cls, folder, destination, sources):
+        """
+        Returns the journal of the transfer of given sources to the destination. Same sources
+        to the same destination resolves to the same journal, so an interrupted transfer resumes.
+        :param folder: (String) Folder to keep the journal files in
+        :param destination: (String) Root folder of the transfer
+        :param sources: (List) Any stable list identifying the transferred items
+        :return: (TransferJournal)
+        """
+        text = "\n".join([destination] + sorted(sources))
+        if not isinstance(text, bytes):
+            text = text.encode("utf-8")
+        key = hashlib.md5(text).hexdigest()
+        return cls(os.path.join(folder, "transferJournal_%s.json" % key))
+
+    @property
+    def isResumed(self):
+        return bool(self.targets)
+
+    def _load(self):
+        if not os.path.isfile(self.journalFile):
+            return
+        with open(self.journalFile, "r") as f:
+            for lineNumber, line in enumerate(f):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # last line may be cut by a crash
+                if lineNumber == 0:
+                    self.targets = record.get("targets", {})
+                else:
+                    self._done.add(record["dst"])
+
+    def setTargets(self, targets):
+        """Writes the target folders of the transfer. Must be called before the first frame is recorded"""
+        self.targets = dict(targets)
+        with self._lock:
+            self._handle = open(self.journalFile, "w")
+            self._handle.write(json.dumps({"targets": self.targets}) + "\n")
+            for dst in sorted(self._done):
+                self._handle.write(json.dumps({"dst": dst}) + "\n")
+            self._handle.flush()
+
+    def isDone(self, dst):
+        return dst in self._done
+
+    def markDone(self, dst):
+        with self._lock:
+            self._done.add(dst)
+            if self._handle:
+                self._handle.write(json.dumps({"dst": dst}) + "\n")
+                self._handle.flush()
+
+    def close(self):
+        with self._lock:
+            if self._handle:
+                self._handle.close()
+                self._handle = None
+
+    def remove(self):
+        """Deletes the journal once the transfer is completed"""
+        self.close()
+        try:
+            os.remove(self.journalFile)
+        except OSError:
+            pass
+
+
+class SequenceCopier(object):
+    """Copies lists of files concurrently and reports the progress in bytes"""
+    def __init__(self, workers=4):
+        """
+        :param workers: (Integer) Number of files copied at the same time
+        """
+        self.workers = max(1, workers)
+        self._cancelEvent = threading.Event()
+
+    def cancel(self):
+        """Stops the running copyFiles call. Frames which are being copied are discarded"""
+        self._cancelEvent.set()
+
+    def copyFiles(self, pairs, journal=None, progress=None, fileDone=None, stats=None):
+        """
+        Copies the files. Frames which are already at the destination or recorded as finished
+        by the journal are skipped.
+        :param pairs: (List) (source path, target path) tuples
+        :param stats: (Dictionary) {source path: os.stat_result} if the sources are already stat'd
+        :param journal: (TransferJournal) Records the finished frames if given
+        :param progress: (Callable) Called with (bytes done, bytes total) from the worker threads
+        :param fileDone: (Callable) Called with (source, target, status) from the worker threads.
+                        status is one of "copied", "skipped", "cancelled" or the error message
+        :return: (Dictionary) {"copied": int, "skipped": int, "failed": [(src, error)], "cancelled": bool,
+                               "bytes": int}
+        """
+        self._cancelEvent.clear()
+        stats = dict(stats or {})
+        for src, dst in pairs:
+            if src in stats:
+                continue
+            try:
+                stats[src] = os.stat(src)
+            except OSError:
+                stats[src] = None
+        total = sum(stats[src].st_size for src, dst in pairs if stats[src])
+        counters = {"bytes": 0, "copied": 0, "skipped": 0}
+        failed = []
+        lock = threading.Lock()
+
+        def advance(count):
+            with lock:
+                counters["bytes"] += count
+                current = counters["bytes"]
+            if progress:
+                progress(current, total)
+
+        def finish(src, dst, status):
+            if fileDone:
+                fileDone(src, dst, status)
+
+        def run(pair):
+            src, dst = pair
+            srcStat = stats[src]
+            if self._cancelEvent.is_set():
+                return finish(src, dst, "cancelled")
+            if srcStat is None:
+                failed.append((src, "source is missing"))
+                return finish(src, dst, "source is missing")
+            if journal and journal.isDone(dst):
+                # the modification time may not be applied on every share, size is enough for
+                # frames this transfer already finished
+                try:
+                    journaled = os.path.getsize(dst) == srcStat.st_size
+                except OSError:
+                    journaled = False
+            else:
+                journaled = False
+            if journaled or isUpToDate(srcStat, dst):
+                with lock:
+                    counters["skipped"] += 1
+                advance(srcStat.st_size)
+                if journal and not journaled:
+                    journal.markDone(dst)
+                return finish(src, dst, "skipped")
+            copied = [0]
+
+            def chunkDone(count):
+                copied[0] += count
+                advance(count)
+            try:
+                copyFile(src, dst, srcStat=srcStat, progress=chunkDone, cancelEvent=self._cancelEvent)
+            except TransferCancelled:
+                advance(-copied[0])
+                return finish(src, dst, "cancelled")
+            except (IOError, OSError) as e:
+                advance(-copied[0])
+                failed.append((src, str(e)))
+                return finish(src, dst, str(e))
+            with lock:
+                counters["copied"] += 1
+            if journal:
+                journal.markDone(dst)
+            finish(src, dst, "copied")
+
+        pool = ThreadPool(min(self.workers, max(1, len(pairs))))
+        try:
+            # results are consumed to re-raise unexpected exceptions
+            for _ in pool.imap_unordered(run, pairs):
+                pass
+        finally:
+            pool.close()
+            pool.join()
+        return {"copied": counters["copied"],
+                "skipped": counters["skipped"],
+                "failed": failed,
+                "cancelled": self._cancelEvent.is_set(),
+                "bytes": counters["bytes"]}
+
+
+def hashFile(filePath, algorithm=HASH_ALGORITHM, blockSize=CHUNK_SIZE):
+    """
+    Returns the size and the checksum of the file
+    :param filePath: (String) Absolute path of the file
+    :param algorithm: (String) Name of the hashlib algorithm
+    :return: (Tuple) (size, hexdigest). (None, None) if the file cannot be read
+    """
+    hasher = hashlib.new(algorithm)
+    size = 0
+    try:
+        with open(filePath, "rb") as f:
+            while True:
+                block = f.read(blockSize)
+                if not block:
+                    break
+                size += len(block)
+                hasher.update(block)
+    except (IOError, OSError):
+        return None, None
+    return size, hasher.hexdigest()
+
+
+def _hashTask(task):
+    """Process pool entry point. Must stay at module level to be picklable"""
+    filePath, algorithm = task
+    return (filePath,) + hashFile(filePath, algorithm)
+
+
+def _canSpawnProcesses():
+    """
+    Child processes are started with sys.executable, which is the host application itself
+    inside Maya, 3ds Max, Nuke or a frozen standalone build
+    """
+    return os.path.basename(sys.executable).lower().startswith("python")
+
+
+def hashFiles(filePaths, algorithm=HASH_ALGORITHM, processes=None, progress=None, cancelEvent=None):
+    """
+    Hashes the files in a process pool, or in a thread pool where processes cannot be spawned
+    :param filePaths: (List) Absolute file paths
+    :param algorithm: (String) Name of the hashlib algorithm
+    :param processes: (Integer) Size of the pool. Number of cpus if None
+    :param progress: (Callable) Called with (bytes done, bytes total)
+    :param cancelEvent: (threading.Event) Hashing stops if the event is set
+    :return: (Dictionary) {filePath: (size, hexdigest)}. Unreadable files are (None, None)
+    """
+    filePaths = list(set(filePaths))
+    total = 0
+    for filePath in filePaths:
+        try:
+            total += os.path.getsize(filePath)
+        except OSError:
+            pass
+    processes = processes or multiprocessing.cpu_count()
+    poolSize = max(1, min(processes, len(filePaths)))
+    if _canSpawnProcesses():
+        pool = multiprocessing.Pool(poolSize)
+    else:
+        # hashlib releases the GIL for large buffers, threads are not much slower
+        pool = ThreadPool(poolSize)
+    results = {}
+    done = 0
+    try:
+        for filePath, size, digest in pool.imap_unordered(_hashTask, [(x, algorithm) for x in filePaths]):
+            results[filePath] = (size, digest)
+            done += size or 0
+            if progress:
+                progress(done, total)
+            if cancelEvent is not None and cancelEvent.is_set():
+                pool.terminate()
+                break
+    finally:
+        pool.close()
+        pool.join()
+    return results
+
+
+def _compare(expectedSize, expectedHash, size, digest):
+    """Returns the problem of the copy, None if it is intact"""
+    if size is None:
+        return "missing"
+    if size < expectedSize:
+        return "truncated"
+    if size != expectedSize:
+        return "size mismatch"
+    if digest != expectedHash:
+        return "checksum mismatch"
+    return None
+
+
+def buildManifest(pairs, processes=None, progress=None, cancelEvent=None):
+    """
+    Hashes the source and the destination frames and compares them
+    :param pairs: (List) (source path, target path) tuples of a finished transfer
+    :return: (Tuple) (manifest dictionary, [(target path, problem), ...])
+    """
+    hashes = hashFiles([x for pair in pairs for x in pair], processes=processes,
+                       progress=progress, cancelEvent=cancelEvent)
+    files = []
+    problems = []
+    for src, dst in sorted(pairs):
+        if src not in hashes or dst not in hashes:
+            continue  # cancelled
+        srcSize, srcHash = hashes[src]
+        if srcSize is None:
+            problems.append((dst, "source is missing"))
+            continue
+        problem = _compare(srcSize, srcHash, *hashes[dst])
+        if problem:
+            problems.append((dst, problem))
+        files.append({"src": src, "dst": dst, "size": srcSize, "hash": srcHash})
+    manifest = {"version": MANIFEST_VERSION,
+                "algorithm": HASH_ALGORITHM,
+                "created": time.time(),
+                "files": files}
+    return manifest, problems
+
+
+def manifestPath(logFile):
+    """Returns the manifest path of the transfer log file"""
+    return "%s_manifest.json" % os.path.splitext(logFile)[0]
+
+
+def writeManifest(manifest, filePath):
+    with open(filePath, "w") as f:
+        json.dump(manifest, f, indent=1)
+
+
+def verifyManifest(filePath, processes=None, progress=None, cancelEvent=None):
+    """
+    Re-hashes the destination frames recorded in the manifest. Source frames are not needed
+    :param filePath: (String) Absolute path of the manifest file
+    :return: (List) [(target path, problem), ...]. Empty if all frames are intact
+    """
+    with open(filePath, "r") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise Exception(101, "Unsupported manifest version => %s" % filePath)
+    files = manifest["files"]
+    hashes = hashFiles([x["dst"] for x in files], algorithm=manifest["algorithm"], processes=processes,
+                       progress=progress, cancelEvent=cancelEvent)
+    problems = []
+    for entry in files:
+        if entry["dst"] not in hashes:
+            continue  # cancelled
+        problem = _compare(entry["size"], entry["hash"], *hashes[entry["dst"]])
+        if problem:
+            problems.append((entry["dst"], problem))
+    return problems
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Verifies the transferred frames against a transfer manifest")
+    parser.add_argument("--verify", required=True, help="manifest file written next to the transfer log")
+    parser.add_argument("--processes", type=int, default=None, help="number of hashing processes")
+    args = parser.parse_args()
+    result = verifyManifest(args.verify, processes=args.processes)
+    for path, problem in result:
+        print("%s - %s" % (problem.upper(), path))
+    print("%s problem(s) found" % len(result))
+    sys.exit(1 if result else 0)